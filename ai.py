@@ -1,16 +1,28 @@
 # AI-backed word definitions and batch card generation.
 
+import hashlib
 import logging
+import queue
 import re
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
 from typing import Any, Callable, Dict, List, Optional
 
 import streamlit as st
 
 import constants
+from ai_batching import BATCH_SIZER
+from ai_cache import get_ai_cache, make_cache_key
+from ai_limits import backoff_delay, estimate_prompt_tokens, get_provider_guard, is_retryable_error
+from ai_usage import USAGE_TRACKER
+from anki_parse import IncrementalCardParser
 from config import get_config
 from errors import ErrorHandler
-from resources import get_vocab_dict
+from lookup_tiers import TieredLookup
+from resources import get_vocab_dict, lookup_local_card_entry
+from single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +32,26 @@ except ImportError:
     OpenAI = None
     logger.warning("OpenAI library not available")
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Process-wide clients keyed by (base_url, api key hash); each keeps its own
+# keep-alive connection pool so repeated requests skip the TCP/TLS setup.
+_CLIENT_POOL: Dict[tuple, Any] = {}
+_CLIENT_POOL_LOCK = threading.Lock()
+
+LOOKUP_FLIGHTS = SingleFlight()
+
+
+class _AIRequestAborted(RuntimeError):
+    """A batch request that retrying cannot fix (open circuit or non-retryable error)."""
+
+
+class _AIRequestRejected(RuntimeError):
+    """A batch request refused by the local rate limiter before reaching the provider."""
+
 
 def extract_lookup_headword(raw_content: str) -> str:
     """Extract the first non-empty line as the canonical English lookup headword."""
@@ -55,7 +87,7 @@ def _get_openai_compatible_client(
     base_url: str,
     missing_key_message: str,
 ) -> Optional[Any]:
-    """Build an OpenAI-compatible client for OpenAI-style endpoints."""
+    """Return the pooled OpenAI-compatible client for this endpoint and key, building it once."""
     if not OpenAI:
         st.error("❌ 未安装 OpenAI 库，无法使用 AI 功能。")
         return None
@@ -64,14 +96,53 @@ def _get_openai_compatible_client(
         st.error(missing_key_message)
         return None
 
-    try:
-        client_kwargs = {"api_key": api_key}
-        if base_url:
-            client_kwargs["base_url"] = base_url
-        return OpenAI(**client_kwargs)
-    except Exception as e:
-        ErrorHandler.handle(e, "初始化 AI 客户端失败")
+    pool_key = (base_url or "", hashlib.sha256(api_key.encode("utf-8")).hexdigest())
+    with _CLIENT_POOL_LOCK:
+        client = _CLIENT_POOL.get(pool_key)
+        if client is not None:
+            return client
+        try:
+            client_kwargs = {"api_key": api_key, "max_retries": constants.AI_HTTP_MAX_RETRIES}
+            if base_url:
+                client_kwargs["base_url"] = base_url
+            http_client = _build_http_client()
+            if http_client is not None:
+                client_kwargs["http_client"] = http_client
+            client = OpenAI(**client_kwargs)
+        except Exception as e:
+            ErrorHandler.handle(e, "初始化 AI 客户端失败")
+            return None
+        _CLIENT_POOL[pool_key] = client
+        return client
+
+
+def _build_http_client() -> Optional[Any]:
+    """Return an httpx client with the configured connection pool, or None to use the SDK default."""
+    if httpx is None:
         return None
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=constants.AI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=constants.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=constants.AI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(
+            constants.DEEPSEEK_REQUEST_TIMEOUT_SECONDS,
+            connect=constants.AI_HTTP_CONNECT_TIMEOUT_SECONDS,
+        ),
+    )
+
+
+def clear_ai_client_pool() -> None:
+    """Close and forget pooled clients, e.g. after the API key or base URL changes."""
+    with _CLIENT_POOL_LOCK:
+        clients = list(_CLIENT_POOL.values())
+        _CLIENT_POOL.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning("Closing AI client failed: %s", e)
 
 
 def get_ai_client() -> Optional[Any]:
@@ -110,38 +181,136 @@ def _sanitize_ai_error(error: Exception) -> str:
     return scrubbed
 
 
+def _usage_counts(usage: Any) -> Dict[str, int]:
+    """Read token counts from a response usage object (OpenAI or DeepSeek cache fields)."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) or getattr(usage, "prompt_cache_hit_tokens", None)
+    return {
+        "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+        "cached_prompt_tokens": int(cached or 0),
+        "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+    }
+
+
+def _stream_chat_completion(
+    client: Any,
+    model_name: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    on_delta: Callable[[str], None],
+) -> tuple[str, str, Any]:
+    """Stream a chat completion, passing each text delta on; return (content, model, usage)."""
+    stream = client.chat.completions.create(
+        model=model_name,
+        messages=messages,
+        temperature=temperature,
+        timeout=constants.DEEPSEEK_REQUEST_TIMEOUT_SECONDS,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    parts: List[str] = []
+    response_model = ""
+    usage = None
+    for chunk in stream:
+        response_model = response_model or getattr(chunk, "model", "")
+        usage = getattr(chunk, "usage", None) or usage
+        if not chunk.choices:
+            continue
+        delta = getattr(chunk.choices[0].delta, "content", None)
+        if delta:
+            parts.append(delta)
+            on_delta(delta)
+    return "".join(parts), response_model, usage
+
+
 def _call_ai_chat_completion(
     model_name: str,
     messages: List[Dict[str, str]],
     temperature: float,
+    *,
+    cfg: Optional[Dict[str, Any]] = None,
+    client: Optional[Any] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+    use_cache: bool = False,
 ) -> Dict[str, Any]:
-    """Call the active OpenAI-compatible chat completions endpoint."""
-    cfg = get_config()
-    client = _get_openai_compatible_client(
-        cfg["ai_api_key"],
-        cfg["ai_base_url"],
-        cfg["ai_missing_key_message"],
-    )
+    """Call the active OpenAI-compatible chat completions endpoint.
+
+    Worker threads pass a config snapshot and client built on the script
+    thread, so no Streamlit API is touched off that thread. With on_delta
+    the completion is streamed and each text fragment is passed to it as it
+    arrives; a cached response is passed in one piece.
+
+    The on-disk response cache is opt-in (use_cache=True) and meant for
+    deterministic definition lookups. Creative calls such as topic lists or
+    answers must not replay one output for the whole TTL, and card batches
+    are cached per word by their caller after validation.
+    """
+    cfg = cfg or get_config()
+    cache = get_ai_cache() if use_cache else None
+    cache_key = ""
+    if cache is not None:
+        cache_key = make_cache_key(cfg["ai_provider"], cfg["ai_base_url"], model_name, messages, temperature)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if on_delta is not None and cached.get("content"):
+                on_delta(cached["content"])
+            return {**cached, "cached": True}
+
+    if client is None:
+        client = _get_openai_compatible_client(
+            cfg["ai_api_key"],
+            cfg["ai_base_url"],
+            cfg["ai_missing_key_message"],
+        )
     if not client:
         return {"error": "AI client not available"}
 
+    guard = get_provider_guard(cfg["ai_provider"])
+    if not guard.breaker.allow():
+        return {"error": "AI 服务暂时不可用（连续失败或限流），请稍后再试。", "circuit_open": True}
+    reserved_tokens = estimate_prompt_tokens(messages) + constants.AI_RATE_LIMIT_COMPLETION_ESTIMATE
+    if not guard.acquire(reserved_tokens):
+        guard.breaker.release()
+        return {"error": "AI 请求过于频繁，已达到本地限速，请稍后再试。", "rate_limited": True}
+
     try:
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=messages,
-            temperature=temperature,
-            timeout=constants.DEEPSEEK_REQUEST_TIMEOUT_SECONDS,
-        )
-        content = response.choices[0].message.content
-        return {
+        started = time.monotonic()
+        if on_delta is None:
+            response = client.chat.completions.create(
+                model=model_name,
+                messages=messages,
+                temperature=temperature,
+                timeout=constants.DEEPSEEK_REQUEST_TIMEOUT_SECONDS,
+            )
+            content = response.choices[0].message.content
+            response_model = getattr(response, "model", "")
+            usage = getattr(response, "usage", None)
+        else:
+            content, response_model, usage = _stream_chat_completion(
+                client, model_name, messages, temperature, on_delta
+            )
+        result = {
             "content": content,
-            "model": str(getattr(response, "model", "") or model_name),
+            "model": str(response_model or model_name),
             "base_url": cfg["ai_base_url"],
             "provider": cfg["ai_provider"],
+            **_usage_counts(usage),
         }
+        guard.breaker.record_success()
+        used_tokens = result["prompt_tokens"] + result["completion_tokens"]
+        if used_tokens:
+            guard.tokens.charge(used_tokens - reserved_tokens)
+        if cache is not None and content:
+            cache.put(cache_key, result)
+        return {**result, "elapsed_seconds": time.monotonic() - started}
     except Exception as e:
         logger.error("AI API request failed: %s", e)
-        return {"error": _sanitize_ai_error(e)}
+        retryable = is_retryable_error(e)
+        if retryable:
+            guard.breaker.record_failure()
+        else:
+            guard.breaker.release()
+        return {"error": _sanitize_ai_error(e), "retryable": retryable}
 
 
 def _call_deepseek_chat_completion(
@@ -181,8 +350,34 @@ def _definition_instruction(definition_language: str) -> str:
     return "Use only the single most common core meaning. Concise Simplified Chinese only."
 
 
+def _lookup_flight_key(kind: str, word: str) -> tuple:
+    """Key identical lookups by normalized word, prompt version, endpoint and model."""
+    cfg = get_config()
+    normalized = " ".join(str(word or "").split()).lower()
+    return (
+        kind,
+        normalized,
+        constants.LOOKUP_PROMPT_VERSION,
+        cfg["ai_provider"],
+        cfg["ai_base_url"],
+        str(cfg["ai_model"]).strip(),
+    )
+
+
+def _coalesced_lookup(kind: str, word: str, fetch: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+    """Share one in-flight AI lookup between concurrent sessions asking for the same word."""
+    result, shared = LOOKUP_FLIGHTS.do(_lookup_flight_key(kind, word), lambda: fetch(word))
+    if shared:
+        logger.info("Reused in-flight %s lookup for %r", kind, word)
+    return dict(result)
+
+
 def get_word_quick_definition(word: str) -> Dict[str, Any]:
     """Get a concise Chinese meaning and vivid etymology story."""
+    return _coalesced_lookup("quick", word, _fetch_word_quick_definition)
+
+
+def _fetch_word_quick_definition(word: str) -> Dict[str, Any]:
     vocab_dict = get_vocab_dict()
     model_name = get_ai_model()
     system_prompt = """You are a top-tier human linguistics professor, film director, and modern storyteller for a Chinese-speaking English learner.
@@ -278,7 +473,8 @@ Write only the three required sections for the input term above. Do not ask for
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
-            0.15
+            0.15,
+            use_cache=True,
         )
         if "error" in response:
             return {"error": response["error"]}
@@ -294,7 +490,8 @@ Return only the three required sections for its Chinese meaning, bottom logic, a
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": retry_prompt}
                 ],
-                0.1
+                0.1,
+                use_cache=True,
             )
             if "error" in response:
                 return {"error": response["error"]}
@@ -310,14 +507,83 @@ Return only the three required sections for its Chinese meaning, bottom logic, a
         return {"error": str(e)}
 
 
-def get_word_simple_definition(word: str) -> Dict[str, Any]:
-    """Get a compact dictionary entry or reverse lookup for a Chinese gloss."""
-    vocab_dict = get_vocab_dict()
-    model_name = get_ai_model()
-    normalized_word = str(word or "").strip()
-    if not normalized_word:
+def get_word_simple_definition(word: str, policy: Optional[str] = None) -> Dict[str, Any]:
+    """Get a compact dictionary entry or reverse lookup for a Chinese gloss.
+
+    The lookup policy (constants.LOOKUP_POLICIES) decides which of the local
+    lexicon, the response cache and the AI are tried, in order.
+    """
+    if not str(word or "").strip():
         return {"error": "Lookup input is required"}
+    return SIMPLE_LOOKUP.lookup(word, policy)
+
+
+def _local_simple_definition(word: str) -> Optional[Dict[str, Any]]:
+    """Answer an English lookup from the local card lexicon, or None to fall through.
+
+    The answer follows the AI layout ("1. 中文释义 | English meaning"). The
+    built lexicon has no Chinese column, so the part of speech stands in for
+    the gloss unless an entry carries chinese_definition; the phonetic is
+    shown when present.
+    """
+    normalized_word = str(word or "").strip()
+    if not normalized_word or re.search(r"[\u4e00-\u9fff]", normalized_word):
+        return None
+    entry = lookup_local_card_entry(normalized_word.lower())
+    if entry is None or (constants.LOOKUP_LOCAL_REQUIRE_EXAMPLE and not entry.get("example")):
+        return None
+    gloss = entry.get("chinese_definition", "").strip() or entry.get("pos", "").strip()
+    phonetic = entry.get("phonetic", "").strip().strip("/")
+
+    headword = entry.get("word") or entry["normalized_word"]
+    meaning = " | ".join(part for part in (gloss, entry["english_definition"]) if part)
+    lines = [f"{headword} /{phonetic}/" if phonetic else headword, f"1. {meaning}"]
+    if entry.get("example"):
+        lines.append(f"• {entry['example']}")
+    if entry.get("example_translation"):
+        lines.append(entry["example_translation"])
+    return {
+        "result": "\n".join(lines),
+        "headword": entry["normalized_word"],
+        "rank": get_vocab_dict().get(entry["normalized_word"], 99999),
+        "is_question": False,
+    }
+
+
+def _cached_simple_definition(word: str) -> Optional[Dict[str, Any]]:
+    """Answer from the persistent AI response cache without calling the AI."""
+    cache = get_ai_cache()
+    normalized_word = str(word or "").strip()
+    if cache is None or not normalized_word:
+        return None
+    cfg = get_config()
+    cached = cache.get(
+        make_cache_key(
+            cfg["ai_provider"],
+            cfg["ai_base_url"],
+            str(cfg["ai_model"]).strip(),
+            _simple_definition_messages(normalized_word),
+            0.2,
+        )
+    )
+    if not cached or not cached.get("content"):
+        return None
+    return _simple_definition_result(cached["content"], normalized_word)
+
+
+def _ai_simple_definition(word: str) -> Dict[str, Any]:
+    return _coalesced_lookup("simple", word, _fetch_word_simple_definition)
+
+
+SIMPLE_LOOKUP = TieredLookup({
+    "local": _local_simple_definition,
+    "cache": _cached_simple_definition,
+    "ai": _ai_simple_definition,
+})
+
 
+def _simple_definition_messages(normalized_word: str) -> List[Dict[str, str]]:
+    """Build the chat messages for a simple lookup; also used as the cache key."""
     system_prompt = """You are a strict concise English dictionary formatter for a Chinese-speaking learner.
 
 Task:
@@ -400,24 +666,35 @@ Chinese input reference example:
 
 Return the concise lookup result for the input above."""
 
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _simple_definition_result(content: str, normalized_word: str) -> Dict[str, Any]:
+    headword = extract_lookup_headword(content) or normalized_word.lower()
+    return {
+        "result": content,
+        "headword": headword,
+        "rank": get_vocab_dict().get(headword, 99999),
+        "is_question": False,
+    }
+
+
+def _fetch_word_simple_definition(word: str) -> Dict[str, Any]:
+    model_name = get_ai_model()
+    normalized_word = str(word or "").strip()
+    if not normalized_word:
+        return {"error": "Lookup input is required"}
+
     try:
         response = _call_ai_chat_completion(
-            model_name,
-            [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            0.2,
+            model_name, _simple_definition_messages(normalized_word), 0.2, use_cache=True
         )
         if "error" in response:
             return {"error": response["error"]}
-        headword = extract_lookup_headword(response.get("content", "")) or normalized_word.lower()
-        return {
-            "result": response.get("content", ""),
-            "headword": headword,
-            "rank": vocab_dict.get(headword, 99999),
-            "is_question": False,
-        }
+        return _simple_definition_result(response.get("content", ""), normalized_word)
     except Exception as e:
         logger.error("Error getting simple definition: %s", e)
         return {"error": str(e)}
@@ -644,22 +921,18 @@ Candidate list:
         return {"error": str(e)}
 
 
-def process_ai_in_batches(
-    words_list: List[str],
-    example_count: int = constants.AI_CARD_EXAMPLE_COUNT_DEFAULT,
-    definition_language: str = "中文",
-    translate_examples: bool = False,
-    progress_callback: Optional[Callable[[int, int], None]] = None,
-    card_template: str = constants.DEFAULT_CARD_TEMPLATE,
-    meaning_overrides: Optional[Dict[str, str]] = None,
-) -> Optional[str]:
-    """Process words in batches using AI with progress reporting."""
-    words_list = words_list[:constants.MAX_AUTO_LIMIT]
-    meaning_overrides = meaning_overrides or {}
-    example_count = max(
-        constants.AI_CARD_EXAMPLE_COUNT_MIN,
-        min(int(example_count), constants.AI_CARD_EXAMPLE_COUNT_MAX)
-    )
+@lru_cache(maxsize=32)
+def _card_system_prompt(
+    card_template: str,
+    example_count: int,
+    definition_language: str,
+    translate_examples: bool,
+) -> str:
+    """Return the static card-generation rules, shared by every batch of a run.
+
+    Only the input items and local meanings go into the per-batch user
+    message, so the identical system prefix can hit provider prompt caches.
+    """
     definition_language = _normalize_definition_language(definition_language)
     definition_rule = _definition_instruction(definition_language)
     template_specific_rules = ""
@@ -711,38 +984,12 @@ Template 3 strict rules:
         else "Briefly explain root, affix, or origin in Simplified Chinese."
     )
 
-    model_name = get_ai_model()
-    total_words = len(words_list)
-    full_results = []
-    failed_batches: list[str] = []
-
-    system_prompt = "You are a strict Anki vocabulary card generator."
-
-    for i in range(0, total_words, constants.AI_BATCH_SIZE):
-        batch = words_list[i:i + constants.AI_BATCH_SIZE]
-        current_batch_str = "\n".join(batch)
-        batch_meaning_overrides = []
-        for word in batch:
-            override = meaning_overrides.get(word) or meaning_overrides.get(word.lower())
-            if override:
-                batch_meaning_overrides.append(f"{word} => {override}")
-        local_meaning_block = ""
-        local_meaning_rule = ""
-        if batch_meaning_overrides:
-            local_meaning_block = "Local dictionary meanings:\n" + "\n".join(batch_meaning_overrides) + "\n\n"
-            local_meaning_rule = (
-                "- If an input item appears in Local dictionary meanings, copy that meaning exactly into field 3.\n"
-                "- For those items, field 4 examples must illustrate the local dictionary meaning, not another sense.\n"
-            )
+    return f"""You are a strict Anki vocabulary card generator.
 
-        user_prompt = f"""Task:
-Convert the input word or phrase list into Anki card data.
+Task:
+Convert the word or phrase list under "Input items" in the user message into Anki card data.
 The selected card template is: {constants.CARD_TEMPLATES.get(card_template, constants.CARD_TEMPLATES[constants.DEFAULT_CARD_TEMPLATE])["label"]}.
 
-Input items:
-{current_batch_str}
-
-{local_meaning_block}\
 Output rules:
 - Output only one ```text code block.
 - One input item per line.
@@ -762,7 +1009,8 @@ Field requirements:
 1. Word/Phrase: English word or phrase, preferably lowercase.
 2. Pronunciation: leave this field empty. Keep the field separator, but write no text in this field.
 3. Meaning: {definition_rule}
-{local_meaning_rule}\
+- If an input item appears in Local dictionary meanings, copy that meaning exactly into field 3.
+- For those items, field 4 examples must illustrate the local dictionary meaning, not another sense.
 4. English Example(s): generate exactly {example_count} natural, moderately detailed English example sentence(s) for the same core meaning as field 3. Each example must be self-contained and reveal the meaning through concrete context.
 5. Example Translation(s): {translation_rule}
 6. Etymology: {etymology_rule}
@@ -788,7 +1036,99 @@ For template 3, field 4 must contain the target word or phrase so the app can co
 {template_specific_rules}
 Output only the text code block."""
 
+
+def _count_complete_cards(cards: List[Dict[str, str]], batch: List[str]) -> int:
+    """Count batch words that came back with a meaning and an example."""
+    wanted = {word.strip().lower() for word in batch}
+    complete = set()
+    for card in cards:
+        key = str(card.get("w", "")).strip().lower()
+        if key in wanted and str(card.get("m", "")).strip() and str(card.get("e", "")).strip():
+            complete.add(key)
+    return len(complete)
+
+
+def process_ai_in_batches(
+    words_list: List[str],
+    example_count: int = constants.AI_CARD_EXAMPLE_COUNT_DEFAULT,
+    definition_language: str = "中文",
+    translate_examples: bool = False,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    card_template: str = constants.DEFAULT_CARD_TEMPLATE,
+    meaning_overrides: Optional[Dict[str, str]] = None,
+    batch_size: Optional[int] = None,
+    card_callback: Optional[Callable[[List[Dict[str, str]]], None]] = None,
+) -> Optional[str]:
+    """Process words in batches using AI with progress reporting.
+
+    Without an explicit batch_size the provider's adaptive size is used, and
+    every batch outcome is fed back into it. Batches are streamed and parsed
+    line by line; card_callback receives each group of newly finished cards
+    on the calling thread while the batches are still running.
+    """
+    words_list = words_list[:constants.MAX_AUTO_LIMIT]
+    meaning_overrides = meaning_overrides or {}
+    example_count = max(
+        constants.AI_CARD_EXAMPLE_COUNT_MIN,
+        min(int(example_count), constants.AI_CARD_EXAMPLE_COUNT_MAX)
+    )
+
+    if not words_list:
+        return ""
+    cfg = get_config()
+    model_name = str(cfg["ai_model"]).strip()
+    total_words = len(words_list)
+    failed_batches: list[str] = []
+    client = _get_openai_compatible_client(
+        cfg["ai_api_key"],
+        cfg["ai_base_url"],
+        cfg["ai_missing_key_message"],
+    )
+    if not client:
+        return None
+
+    system_prompt = _card_system_prompt(card_template, example_count, definition_language, bool(translate_examples))
+
+    finished_cards: "queue.Queue[List[Dict[str, str]]]" = queue.Queue()
+    abandoned = threading.Event()
+    provider = cfg["ai_provider"]
+    if batch_size is None:
+        batch_size = BATCH_SIZER.next_size(provider)
+    batch_size = max(1, int(batch_size))
+
+    def run_batch(batch: List[str]) -> Dict[str, Any]:
+        """Build the prompt for one batch and call the AI with retries (worker thread)."""
+        current_batch_str = "\n".join(batch)
+        batch_meaning_overrides = []
+        for word in batch:
+            override = meaning_overrides.get(word) or meaning_overrides.get(word.lower())
+            if override:
+                batch_meaning_overrides.append(f"{word} => {override}")
+        local_meaning_block = ""
+        if batch_meaning_overrides:
+            local_meaning_block = "Local dictionary meanings:\n" + "\n".join(batch_meaning_overrides) + "\n\n"
+
+        user_prompt = f"""Input items:
+{current_batch_str}
+
+{local_meaning_block}\
+Output only the text code block."""
+
+        # Phrases already relayed by an earlier, failed attempt are not relayed again.
+        relayed_phrases: set = set()
         for attempt in range(constants.MAX_RETRIES):
+            if abandoned.is_set():
+                raise _AIRequestAborted("AI batch abandoned by the caller")
+            parser = IncrementalCardParser()
+            batch_cards: List[Dict[str, str]] = []
+
+            def emit(cards: List[Dict[str, str]]) -> None:
+                batch_cards.extend(cards)
+                new_cards = [card for card in cards if card['w'].lower() not in relayed_phrases]
+                if new_cards:
+                    relayed_phrases.update(card['w'].lower() for card in new_cards)
+                    finished_cards.put(new_cards)
+
             try:
                 response = _call_ai_chat_completion(
                     model_name,
@@ -796,33 +1136,118 @@ Output only the text code block."""
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_prompt}
                     ],
-                    0.4
+                    0.4,
+                    cfg=cfg,
+                    client=client,
+                    on_delta=lambda delta: emit(parser.feed(delta)),
                 )
                 if "error" in response:
+                    if response.get("circuit_open") or response.get("retryable") is False:
+                        raise _AIRequestAborted(response["error"])
+                    if response.get("rate_limited"):
+                        raise _AIRequestRejected(response["error"])
                     raise RuntimeError(response["error"])
 
                 content = response.get("content", "")
                 if not content:
                     raise RuntimeError("AI 返回了空内容")
-                full_results.append(content)
-
-                if progress_callback:
-                    processed_count = min(i + constants.AI_BATCH_SIZE, total_words)
-                    progress_callback(processed_count, total_words)
+                emit(parser.finish())
+                return {**response, "cards": batch_cards}
 
-                break
-
-            except Exception as e:
+            except _AIRequestAborted:
+                raise
+            except Exception:
                 if attempt < constants.MAX_RETRIES - 1:
-                    time.sleep(1 + attempt)
+                    time.sleep(backoff_delay(attempt))
                     continue
-                else:
+                raise
+        raise RuntimeError("AI batch was not attempted")
+
+    batches = [
+        words_list[i:i + batch_size]
+        for i in range(0, total_words, batch_size)
+    ]
+    results_by_index: Dict[int, str] = {}
+    processed_count = 0
+    max_workers = max(1, min(constants.AI_MAX_CONCURRENT_BATCHES, len(batches)))
+
+    def relay_finished_cards() -> None:
+        while True:
+            try:
+                cards = finished_cards.get_nowait()
+            except queue.Empty:
+                return
+            if card_callback:
+                card_callback(cards)
+
+    # Up to max_workers batches are in flight; streamed cards, results and
+    # progress are relayed here on the calling (script) thread, and results
+    # are joined in batch order. A callback interrupted by a Streamlit rerun
+    # or stop must not leave the script waiting for queued batches, so
+    # shutdown only waits on success.
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-batch")
+    finished = False
+    try:
+        futures = {executor.submit(run_batch, batch): index for index, batch in enumerate(batches)}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=constants.AI_STREAM_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            relay_finished_cards()
+            for future in sorted(done, key=futures.get):
+                index = futures[future]
+                batch = batches[index]
+                try:
+                    response = future.result()
+                except Exception as e:
+                    # Local refusals (open circuit, rate limiter) and aborted requests say
+                    # nothing about how large a batch the provider can handle.
+                    if not isinstance(e, (_AIRequestAborted, _AIRequestRejected)):
+                        BATCH_SIZER.record(provider, len(batch), 0, 0.0, failed=True)
                     failed_batches.append(", ".join(batch))
                     ErrorHandler.handle(
                         e,
-                        f"Batch {i//constants.AI_BATCH_SIZE + 1} failed after {constants.MAX_RETRIES} attempts",
+                        f"Batch {index + 1} failed after {constants.MAX_RETRIES} attempts",
                         show_user=False
                     )
+                    continue
+
+                results_by_index[index] = response["content"]
+                complete_count = _count_complete_cards(response["cards"], batch)
+                BATCH_SIZER.record(
+                    provider,
+                    len(batch),
+                    complete_count,
+                    float(response.get("elapsed_seconds", 0.0)),
+                    response.get("completion_tokens"),
+                )
+                USAGE_TRACKER.record(
+                    card_template,
+                    provider,
+                    int(response.get("prompt_tokens", 0)),
+                    int(response.get("cached_prompt_tokens", 0)),
+                    int(response.get("completion_tokens", 0)),
+                    complete_count,
+                )
+                logger.info(
+                    "AI batch %d: %d prompt tokens (%d cached), %d completion tokens, %d/%d complete cards",
+                    index + 1,
+                    response.get("prompt_tokens", 0),
+                    response.get("cached_prompt_tokens", 0),
+                    response.get("completion_tokens", 0),
+                    complete_count,
+                    len(batch),
+                )
+                processed_count += len(batch)
+                if progress_callback:
+                    progress_callback(processed_count, total_words)
+        finished = True
+    finally:
+        if not finished:
+            abandoned.set()
+        executor.shutdown(wait=finished, cancel_futures=not finished)
+
+    relay_finished_cards()
+    full_results = [results_by_index[index] for index in sorted(results_by_index)]
 
     if failed_batches:
         logger.warning("AI card batches failed after retries: %s", failed_batches)
@@ -0,0 +1,129 @@
+# Adaptive AI card batch sizing from per-provider latency and failure telemetry.
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import constants
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProviderTelemetry:
+    """Smoothed batch outcomes for one AI provider."""
+
+    batch_size: float = float(constants.AI_BATCH_SIZE)
+    tokens_per_second: float = 0.0
+    tokens_per_word: float = 0.0
+    seconds_per_batch: float = 0.0
+    batches: int = 0
+    failures: int = 0
+    incomplete_words: int = 0
+
+
+def _ewma(previous: float, value: float) -> float:
+    if previous <= 0:
+        return value
+    alpha = constants.AI_BATCH_TELEMETRY_ALPHA
+    return alpha * value + (1 - alpha) * previous
+
+
+class AdaptiveBatchSizer:
+    """Grow batches additively while they come back complete and fast; halve them on trouble.
+
+    The size is also capped so the expected output (tokens per word times
+    batch size) stays under the provider's output budget, which is what
+    truncated long batches before.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._providers: Dict[str, ProviderTelemetry] = {}
+
+    def _telemetry(self, provider: str) -> ProviderTelemetry:
+        telemetry = self._providers.get(provider)
+        if telemetry is None:
+            telemetry = self._providers[provider] = ProviderTelemetry()
+        return telemetry
+
+    def _token_cap(self, provider: str, telemetry: ProviderTelemetry) -> int:
+        budget = constants.AI_BATCH_OUTPUT_TOKEN_BUDGET.get(
+            provider,
+            constants.AI_BATCH_OUTPUT_TOKEN_BUDGET["default"],
+        )
+        if telemetry.tokens_per_word <= 0:
+            return constants.AI_BATCH_SIZE_MAX
+        return max(constants.AI_BATCH_SIZE_MIN, int(budget / telemetry.tokens_per_word))
+
+    def next_size(self, provider: str) -> int:
+        """Return the batch size to use for the provider's next round."""
+        with self._lock:
+            telemetry = self._telemetry(provider)
+            size = min(int(telemetry.batch_size), self._token_cap(provider, telemetry))
+        return max(constants.AI_BATCH_SIZE_MIN, min(size, constants.AI_BATCH_SIZE_MAX))
+
+    def record(
+        self,
+        provider: str,
+        words: int,
+        complete_words: int,
+        elapsed_seconds: float,
+        completion_tokens: Optional[int] = None,
+        failed: bool = False,
+    ) -> None:
+        """Feed one batch outcome back into the provider's size and throughput estimates."""
+        if words <= 0:
+            return
+        with self._lock:
+            telemetry = self._telemetry(provider)
+            telemetry.batches += 1
+            if failed:
+                telemetry.failures += 1
+                telemetry.batch_size = max(constants.AI_BATCH_SIZE_MIN, telemetry.batch_size / 2)
+                return
+
+            telemetry.incomplete_words += max(words - complete_words, 0)
+            telemetry.seconds_per_batch = _ewma(telemetry.seconds_per_batch, elapsed_seconds)
+            if completion_tokens:
+                telemetry.tokens_per_word = _ewma(telemetry.tokens_per_word, completion_tokens / words)
+                if elapsed_seconds > 0:
+                    telemetry.tokens_per_second = _ewma(
+                        telemetry.tokens_per_second,
+                        completion_tokens / elapsed_seconds,
+                    )
+
+            complete_ratio = complete_words / words
+            if complete_ratio < constants.AI_BATCH_MIN_COMPLETE_RATIO:
+                telemetry.batch_size = max(constants.AI_BATCH_SIZE_MIN, telemetry.batch_size / 2)
+            elif elapsed_seconds > constants.AI_BATCH_TARGET_SECONDS:
+                telemetry.batch_size = max(constants.AI_BATCH_SIZE_MIN, telemetry.batch_size * 0.75)
+            elif complete_words == words:
+                telemetry.batch_size = min(
+                    float(constants.AI_BATCH_SIZE_MAX),
+                    telemetry.batch_size + constants.AI_BATCH_SIZE_STEP,
+                )
+
+    def snapshot(self, provider: str) -> Dict[str, float]:
+        """Return the provider's current estimates for display or logging."""
+        with self._lock:
+            telemetry = self._telemetry(provider)
+            return {
+                "batch_size": float(min(int(telemetry.batch_size), self._token_cap(provider, telemetry))),
+                "tokens_per_second": telemetry.tokens_per_second,
+                "tokens_per_word": telemetry.tokens_per_word,
+                "seconds_per_batch": telemetry.seconds_per_batch,
+                "batches": float(telemetry.batches),
+                "failures": float(telemetry.failures),
+                "incomplete_words": float(telemetry.incomplete_words),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._providers.clear()
+
+
+# Shared by every session in this process, so each deck starts from what
+# earlier runs learned about the provider.
+BATCH_SIZER = AdaptiveBatchSizer()
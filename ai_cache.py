@@ -0,0 +1,229 @@
+# Persistent, content-addressed cache for AI chat completion responses.
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import constants
+
+logger = logging.getLogger(__name__)
+
+AI_CACHE_DIR = os.environ.get(
+    "VOCABFLOW_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), constants.AI_CACHE_SUBDIR),
+)
+
+
+def make_cache_key(
+    provider: str,
+    base_url: str,
+    model_name: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+) -> str:
+    """Hash everything that determines a completion into a stable cache key.
+
+    The full prompt text is part of the key, so editing a prompt template
+    invalidates its entries; AI_CACHE_VERSION drops everything at once.
+    """
+    payload = json.dumps(
+        {
+            "version": constants.AI_CACHE_VERSION,
+            "provider": provider,
+            "base_url": base_url,
+            "model": model_name,
+            "temperature": round(float(temperature), 3),
+            "messages": messages,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_card_params_key(**params: Any) -> str:
+    """Hash the generation settings a cached card depends on."""
+    payload = json.dumps({"version": constants.AI_CACHE_VERSION, **params}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AIResponseCache:
+    """SQLite-backed response and per-word card store with TTL expiry and LRU pruning.
+
+    Each thread gets its own connection; WAL mode lets several Streamlit
+    processes share one database file.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cards ("
+                "params TEXT NOT NULL, word TEXT NOT NULL, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (params, word))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cards_accessed ON cards(accessed_at)")
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached response, or None on miss, expiry or cache failure."""
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return json.loads(row[0])
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning("AI cache read failed: %s", e)
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a response; failures are logged and otherwise ignored."""
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            conn.commit()
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            logger.warning("AI cache write failed: %s", e)
+            return
+        self._count_writes(1)
+
+    def _count_writes(self, count: int) -> None:
+        """Prune once every AI_CACHE_PRUNE_EVERY stored rows."""
+        with self._lock:
+            self._writes_since_prune += count
+            should_prune = self._writes_since_prune >= constants.AI_CACHE_PRUNE_EVERY
+            if should_prune:
+                self._writes_since_prune = 0
+        if should_prune:
+            self.prune()
+
+    def get_cards(self, params: str, words: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return fresh cached cards for words generated with the same params."""
+        if not words:
+            return {}
+        now = time.time()
+        cards: Dict[str, Dict[str, Any]] = {}
+        try:
+            conn = self._connection()
+            unique_words = list(dict.fromkeys(words))
+            for start in range(0, len(unique_words), 500):
+                chunk = unique_words[start:start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT word, value FROM cards WHERE params = ? AND created_at >= ? AND word IN ({placeholders})",
+                    (params, now - self.ttl_seconds, *chunk),
+                ).fetchall()
+                cards.update((word, json.loads(value)) for word, value in rows)
+            if cards:
+                conn.executemany(
+                    "UPDATE cards SET accessed_at = ? WHERE params = ? AND word = ?",
+                    [(now, params, word) for word in cards],
+                )
+                conn.commit()
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning("AI card cache read failed: %s", e)
+            return {}
+        return cards
+
+    def put_cards(self, params: str, cards: Dict[str, Dict[str, Any]]) -> None:
+        """Store cards by word for params; failures are logged and otherwise ignored."""
+        if not cards:
+            return
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO cards (params, word, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                [(params, word, json.dumps(card, ensure_ascii=False), now, now) for word, card in cards.items()],
+            )
+            conn.commit()
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            logger.warning("AI card cache write failed: %s", e)
+            return
+        self._count_writes(len(cards))
+
+    def prune(self) -> int:
+        """Delete expired rows and the least recently used rows over max_entries, per table."""
+        try:
+            conn = self._connection()
+            deleted = 0
+            for table, key_columns in (("responses", "key"), ("cards", "params, word")):
+                deleted += conn.execute(
+                    f"DELETE FROM {table} WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,),
+                ).rowcount
+                deleted += conn.execute(
+                    f"DELETE FROM {table} WHERE ({key_columns}) IN ("
+                    f"SELECT {key_columns} FROM {table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                ).rowcount
+            conn.commit()
+            return deleted
+        except sqlite3.Error as e:
+            logger.warning("AI cache prune failed: %s", e)
+            return 0
+
+    def clear(self) -> None:
+        try:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.execute("DELETE FROM cards")
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("AI cache clear failed: %s", e)
+
+
+_AI_CACHE: Optional[AIResponseCache] = None
+_AI_CACHE_LOCK = threading.Lock()
+
+
+def get_ai_cache() -> Optional[AIResponseCache]:
+    """Return the process-wide response cache, or None when it is disabled."""
+    global _AI_CACHE
+    if not constants.AI_CACHE_ENABLED:
+        return None
+    with _AI_CACHE_LOCK:
+        if _AI_CACHE is None:
+            _AI_CACHE = AIResponseCache(
+                os.path.join(AI_CACHE_DIR, constants.AI_CACHE_DB_NAME),
+                constants.AI_CACHE_TTL_SECONDS,
+                constants.AI_CACHE_MAX_ENTRIES,
+            )
+        return _AI_CACHE
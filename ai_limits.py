@@ -0,0 +1,171 @@
+# Provider-aware rate limiting, circuit breaking and retry backoff for AI requests.
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import constants
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    ceiling = min(
+        constants.AI_RETRY_BACKOFF_MAX_SECONDS,
+        constants.AI_RETRY_BACKOFF_BASE_SECONDS * (2 ** max(attempt, 0)),
+    )
+    return random.uniform(0, ceiling)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Throttling, timeouts, connection drops and 5xx are worth retrying; bad keys or requests are not."""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    lowered = f"{type(error).__name__} {error}".lower()
+    return any(marker in lowered for marker in ("timeout", "timed out", "connection", "rate limit", "429", "overloaded"))
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute, holding at most capacity.
+
+    The level may go negative when a request is charged more than it
+    reserved, which delays the following requests accordingly.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None) -> None:
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def acquire(self, amount: float, timeout: float) -> bool:
+        """Take amount, waiting up to timeout seconds for it; False if it would take longer."""
+        amount = min(amount, self.capacity)
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._level >= amount:
+                    self._level -= amount
+                    return True
+                wait = (amount - self._level) / self.rate_per_second if self.rate_per_second > 0 else timeout
+            if now + wait > deadline:
+                return False
+            time.sleep(min(wait, 1.0))
+
+    def charge(self, amount: float) -> None:
+        """Adjust the level after the fact (negative amounts refund)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level - amount)
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive retryable failures; one probe is let through after a jittered cooldown.
+
+    Each time a probe fails the cooldown doubles, up to AI_BREAKER_MAX_COOLDOWN_SECONDS.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._trips = 0
+        self._opened_until = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._failures < self.failure_threshold:
+                return "closed"
+            return "open" if time.monotonic() < self._opened_until else "half_open"
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent now."""
+        with self._lock:
+            if self._failures < self.failure_threshold:
+                return True
+            if time.monotonic() < self._opened_until or self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trips = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._failures >= self.failure_threshold:
+                cooldown = min(
+                    constants.AI_BREAKER_MAX_COOLDOWN_SECONDS,
+                    self.base_cooldown * (2 ** self._trips),
+                )
+                self._trips += 1
+                self._opened_until = time.monotonic() + random.uniform(0.5 * cooldown, cooldown)
+                logger.warning("AI circuit opened for %.0fs after %d failures", cooldown, self._failures)
+
+    def release(self) -> None:
+        """Forget a probe that ended without a verdict (e.g. a non-retryable error)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class ProviderGuard:
+    """Request and token budgets plus a circuit breaker for one provider."""
+
+    def __init__(self, limits: Dict[str, Any]) -> None:
+        self.requests = TokenBucket(limits["requests_per_minute"])
+        self.tokens = TokenBucket(limits["tokens_per_minute"])
+        self.breaker = CircuitBreaker(
+            constants.AI_BREAKER_FAILURE_THRESHOLD,
+            constants.AI_BREAKER_COOLDOWN_SECONDS,
+        )
+
+    def acquire(self, estimated_tokens: int) -> bool:
+        timeout = constants.AI_RATE_LIMIT_WAIT_SECONDS
+        if not self.requests.acquire(1, timeout):
+            return False
+        if not self.tokens.acquire(estimated_tokens, timeout):
+            self.requests.charge(-1)
+            return False
+        return True
+
+
+_GUARDS: Dict[str, ProviderGuard] = {}
+_GUARDS_LOCK = threading.Lock()
+
+
+def get_provider_guard(provider: str) -> ProviderGuard:
+    """Return the process-wide guard shared by every session using provider."""
+    with _GUARDS_LOCK:
+        guard = _GUARDS.get(provider)
+        if guard is None:
+            limits = constants.AI_RATE_LIMITS.get(provider, constants.AI_RATE_LIMITS["default"])
+            guard = _GUARDS[provider] = ProviderGuard(limits)
+        return guard
+
+
+def is_circuit_open(provider: str) -> bool:
+    return get_provider_guard(provider).breaker.state == "open"
+
+
+def estimate_prompt_tokens(messages: Any) -> int:
+    """Rough prompt size: about three characters per token across English and Chinese text."""
+    return sum(len(str(message.get("content", ""))) for message in messages) // 3 + 1
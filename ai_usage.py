@@ -0,0 +1,85 @@
+# Token and cost accounting for AI card generation, per card template.
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import constants
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_cost(provider: str, prompt_tokens: int, cached_prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate the USD cost of one request; 0.0 for providers without a price entry."""
+    prices = constants.AI_TOKEN_PRICES_USD_PER_MILLION.get(provider)
+    if not prices:
+        return 0.0
+    cached_prompt_tokens = min(cached_prompt_tokens, prompt_tokens)
+    return (
+        (prompt_tokens - cached_prompt_tokens) * prices["input"]
+        + cached_prompt_tokens * prices["cached_input"]
+        + completion_tokens * prices["output"]
+    ) / 1_000_000
+
+
+@dataclass
+class TemplateUsage:
+    batches: int = 0
+    cards: int = 0
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+class AIUsageTracker:
+    """Accumulate prompt/completion tokens and estimated cost of card batches by template."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._templates: Dict[str, TemplateUsage] = {}
+
+    def record(
+        self,
+        card_template: str,
+        provider: str,
+        prompt_tokens: int,
+        cached_prompt_tokens: int,
+        completion_tokens: int,
+        cards: int,
+    ) -> None:
+        with self._lock:
+            usage = self._templates.setdefault(card_template, TemplateUsage())
+            usage.batches += 1
+            usage.cards += cards
+            usage.prompt_tokens += prompt_tokens
+            usage.cached_prompt_tokens += cached_prompt_tokens
+            usage.completion_tokens += completion_tokens
+            usage.cost_usd += estimate_cost(provider, prompt_tokens, cached_prompt_tokens, completion_tokens)
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Return one row per template with totals and per-card averages."""
+        with self._lock:
+            rows = []
+            for card_template, usage in self._templates.items():
+                cards = max(usage.cards, 1)
+                rows.append({
+                    "template": card_template,
+                    "batches": usage.batches,
+                    "cards": usage.cards,
+                    "prompt_tokens": usage.prompt_tokens,
+                    "cached_prompt_tokens": usage.cached_prompt_tokens,
+                    "completion_tokens": usage.completion_tokens,
+                    "tokens_per_card": (usage.prompt_tokens + usage.completion_tokens) / cards,
+                    "cost_usd": usage.cost_usd,
+                    "cost_per_card_usd": usage.cost_usd / cards,
+                })
+            return rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+
+USAGE_TRACKER = AIUsageTracker()
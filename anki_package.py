@@ -3,17 +3,18 @@
 import html
 import logging
 import os
-import random
 import tempfile
 import time
 import zlib
 import re
+import threading
 from typing import Dict, List, Optional
 
 import constants
 from errors import ProgressCallback
 from resources import get_genanki
-from tts import run_async_batch
+from tts import TTSJob, TTSWorker, get_tts_worker, run_async_batch
+from tts_cache import get_tts_cache, make_tts_key
 from utils import safe_str_clean
 
 logger = logging.getLogger(__name__)
@@ -384,6 +385,134 @@ def cleanup_old_apkg_files(max_age_seconds: int = constants.APKG_CLEANUP_MAX_AGE
         pass
 
 
+def _plan_audio_task(
+    audio_jobs: Dict[str, Dict[str, str]],
+    text: str,
+    voice: str,
+    tmp_dir: str,
+    name_prefix: str,
+    suffix: str,
+) -> tuple[str, str]:
+    """Return (path, media filename) for a clip, adding a job only for a new (text, voice) pair.
+
+    Filenames carry the clip's content hash, so cards sharing a clip share
+    one media file and different clips never collide in the collection.
+    """
+    key = make_tts_key(text, voice)
+    job = audio_jobs.get(key)
+    if job is None:
+        filename = f"{name_prefix}_{key[:16]}_{suffix}.mp3"
+        job = audio_jobs[key] = {
+            'text': text,
+            'path': os.path.join(tmp_dir, filename),
+            'voice': voice,
+        }
+    return job['path'], os.path.basename(job['path'])
+
+
+def _normalize_tts_mode(tts_mode: str, card_template: str) -> str:
+    if tts_mode not in constants.CARD_AUDIO_MODES:
+        tts_mode = constants.DEFAULT_CARD_AUDIO_MODE
+    if card_template == "definition_front" and tts_mode == "word":
+        tts_mode = "word_and_example"
+    return tts_mode
+
+
+def _card_audio_texts(phrase: str, example: str, card_template: str, tts_mode: str) -> tuple[str, str]:
+    """Return the (word, example) texts to speak for a card; an empty string means no clip."""
+    if tts_mode == "none" or not phrase:
+        return "", ""
+    tts_example_source = _front_example_text(example) if card_template == "definition_front" else example
+    tts_example = re.sub(r'<br\s*/?>', '. ', tts_example_source, flags=re.IGNORECASE)
+    tts_example = re.sub(r'<[^>]+>', '', tts_example)
+    tts_example = re.sub(r'\s+', ' ', tts_example).strip()
+    if tts_mode != "word_and_example" or len(tts_example) <= 3:
+        tts_example = ""
+    return phrase, tts_example
+
+
+class AudioPrefetcher:
+    """Queue card audio on the TTS worker while later AI batches are still running.
+
+    Clips land in the TTS audio cache, so generate_anki_package later links
+    them instead of synthesizing; without that cache prefetching is a no-op.
+    Call wait() before packaging so the same clip is never synthesized twice;
+    close() without it abandons whatever has not been synthesized yet.
+    """
+
+    def __init__(
+        self,
+        enable_tts: bool,
+        tts_voice: str,
+        card_template: str = constants.DEFAULT_CARD_TEMPLATE,
+        tts_mode: str = constants.DEFAULT_CARD_AUDIO_MODE,
+    ) -> None:
+        self.card_template = _normalize_card_template(card_template)
+        self.tts_mode = _normalize_tts_mode(tts_mode, self.card_template)
+        self.tts_voice = tts_voice
+        self.enabled = enable_tts and self.tts_mode != "none" and get_tts_cache() is not None
+        self.queued = 0
+        self._keys: set[str] = set()
+        self._jobs: List[TTSJob] = []
+        self._worker: Optional[TTSWorker] = None
+        self._tmp_dir: Optional[tempfile.TemporaryDirectory] = None
+
+    def add(self, cards: List[Dict[str, str]]) -> int:
+        """Queue clips for cards not seen before; return how many new clips were queued."""
+        if not self.enabled:
+            return 0
+        audio_jobs: Dict[str, Dict[str, str]] = {}
+        for card in cards:
+            phrase = safe_str_clean(card.get('w', ''))
+            texts = _card_audio_texts(phrase, safe_str_clean(card.get('e', '')), self.card_template, self.tts_mode)
+            for text, suffix in zip(texts, ("p", "e")):
+                if text and make_tts_key(text, self.tts_voice) not in self._keys:
+                    if self._tmp_dir is None:
+                        self._tmp_dir = tempfile.TemporaryDirectory(
+                            prefix="vocabflow_tts_prefetch_", ignore_cleanup_errors=True
+                        )
+                    _plan_audio_task(audio_jobs, text, self.tts_voice, self._tmp_dir.name, "prefetch", suffix)
+        if not audio_jobs:
+            return 0
+        self._keys.update(audio_jobs)
+        try:
+            self._worker = get_tts_worker()
+            self._jobs.append(self._worker.submit(list(audio_jobs.values()), str(threading.get_ident())))
+        except Exception as e:
+            logger.error("TTS prefetch error: %s", e)
+            return 0
+        self.queued += len(audio_jobs)
+        return len(audio_jobs)
+
+    def wait(self, progress_callback: Optional[ProgressCallback] = None) -> None:
+        """Block until every queued clip finished, relaying overall progress on this thread."""
+        finished = 0
+        for job in self._jobs:
+            def relay(ratio: float, msg: str, job: TTSJob = job, finished: int = finished) -> None:
+                if progress_callback:
+                    done = finished + job.completed
+                    progress_callback(done / self.queued, f"🎙️ 正在预生成音频 ({done}/{self.queued})")
+
+            job.wait(relay)
+            finished += job.total
+
+    def close(self) -> None:
+        """Cancel unfinished clips and remove the staging directory without waiting."""
+        for job in self._jobs:
+            if not job.done.is_set() and self._worker is not None:
+                self._worker.cancel(job)
+        self._jobs = []
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
+
+    def __enter__(self) -> "AudioPrefetcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
 def generate_anki_package(
     cards_data: List[Dict[str, str]],
     deck_name: str,
@@ -397,10 +526,7 @@ def generate_anki_package(
     genanki, tempfile_mod = get_genanki()
     media_files = []
     card_template = _normalize_card_template(card_template)
-    if tts_mode not in constants.CARD_AUDIO_MODES:
-        tts_mode = constants.DEFAULT_CARD_AUDIO_MODE
-    if card_template == "definition_front" and tts_mode == "word":
-        tts_mode = "word_and_example"
+    tts_mode = _normalize_tts_mode(tts_mode, card_template)
 
     CSS = """
     .card { font-family: 'Arial', sans-serif; font-size: 20px; text-align: center; color: #333; background-color: white; padding: 20px; }
@@ -503,7 +629,8 @@ def generate_anki_package(
 
     with tempfile_mod.TemporaryDirectory() as tmp_dir:
         notes_buffer = []
-        audio_tasks = []
+        audio_jobs: Dict[str, Dict[str, str]] = {}
+        requested_audio_count = 0
         prepared_cards = []
 
         for idx, card in enumerate(cards_data):
@@ -556,48 +683,50 @@ def generate_anki_package(
                 'example_audio_filename': "",
             }
 
-            if enable_tts and tts_mode != "none" and phrase:
+            tts_phrase, tts_example = _card_audio_texts(phrase, example, card_template, tts_mode)
+            if enable_tts and tts_phrase:
                 safe_phrase = re.sub(r'[^a-zA-Z0-9]', '_', phrase)[:20]
-                unique_id = int(time.time() * 1000) + random.randint(0, 9999)
-
-                phrase_filename = f"tts_{safe_phrase}_{unique_id}_p.mp3"
-                phrase_path = os.path.join(tmp_dir, phrase_filename)
-                audio_tasks.append({
-                    'text': phrase,
-                    'path': phrase_path,
-                    'voice': tts_voice
-                })
+
+                phrase_path, phrase_filename = _plan_audio_task(
+                    audio_jobs, tts_phrase, tts_voice, tmp_dir, f"tts_{safe_phrase}", "p"
+                )
+                requested_audio_count += 1
                 prepared_card['phrase_audio_path'] = phrase_path
                 prepared_card['phrase_audio_filename'] = phrase_filename
 
-                tts_example_source = _front_example_text(example) if card_template == "definition_front" else example
-                tts_example = re.sub(r'<br\s*/?>', '. ', tts_example_source, flags=re.IGNORECASE)
-                tts_example = re.sub(r'<[^>]+>', '', tts_example)
-                tts_example = re.sub(r'\s+', ' ', tts_example).strip()
-                if tts_mode == "word_and_example" and tts_example and len(tts_example) > 3:
-                    example_filename = f"tts_{safe_phrase}_{unique_id}_e.mp3"
-                    example_path = os.path.join(tmp_dir, example_filename)
-                    audio_tasks.append({
-                        'text': tts_example,
-                        'path': example_path,
-                        'voice': tts_voice
-                    })
+                if tts_example:
+                    example_path, example_filename = _plan_audio_task(
+                        audio_jobs, tts_example, tts_voice, tmp_dir, f"tts_{safe_phrase}", "e"
+                    )
+                    requested_audio_count += 1
                     prepared_card['example_audio_path'] = example_path
                     prepared_card['example_audio_filename'] = example_filename
 
             prepared_cards.append(prepared_card)
 
+        audio_tasks = list(audio_jobs.values())
         if audio_tasks:
+            saved_audio_count = requested_audio_count - len(audio_tasks)
+            if saved_audio_count:
+                logger.info(
+                    "TTS planning merged %s identical clips: %s synthesis jobs for %s card fields.",
+                    saved_audio_count, len(audio_tasks), requested_audio_count,
+                )
             if progress_callback:
-                progress_callback(0.0, f"🎙️ 正在准备 {len(audio_tasks)} 个音频任务...")
+                merged_note = f"（合并重复文本，少合成 {saved_audio_count} 个）" if saved_audio_count else ""
+                progress_callback(0.0, f"🎙️ 正在准备 {len(audio_tasks)} 个音频任务{merged_note}...")
 
             def internal_progress(ratio: float, msg: str) -> None:
                 if progress_callback:
                     progress_callback(ratio, f"🎙️ {msg}")
 
-            run_async_batch(audio_tasks, concurrency=constants.TTS_CONCURRENCY, progress_callback=internal_progress)
+            run_async_batch(audio_tasks, progress_callback=internal_progress)
 
-            successful_audio_count = 0
+            successful_audio_count = sum(
+                1
+                for task in audio_tasks
+                if os.path.exists(task['path']) and os.path.getsize(task['path']) > constants.MIN_AUDIO_FILE_SIZE
+            )
             for prepared_card in prepared_cards:
                 phrase_audio_path = prepared_card.get('phrase_audio_path', '')
                 if (
@@ -607,7 +736,6 @@ def generate_anki_package(
                 ):
                     prepared_card['audio_phrase_field'] = f"[sound:{prepared_card['phrase_audio_filename']}]"
                     media_files.append(phrase_audio_path)
-                    successful_audio_count += 1
 
                 example_audio_path = prepared_card.get('example_audio_path', '')
                 if (
@@ -617,7 +745,6 @@ def generate_anki_package(
                 ):
                     prepared_card['audio_example_field'] = f"[sound:{prepared_card['example_audio_filename']}]"
                     media_files.append(example_audio_path)
-                    successful_audio_count += 1
 
             if progress_callback:
                 progress_callback(1.0, f"🎙️ 已生成 {successful_audio_count}/{len(audio_tasks)} 个音频。")
@@ -675,7 +802,7 @@ def generate_anki_package(
             progress_callback(1.0, "📦 正在打包 .apkg 文件...")
 
         package = genanki.Package(deck)
-        package.media_files = [f for f in media_files if os.path.exists(f)]
+        package.media_files = [f for f in dict.fromkeys(media_files) if os.path.exists(f)]
 
         os.makedirs(APKG_TEMP_DIR, exist_ok=True)
         output_file = tempfile_mod.NamedTemporaryFile(
@@ -1,7 +1,7 @@
 # Parse AI-generated text into structured Anki card data.
 
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 def split_example_translation(example_field: str) -> tuple[str, str]:
@@ -26,6 +26,66 @@ def normalize_html_breaks(text: str) -> str:
     return re.sub(r"\s*<br\s*/?>\s*", "<br>", text, flags=re.IGNORECASE).strip()
 
 
+def parse_anki_line(line: str) -> Optional[Dict[str, str]]:
+    """Parse one `|||`-separated AI output line, or return None when it is not a card."""
+    line = line.strip()
+    if not line or "|||" not in line:
+        return None
+
+    parts = [part.strip() for part in line.split("|||")]
+    if len(parts) < 2:
+        return None
+
+    phrase = parts[0]
+    phonetic = ""
+    meaning = ""
+    example = ""
+    example_translation = ""
+    etymology = ""
+    source_note = ""
+
+    if len(parts) >= 7:
+        phonetic = parts[1]
+        meaning = parts[2]
+        example = parts[3]
+        example_translation = parts[4]
+        etymology = parts[5]
+        source_note = " ||| ".join(parts[6:]).strip()
+    elif len(parts) >= 6:
+        phonetic = parts[1]
+        meaning = parts[2]
+        example = parts[3]
+        example_translation = parts[4]
+        etymology = " ||| ".join(parts[5:]).strip()
+    elif len(parts) >= 5:
+        meaning = parts[1]
+        example = parts[2]
+        example_translation = parts[3]
+        etymology = " ||| ".join(parts[4:]).strip()
+    elif len(parts) == 4:
+        meaning = parts[1]
+        example = parts[2]
+        example, example_translation = split_example_translation(example)
+        etymology = parts[3]
+    else:
+        meaning = parts[1]
+        example = parts[2] if len(parts) > 2 else ""
+        example, example_translation = split_example_translation(example)
+
+    if not phrase or not meaning:
+        return None
+
+    return {
+        'w': phrase,
+        'p': phonetic,
+        'm': meaning,
+        'e': normalize_html_breaks(example),
+        'ec': normalize_html_breaks(example_translation),
+        'r': etymology,
+        's': source_note,
+    }
+
+
 def parse_anki_data(raw_text: str) -> List[Dict[str, str]]:
     """Parse AI-generated text into structured Anki card data."""
     parsed_cards = []
@@ -38,69 +98,61 @@ def parse_anki_data(raw_text: str) -> List[Dict[str, str]]:
     else:
         text = re.sub(r'^```.*$', '', text, flags=re.MULTILINE)
 
-    lines = text.split('\n')
     seen_phrases = set()
 
-    for line in lines:
-        line = line.strip()
-        if not line or "|||" not in line:
+    for line in text.split('\n'):
+        card = parse_anki_line(line)
+        if card is None:
             continue
 
-        parts = [part.strip() for part in line.split("|||")]
-        if len(parts) < 2:
+        if card['w'].lower() in seen_phrases:
             continue
+        seen_phrases.add(card['w'].lower())
+        parsed_cards.append(card)
 
-        phrase = parts[0]
-        phonetic = ""
-        meaning = ""
-        example = ""
-        example_translation = ""
-        etymology = ""
-        source_note = ""
-
-        if len(parts) >= 7:
-            phonetic = parts[1]
-            meaning = parts[2]
-            example = parts[3]
-            example_translation = parts[4]
-            etymology = parts[5]
-            source_note = " ||| ".join(parts[6:]).strip()
-        elif len(parts) >= 6:
-            phonetic = parts[1]
-            meaning = parts[2]
-            example = parts[3]
-            example_translation = parts[4]
-            etymology = " ||| ".join(parts[5:]).strip()
-        elif len(parts) >= 5:
-            meaning = parts[1]
-            example = parts[2]
-            example_translation = parts[3]
-            etymology = " ||| ".join(parts[4:]).strip()
-        elif len(parts) == 4:
-            meaning = parts[1]
-            example = parts[2]
-            example, example_translation = split_example_translation(example)
-            etymology = parts[3]
-        else:
-            meaning = parts[1]
-            example = parts[2] if len(parts) > 2 else ""
-            example, example_translation = split_example_translation(example)
-
-        if not phrase or not meaning:
-            continue
+    return parsed_cards
 
-        if phrase.lower() in seen_phrases:
-            continue
-        seen_phrases.add(phrase.lower())
-
-        parsed_cards.append({
-            'w': phrase,
-            'p': phonetic,
-            'm': meaning,
-            'e': normalize_html_breaks(example),
-            'ec': normalize_html_breaks(example_translation),
-            'r': etymology,
-            's': source_note,
-        })
 
-    return parsed_cards
+class IncrementalCardParser:
+    """Parse a streamed AI response into cards as each line completes.
+
+    Like parse_anki_data on the finished text, a repeated phrase is only
+    returned the first time and, once a code fence has been seen, lines
+    outside fences are ignored. Lines streamed before the first fence cannot
+    be held back, so a stray card line there is still returned.
+    """
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._seen_phrases: set = set()
+        self._seen_fence = False
+        self._in_fence = False
+
+    def feed(self, chunk: str) -> List[Dict[str, str]]:
+        """Add streamed text and return the cards whose lines it completed."""
+        if not chunk:
+            return []
+        lines = (self._pending + chunk).split("\n")
+        self._pending = lines.pop()
+        return self._parse_lines(lines)
+
+    def finish(self) -> List[Dict[str, str]]:
+        """Parse the trailing unterminated line, if any."""
+        line, self._pending = self._pending, ""
+        return self._parse_lines([line])
+
+    def _parse_lines(self, lines: List[str]) -> List[Dict[str, str]]:
+        cards = []
+        for line in lines:
+            if line.strip().startswith("```"):
+                self._seen_fence = True
+                self._in_fence = not self._in_fence
+                continue
+            if self._seen_fence and not self._in_fence:
+                continue
+            card = parse_anki_line(line)
+            if card is None or card['w'].lower() in self._seen_phrases:
+                continue
+            self._seen_phrases.add(card['w'].lower())
+            cards.append(card)
+        return cards
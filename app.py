@@ -15,6 +15,7 @@ if str(APP_DIR) not in sys.path:
     sys.path.insert(0, str(APP_DIR))
 
 import resources
+from vocab_logic import start_lemma_cache_warmup
 from ui.helpers import initialize_session_state
 from ui.styles import (
     apply_global_styles,
@@ -31,16 +32,21 @@ configure_page()
 VOCAB_DICT, FULL_DF = resources.load_vocab_data()
 resources.VOCAB_DICT = VOCAB_DICT
 resources.FULL_DF = FULL_DF
-if isinstance(FULL_DF, list):
-    resources.VOCAB_DISPLAY_DICT = {
-        str(row.get("word", "")).lower(): str(row.get("word", ""))
-        for row in FULL_DF
-        if isinstance(row, dict) and row.get("word")
-    }
-elif FULL_DF is not None:
-    word_col = next((column for column in FULL_DF.columns if "word" in str(column).lower()), None)
-    if word_col is not None:
-        resources.VOCAB_DISPLAY_DICT = {str(word).lower(): str(word) for word in FULL_DF[word_col]}
+# load_vocab_data() fills the display spellings itself when it parses the CSV
+# or snapshot; only derive them from FULL_DF for other sources.
+if not resources.VOCAB_DISPLAY_DICT:
+    if isinstance(FULL_DF, list):
+        resources.VOCAB_DISPLAY_DICT = {
+            str(row.get("word", "")).lower(): str(row.get("word", ""))
+            for row in FULL_DF
+            if isinstance(row, dict) and row.get("word")
+        }
+    elif FULL_DF is not None:
+        word_col = next((column for column in FULL_DF.columns if "word" in str(column).lower()), None)
+        if word_col is not None:
+            resources.VOCAB_DISPLAY_DICT = {str(word).lower(): str(word) for word in FULL_DF[word_col]}
+
+start_lemma_cache_warmup()
 
 initialize_session_state()
 apply_global_styles()
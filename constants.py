@@ -6,15 +6,50 @@ MIN_RANDOM_ID = 100000
 MAX_RANDOM_ID = 999999
 REQUEST_TIMEOUT_SECONDS = 15
 DEEPSEEK_REQUEST_TIMEOUT_SECONDS = 120
+# Pooled AI HTTP clients: enough connections for every concurrent card batch plus lookups.
+AI_HTTP_MAX_CONNECTIONS = 16
+AI_HTTP_MAX_KEEPALIVE_CONNECTIONS = 8
+AI_HTTP_KEEPALIVE_EXPIRY_SECONDS = 90
+AI_HTTP_CONNECT_TIMEOUT_SECONDS = 10
+# The SDK retries once; further retries go through the batch loop's jittered backoff and circuit breaker.
+AI_HTTP_MAX_RETRIES = 1
+AI_RETRY_BACKOFF_BASE_SECONDS = 1.0
+AI_RETRY_BACKOFF_MAX_SECONDS = 20.0
+# Shared per-provider budgets for every session in this process.
+AI_RATE_LIMITS = {
+    "openai": {"requests_per_minute": 500, "tokens_per_minute": 200_000},
+    "deepseek": {"requests_per_minute": 120, "tokens_per_minute": 300_000},
+    "default": {"requests_per_minute": 60, "tokens_per_minute": 100_000},
+}
+# How long a request may wait for rate-limit budget before failing.
+AI_RATE_LIMIT_WAIT_SECONDS = 30
+# Completion tokens reserved per request before the real usage is known.
+AI_RATE_LIMIT_COMPLETION_ESTIMATE = 1500
+AI_BREAKER_FAILURE_THRESHOLD = 5
+AI_BREAKER_COOLDOWN_SECONDS = 15
+AI_BREAKER_MAX_COOLDOWN_SECONDS = 120
 IOS_RESUME_RELOAD_AFTER_SECONDS = 180
 IOS_BROWSER_RESUME_RELOAD_AFTER_SECONDS = 600
 MAX_PREVIEW_CARDS = 10
 BEIJING_TIMEZONE_OFFSET = 8
 MAX_UPLOAD_MB = 200
 MAX_UPLOAD_BYTES = MAX_UPLOAD_MB * 1024 * 1024
+TEXT_STREAM_CHUNK_BYTES = 1024 * 1024
 QUICK_LOOKUP_CACHE_MAX = 100
 QUICK_LOOKUP_CACHE_VERSION = "v22"
-SIMPLE_LOOKUP_CACHE_VERSION = "v7"
+SIMPLE_LOOKUP_CACHE_VERSION = "v8"
+# Simple lookup tiers, tried in order: "local" lexicon, persistent AI response "cache", then "ai".
+LOOKUP_POLICIES = {
+    "local_first": ("local", "cache", "ai"),
+    "cache_first": ("cache", "ai"),
+    "ai_only": ("ai",),
+    "offline": ("local", "cache"),
+}
+LOOKUP_POLICY_DEFAULT = "local_first"
+LOOKUP_LOCAL_REQUIRE_EXAMPLE = True
+VOCAB_CANDIDATE_CACHE_MAX = 50_000
+VOCAB_SUGGESTION_LIMIT = 6
+VOCAB_SUGGESTION_MAX_DISTANCE = 2
 
 # Temp .apkg files: subdir under system temp, cleanup files older than this
 APKG_TEMP_SUBDIR = "vocabflow_apkg"
@@ -22,8 +57,22 @@ APKG_CLEANUP_MAX_AGE_SECONDS = 24 * 3600  # 24 hours
 
 MIN_WORD_LENGTH = 2
 MAX_WORD_LENGTH = 25
+LEMMA_CACHE_MAX_ENTRIES = 200_000
+ANALYSIS_PARALLEL_MIN_CHARS = 4_000_000
+ANALYSIS_SHARD_CHARS = 1_000_000
+ANALYSIS_MAX_WORKERS = 4
 
 AI_BATCH_SIZE = 10
+AI_MAX_CONCURRENT_BATCHES = 4
+AI_STREAM_POLL_SECONDS = 0.2
+AI_BATCH_SIZE_MIN = 4
+AI_BATCH_SIZE_MAX = 30
+AI_BATCH_SIZE_STEP = 2
+AI_BATCH_TARGET_SECONDS = 45
+AI_BATCH_MIN_COMPLETE_RATIO = 0.8
+AI_BATCH_TELEMETRY_ALPHA = 0.3
+# Completion tokens one card batch may use before output truncation becomes likely.
+AI_BATCH_OUTPUT_TOKEN_BUDGET = {"openai": 12000, "deepseek": 6000, "default": 4000}
 MAX_AUTO_LIMIT = 250
 AI_TOPIC_WORDLIST_MAX = 50
 AI_WORD_SELECTION_INPUT_LIMIT = 800
@@ -36,13 +85,41 @@ OPENAI_MODEL_DEFAULT = "gpt-4o-mini"
 DEEPSEEK_MODEL_DEFAULT = "deepseek-chat"
 MAX_RETRIES = 3
 
+# On-disk AI response cache shared by every session and process.
+AI_CACHE_ENABLED = True
+AI_CACHE_VERSION = "v1"
+# Bump when the word lookup prompts change so in-flight lookups are not shared across versions.
+LOOKUP_PROMPT_VERSION = "v1"
+AI_CACHE_SUBDIR = "vocabflow_cache"
+AI_CACHE_DB_NAME = "ai_responses.sqlite3"
+AI_CACHE_TTL_SECONDS = 30 * 24 * 3600
+AI_CACHE_MAX_ENTRIES = 20_000
+AI_CACHE_PRUNE_EVERY = 200
+# USD per million tokens for each provider's default model; used only for the usage report.
+AI_TOKEN_PRICES_USD_PER_MILLION = {
+    "openai": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "deepseek": {"input": 0.27, "cached_input": 0.07, "output": 1.10},
+}
+
 EXTRACTION_ERROR_PREFIX = "__VOCABFLOW_EXTRACTION_ERROR__:"
 
 TTS_CONCURRENCY = 3
+TTS_CONCURRENCY_MIN = 1
+TTS_CONCURRENCY_MAX = 12
+# Responses slower than this count as congestion and halve the TTS concurrency.
+TTS_LATENCY_TARGET_SECONDS = 6
 TTS_RETRY_ATTEMPTS = 3
 TTS_TASK_TIMEOUT_SECONDS = 25
+# A waiting caller gives up when its job reports no progress for this long.
+TTS_JOB_STALL_SECONDS = TTS_TASK_TIMEOUT_SECONDS * (TTS_RETRY_ATTEMPTS + 1)
 TTS_TEXT_MAX_CHARS = 240
 MIN_AUDIO_FILE_SIZE = 100
+TTS_CACHE_ENABLED = True
+# Bump to drop every cached clip, e.g. after changing how text is spoken.
+TTS_CACHE_VERSION = "v1"
+TTS_CACHE_SUBDIR = "audio"
+TTS_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+TTS_CACHE_PRUNE_EVERY = 200
 
 ANKI_MODEL_ID = 1842957302
 ANKI_MODEL_ID_BASE = 1842957600
@@ -84,6 +161,8 @@ VOCAB_PROJECT_SOURCE = "NGSL / Oxford / SP 词表综合排序"
 VOCAB_PROJECT_NAME = "NGSL 31K Priority"
 VOCAB_PROJECT_FILE = "data/processed/ngsl_31k_priority.csv"
 VOCAB_PROJECT_MAX_RANK = 31605
+VOCAB_SNAPSHOT_FILE = "data/processed/ngsl_31k_priority.vocab.bin"
+VOCAB_SURFACE_INDEX_FILE = "data/processed/ngsl_31k_surface_index.csv"
 LOCAL_CARD_LEXICON_NAME = "NGSL/NAWL/TSL Local Definitions"
 LOCAL_CARD_LEXICON_FILE = "data/processed/local_card_lexicon.csv"
 
@@ -0,0 +1,79 @@
+"""Compare per-token validation with the fused token counter.
+
+Builds a synthetic corpus of roughly one million tokens with a Zipf-like
+word distribution and mixed casing, checks that both counters agree, and
+prints the best of several timings for each.
+
+Run from the repository root: `python dev/benchmarks/bench_tokenizer.py`.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from vocab_logic import _TOKEN_PATTERN, count_text_tokens, is_valid_word  # noqa: E402
+
+TOKEN_COUNT = 1_000_000
+CHUNK_TOKENS = 50_000
+REPEATS = 3
+
+
+def legacy_count(chunks):
+    """Validate every raw token before counting, as the analyzer used to."""
+    token_counts: Counter = Counter()
+    total_raw_count = 0
+    for chunk in chunks:
+        raw_tokens = _TOKEN_PATTERN.findall(chunk)
+        total_raw_count += len(raw_tokens)
+        token_counts.update(token.lower() for token in raw_tokens if is_valid_word(token.lower()))
+    return token_counts, total_raw_count
+
+
+def build_corpus(seed: int = 7) -> list:
+    """Return the corpus as a list of text chunks."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = ["".join(rng.choice(letters) for _ in range(rng.randint(2, 12))) for _ in range(20_000)]
+    vocabulary += ["well-known", "don't", "mother-in-law", "zzz", "brrr"]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    words = rng.choices(vocabulary, weights=weights, k=TOKEN_COUNT)
+    for index in range(0, TOKEN_COUNT, 17):
+        words[index] = words[index].capitalize()
+    return [" ".join(words[start:start + CHUNK_TOKENS]) + "." for start in range(0, TOKEN_COUNT, CHUNK_TOKENS)]
+
+
+def best_time(func, chunks) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func(chunks)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    chunks = build_corpus()
+    legacy_result = legacy_count(chunks)
+    fused_result = count_text_tokens(chunks)
+    if legacy_result != fused_result or list(legacy_result[0]) != list(fused_result[0]):
+        raise SystemExit("fused counter disagrees with the per-token counter")
+
+    legacy_seconds = best_time(legacy_count, chunks)
+    fused_seconds = best_time(count_text_tokens, chunks)
+    print(f"tokens:          {fused_result[1]:,}")
+    print(f"distinct valid:  {len(fused_result[0]):,}")
+    print(f"per-token:       {legacy_seconds:.3f}s")
+    print(f"fused:           {fused_seconds:.3f}s")
+    print(f"speedup:         {legacy_seconds / fused_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare per-process memory of the dict-based and mmap-backed vocabularies.
+
+Each mode loads the vocabulary in a fresh interpreter and reports the
+growth in resident memory, split into anonymous (private heap) and
+file-backed pages, plus the Python allocations seen by tracemalloc.
+File-backed pages of the snapshot are shared by every process that maps
+it, so only the anonymous growth is paid per Streamlit worker.
+
+Run from the repository root on Linux:
+`python dev/benchmarks/bench_vocab_memory.py`.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+MODES = ("csv", "snapshot")
+
+
+def _memory_kib() -> dict:
+    """Read RssAnon/RssFile from /proc/self/status."""
+    values = {}
+    with open("/proc/self/status", encoding="ascii") as status:
+        for line in status:
+            name, _, rest = line.partition(":")
+            if name in ("RssAnon", "RssFile"):
+                values[name] = int(rest.split()[0])
+    return values
+
+
+def measure(mode: str) -> dict:
+    import constants
+    import resources
+
+    csv_path = ROOT / constants.VOCAB_PROJECT_FILE
+    before = _memory_kib()
+    tracemalloc.start()
+    if mode == "csv":
+        vocab_dict, rows = resources._load_vocab_csv(csv_path)
+    else:
+        vocab_dict, rows = resources._load_vocab_snapshot(csv_path)
+    display_dict = resources.VOCAB_DISPLAY_DICT
+    # Touch every entry the way text analysis and the rank-range picker do.
+    checksum = sum(vocab_dict[word] for word in vocab_dict) + sum(len(display_dict[word]) for word in vocab_dict)
+    checksum += sum(row["rank"] for row in rows)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    after = _memory_kib()
+    return {
+        "words": len(vocab_dict),
+        "checksum": checksum,
+        "anon_kib": after["RssAnon"] - before["RssAnon"],
+        "file_kib": after["RssFile"] - before["RssFile"],
+        "retained_kib": current // 1024,
+        "peak_kib": peak // 1024,
+    }
+
+
+def main() -> None:
+    if len(sys.argv) == 3 and sys.argv[1] == "--mode":
+        print(json.dumps(measure(sys.argv[2])))
+        return
+
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    if len({result["checksum"] for result in results.values()}) != 1:
+        raise SystemExit("vocabularies differ between modes")
+    print(f"{'mode':<10}{'words':>8}{'RssAnon +KiB':>14}{'RssFile +KiB':>14}{'retained KiB':>14}{'peak KiB':>10}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<10}{result['words']:>8}{result['anon_kib']:>14}{result['file_kib']:>14}"
+            f"{result['retained_kib']:>14}{result['peak_kib']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# Tests for ai.process_ai_in_batches dispatch.
+
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import ai
+from ai_batching import AdaptiveBatchSizer
+
+
+TEST_CONFIG = {
+    "ai_provider": "deepseek",
+    "ai_api_key": "test-key",
+    "ai_base_url": "https://example.invalid",
+    "ai_model": "test-model",
+    "ai_missing_key_message": "missing key",
+}
+
+
+@pytest.fixture
+def fake_ai(monkeypatch):
+    """Replace the AI endpoint with a fake that echoes each batch's input items."""
+    state = {"in_flight": 0, "max_in_flight": 0, "calls": 0}
+    lock = threading.Lock()
+
+    def fake_call(model_name, messages, temperature, *, cfg=None, client=None, on_delta=None, use_cache=False):
+        items = re.search(r"Input items:\n(.*?)\n\n", messages[1]["content"], re.S).group(1).splitlines()
+        with lock:
+            state["calls"] += 1
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        # Later batches finish first, so completion order differs from input order.
+        time.sleep(0.05 if items[0] == "w0" else 0.01)
+        with lock:
+            state["in_flight"] -= 1
+        if "fail" in items:
+            return {"error": "boom"}
+        if "closed" in items:
+            return {"error": "circuit open", "circuit_open": True}
+        if "limited" in items:
+            return {"error": "rate limited", "rate_limited": True}
+        content = "\n".join(f"{item} ||| | m | e |  | " for item in items)
+        if on_delta:
+            # Split mid-line so cards only appear once their line is finished.
+            for start in range(0, len(content), 7):
+                on_delta(content[start:start + 7])
+        if "flaky" in items and not state.get("flaky_failed"):
+            # Fail after the cards were already streamed.
+            state["flaky_failed"] = True
+            return {"error": "dropped connection"}
+        return {"content": content}
+
+    monkeypatch.setattr(ai, "get_config", lambda: dict(TEST_CONFIG))
+    monkeypatch.setattr(ai, "_get_openai_compatible_client", lambda *args: object())
+    monkeypatch.setattr(ai, "_call_ai_chat_completion", fake_call)
+    monkeypatch.setattr(ai, "BATCH_SIZER", AdaptiveBatchSizer())
+    monkeypatch.setattr(ai, "backoff_delay", lambda attempt: 0.0)
+    real_sleep = time.sleep
+    monkeypatch.setattr(ai.time, "sleep", lambda seconds: None if seconds >= 1 else real_sleep(seconds))
+    return state
+
+
+def test_process_ai_in_batches_runs_batches_concurrently_in_order(fake_ai):
+    words = [f"w{index}" for index in range(35)]
+    progress = []
+
+    result = ai.process_ai_in_batches(words, progress_callback=lambda done, total: progress.append((done, total)))
+
+    assert [line.split(" ||| ")[0] for line in result.splitlines()] == words
+    assert fake_ai["max_in_flight"] > 1
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+    assert progress[-1] == (35, 35)
+
+
+def test_process_ai_in_batches_keeps_successful_batches_when_one_fails(fake_ai):
+    words = [f"w{index}" for index in range(10)] + ["fail"] + [f"x{index}" for index in range(9)]
+
+    result = ai.process_ai_in_batches(words)
+
+    assert [line.split(" ||| ")[0] for line in result.splitlines()] == words[:10]
+    assert fake_ai["calls"] == 1 + ai.constants.MAX_RETRIES
+
+
+def test_process_ai_in_batches_feeds_batch_outcomes_to_sizer(fake_ai):
+    ai.process_ai_in_batches([f"w{index}" for index in range(20)], batch_size=5)
+
+    telemetry = ai.BATCH_SIZER.snapshot("deepseek")
+    assert telemetry["batches"] == 4
+    # The fake cards have no example, so every word counts as incomplete.
+    assert telemetry["incomplete_words"] == 20
+    assert ai.BATCH_SIZER.next_size("deepseek") == ai.constants.AI_BATCH_SIZE_MIN
+
+
+def test_locally_refused_batches_do_not_shrink_batch_size(fake_ai):
+    ai.process_ai_in_batches(["closed", "limited"], batch_size=1)
+
+    assert ai.BATCH_SIZER.snapshot("deepseek")["batches"] == 0
+    ai.process_ai_in_batches(["fail"], batch_size=1)
+    assert ai.BATCH_SIZER.snapshot("deepseek")["failures"] == 1
+
+
+def test_process_ai_in_batches_relays_streamed_cards_on_calling_thread(fake_ai):
+    words = [f"w{index}" for index in range(12)]
+    received = []
+
+    def collect(cards):
+        assert threading.current_thread() is threading.main_thread()
+        received.extend(card["w"] for card in cards)
+
+    ai.process_ai_in_batches(words, batch_size=4, card_callback=collect)
+
+    assert sorted(received) == sorted(words)
+
+
+def test_retried_batch_does_not_relay_cards_twice(fake_ai):
+    received = []
+
+    ai.process_ai_in_batches(["flaky", "w1"], batch_size=2, card_callback=lambda cards: received.extend(cards))
+
+    assert fake_ai["calls"] == 2
+    assert [card["w"] for card in received] == ["flaky", "w1"]
+
+
+def test_interrupted_callback_cancels_queued_batches(fake_ai):
+    class Rerun(BaseException):
+        pass
+
+    def interrupt(cards):
+        raise Rerun()
+
+    with pytest.raises(Rerun):
+        ai.process_ai_in_batches([f"w{index}" for index in range(40)], batch_size=1, card_callback=interrupt)
+
+    # Only batches already running finish; queued ones are never sent.
+    assert fake_ai["calls"] < 40
+
+
+def test_stream_chat_completion_joins_deltas_and_keeps_usage():
+    chunks = [
+        SimpleNamespace(model="m1", usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+        for text in ["apple ||| ", "n. 苹果\n", None]
+    ] + [SimpleNamespace(model="m1", usage=SimpleNamespace(completion_tokens=9), choices=[])]
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: iter(chunks))))
+    deltas = []
+
+    content, model, usage = ai._stream_chat_completion(client, "m", [], 0.4, deltas.append)
+
+    assert content == "apple ||| n. 苹果\n"
+    assert deltas == ["apple ||| ", "n. 苹果\n"]
+    assert (model, usage.completion_tokens) == ("m1", 9)
+
+
+def test_openai_compatible_clients_are_pooled_per_endpoint_and_key(monkeypatch):
+    built = []
+
+    class FakeOpenAI:
+        def __init__(self, **kwargs):
+            built.append(kwargs)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(ai, "OpenAI", FakeOpenAI)
+    monkeypatch.setattr(ai, "_CLIENT_POOL", {})
+
+    first = ai._get_openai_compatible_client("key-a", "https://a.invalid", "missing")
+    assert ai._get_openai_compatible_client("key-a", "https://a.invalid", "missing") is first
+    assert ai._get_openai_compatible_client("key-b", "https://a.invalid", "missing") is not first
+    assert ai._get_openai_compatible_client("key-a", "https://b.invalid", "missing") is not first
+    assert len(built) == 3
+
+    ai.clear_ai_client_pool()
+    assert ai._get_openai_compatible_client("key-a", "https://a.invalid", "missing") is not first
@@ -0,0 +1,45 @@
+# Tests for the adaptive AI batch sizer.
+
+import constants
+from ai_batching import AdaptiveBatchSizer
+
+
+def test_complete_fast_batches_grow_to_the_maximum():
+    sizer = AdaptiveBatchSizer()
+    start = sizer.next_size("deepseek")
+
+    sizer.record("deepseek", start, start, 5.0)
+    assert sizer.next_size("deepseek") == start + constants.AI_BATCH_SIZE_STEP
+
+    for _ in range(50):
+        size = sizer.next_size("deepseek")
+        sizer.record("deepseek", size, size, 5.0)
+    assert sizer.next_size("deepseek") == constants.AI_BATCH_SIZE_MAX
+
+
+def test_failures_and_truncation_shrink_batches():
+    sizer = AdaptiveBatchSizer()
+    start = sizer.next_size("deepseek")
+
+    sizer.record("deepseek", start, 0, 0.0, failed=True)
+    assert sizer.next_size("deepseek") == max(constants.AI_BATCH_SIZE_MIN, start // 2)
+
+    sizer.reset()
+    sizer.record("deepseek", start, start // 2, 5.0)
+    assert sizer.next_size("deepseek") == max(constants.AI_BATCH_SIZE_MIN, start // 2)
+
+    sizer.reset()
+    sizer.record("deepseek", start, start, constants.AI_BATCH_TARGET_SECONDS + 1)
+    assert sizer.next_size("deepseek") < start
+
+
+def test_output_token_budget_caps_batch_size():
+    sizer = AdaptiveBatchSizer()
+    budget = constants.AI_BATCH_OUTPUT_TOKEN_BUDGET["deepseek"]
+    tokens_per_word = 2 * budget / constants.AI_BATCH_SIZE_MIN
+
+    sizer.record("deepseek", 10, 10, 5.0, completion_tokens=int(tokens_per_word * 10))
+
+    assert sizer.next_size("deepseek") == constants.AI_BATCH_SIZE_MIN
+    assert sizer.snapshot("deepseek")["tokens_per_second"] > 0
+    assert sizer.next_size("openai") == constants.AI_BATCH_SIZE
@@ -0,0 +1,129 @@
+# Tests for the on-disk AI response cache.
+
+from types import SimpleNamespace
+
+import ai
+import ai_cache
+from ai_batching import AdaptiveBatchSizer
+from ai_cache import AIResponseCache, make_cache_key
+from ai_usage import AIUsageTracker
+from anki_parse import parse_anki_data
+
+
+def _messages(text):
+    return [{"role": "system", "content": "sys"}, {"role": "user", "content": text}]
+
+
+def test_cache_key_depends_on_model_prompt_and_temperature():
+    base = make_cache_key("deepseek", "https://x", "m1", _messages("apple"), 0.2)
+    assert base == make_cache_key("deepseek", "https://x", "m1", _messages("apple"), 0.2)
+    assert base != make_cache_key("deepseek", "https://x", "m2", _messages("apple"), 0.2)
+    assert base != make_cache_key("deepseek", "https://x", "m1", _messages("apples"), 0.2)
+    assert base != make_cache_key("deepseek", "https://x", "m1", _messages("apple"), 0.3)
+
+
+def test_cache_expires_and_prunes_least_recently_used(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(ai_cache.time, "time", lambda: clock[0])
+    cache = AIResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=100, max_entries=2)
+
+    for key in ("a", "b", "c"):
+        cache.put(key, {"content": key})
+        clock[0] += 1
+    assert cache.get("a") == {"content": "a"}
+    clock[0] += 1
+    assert cache.prune() == 1
+    assert cache.get("b") is None and cache.get("a") is not None and cache.get("c") is not None
+
+    clock[0] += 200
+    assert cache.get("a") is None
+
+
+def test_chat_completion_served_from_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(model="m", choices=[SimpleNamespace(message=SimpleNamespace(content="apple | 苹果"))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    cache = AIResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=100, max_entries=10)
+    monkeypatch.setattr(ai, "get_ai_cache", lambda: cache)
+    cfg = {"ai_provider": "deepseek", "ai_base_url": "https://x", "ai_api_key": "k", "ai_missing_key_message": ""}
+
+    first = ai._call_ai_chat_completion("m", _messages("apple"), 0.2, cfg=cfg, client=client, use_cache=True)
+    second = ai._call_ai_chat_completion("m", _messages("apple"), 0.2, cfg=cfg, client=client, use_cache=True)
+    ai._call_ai_chat_completion("m", _messages("apple"), 0.2, cfg=cfg, client=client)
+
+    assert len(calls) == 2
+    assert second["content"] == first["content"] == "apple | 苹果"
+    assert second["cached"] is True and "cached" not in first
+
+
+def test_card_store_round_trips_by_params(tmp_path):
+    cache = AIResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=100, max_entries=10)
+    cache.put_cards("p1", {"apple": {"w": "apple", "m": "苹果"}})
+
+    assert cache.get_cards("p1", ["apple", "pear", "apple"]) == {"apple": {"w": "apple", "m": "苹果"}}
+    assert cache.get_cards("p2", ["apple"]) == {}
+
+
+def test_repeated_card_words_skip_ai(tmp_path, monkeypatch):
+    import ui.cards as cards
+
+    cache = AIResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=100, max_entries=100)
+    monkeypatch.setattr(cards, "get_ai_cache", lambda: cache)
+    monkeypatch.setattr(cards, "lookup_local_card_entries", lambda words: {word: None for word in words})
+    ai_batches = []
+
+    def fake_process(batch, **kwargs):
+        ai_batches.append(list(batch))
+        content = "\n".join(f"{word} ||| ||| n. 释义 ||| A {word} example. ||| ||| " for word in batch)
+        kwargs["card_callback"](parse_anki_data(content))
+        return content
+
+    monkeypatch.setattr(cards, "process_ai_in_batches", fake_process)
+    status = SimpleNamespace(text=lambda *args: None, progress=lambda *args: None)
+    options = dict(
+        example_count=1,
+        definition_language="中文",
+        translate_examples=False,
+        card_template="word_front",
+        content_status=status,
+        content_progress_bar=status,
+    )
+
+    cards._generate_complete_cards_with_queue(["apple", "river"], **options)
+    result, missing = cards._generate_complete_cards_with_queue(["river", "apple", "stone"], **options)
+
+    assert ai_batches == [["apple", "river"], ["stone"]]
+    assert [card["w"] for card in result] == ["river", "apple", "stone"] and missing == []
+
+
+def test_card_batch_retries_are_not_served_from_response_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        delta = SimpleNamespace(content="not a card line")
+        return iter([SimpleNamespace(model="m", usage=None, choices=[SimpleNamespace(delta=delta)])])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    cache = AIResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=100, max_entries=10)
+    cfg = {
+        "ai_provider": "deepseek",
+        "ai_base_url": "https://x",
+        "ai_api_key": "k",
+        "ai_model": "m",
+        "ai_missing_key_message": "",
+    }
+    monkeypatch.setattr(ai, "get_ai_cache", lambda: cache)
+    monkeypatch.setattr(ai, "get_config", lambda: dict(cfg))
+    monkeypatch.setattr(ai, "_get_openai_compatible_client", lambda *args: client)
+    monkeypatch.setattr(ai, "BATCH_SIZER", AdaptiveBatchSizer())
+    monkeypatch.setattr(ai, "USAGE_TRACKER", AIUsageTracker())
+
+    for _ in range(3):
+        ai.process_ai_in_batches(["apple"], batch_size=5)
+
+    assert len(calls) == 3
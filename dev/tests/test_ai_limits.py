@@ -0,0 +1,75 @@
+# Tests for AI rate limiting, circuit breaking and retry backoff.
+
+from types import SimpleNamespace
+
+import ai
+import ai_limits
+import constants
+from ai_limits import CircuitBreaker, ProviderGuard, TokenBucket, backoff_delay, is_retryable_error
+
+
+def test_token_bucket_refuses_when_budget_cannot_refill_in_time():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+
+    assert bucket.acquire(2, timeout=0)
+    assert not bucket.acquire(1, timeout=0.1)
+    assert bucket.acquire(1, timeout=1.5)
+    bucket.charge(-5)
+    assert bucket.acquire(2, timeout=0)
+
+
+def test_circuit_breaker_opens_then_lets_one_probe_through(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ai_limits.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=10)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] += 10
+    assert breaker.state == "half_open"
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_backoff_is_jittered_and_capped():
+    delays = [backoff_delay(10) for _ in range(200)]
+
+    assert all(0 <= delay <= constants.AI_RETRY_BACKOFF_MAX_SECONDS for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retryable_errors():
+    assert is_retryable_error(SimpleNamespace(status_code=429))
+    assert is_retryable_error(SimpleNamespace(status_code=503))
+    assert not is_retryable_error(SimpleNamespace(status_code=401))
+    assert is_retryable_error(TimeoutError("Request timed out"))
+    assert not is_retryable_error(ValueError("invalid model"))
+
+
+def test_open_circuit_fails_fast_without_calling_provider(monkeypatch):
+    guard = ProviderGuard({"requests_per_minute": 600, "tokens_per_minute": 1_000_000})
+    monkeypatch.setattr(ai, "get_provider_guard", lambda provider: guard)
+    monkeypatch.setattr(ai, "get_ai_cache", lambda: None)
+    calls = []
+
+    class Throttled(Exception):
+        status_code = 429
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        raise Throttled("rate limit")
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    cfg = {"ai_provider": "p", "ai_base_url": "u", "ai_api_key": "k", "ai_missing_key_message": ""}
+    messages = [{"role": "user", "content": "hi"}]
+
+    for _ in range(constants.AI_BREAKER_FAILURE_THRESHOLD):
+        assert ai._call_ai_chat_completion("m", messages, 0.2, cfg=cfg, client=client)["retryable"]
+    response = ai._call_ai_chat_completion("m", messages, 0.2, cfg=cfg, client=client)
+
+    assert response["circuit_open"]
+    assert len(calls) == constants.AI_BREAKER_FAILURE_THRESHOLD
@@ -0,0 +1,39 @@
+# Tests for card prompt layout and AI usage accounting.
+
+from types import SimpleNamespace
+
+import ai
+from ai_usage import AIUsageTracker, estimate_cost
+
+
+def test_card_system_prompt_holds_static_rules():
+    prompt = ai._card_system_prompt("word_front", 2, "中文", False)
+
+    assert "Output rules:" in prompt and "Input items:" not in prompt
+    assert ai._card_system_prompt("word_front", 2, "中文", False) is prompt
+
+
+def test_usage_counts_reads_openai_and_deepseek_cache_fields():
+    openai_usage = SimpleNamespace(
+        prompt_tokens=100, completion_tokens=40, prompt_tokens_details=SimpleNamespace(cached_tokens=64)
+    )
+    deepseek_usage = SimpleNamespace(prompt_tokens=100, completion_tokens=40, prompt_cache_hit_tokens=80)
+
+    assert ai._usage_counts(openai_usage) == {"prompt_tokens": 100, "cached_prompt_tokens": 64, "completion_tokens": 40}
+    assert ai._usage_counts(deepseek_usage)["cached_prompt_tokens"] == 80
+    assert ai._usage_counts(None) == {"prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0}
+
+
+def test_usage_tracker_reports_tokens_and_cost_per_card():
+    tracker = AIUsageTracker()
+    tracker.record("word_front", "deepseek", 1_000, 600, 2_000, 8)
+    tracker.record("word_front", "deepseek", 1_000, 1_000, 2_000, 2)
+    tracker.record("definition_front", "unknown", 500, 0, 500, 5)
+
+    rows = {row["template"]: row for row in tracker.report()}
+
+    assert rows["word_front"]["cards"] == 10
+    assert rows["word_front"]["tokens_per_card"] == 600
+    expected = estimate_cost("deepseek", 1_000, 600, 2_000) + estimate_cost("deepseek", 1_000, 1_000, 2_000)
+    assert abs(rows["word_front"]["cost_per_card_usd"] - expected / 10) < 1e-12
+    assert rows["definition_front"]["cost_usd"] == 0.0
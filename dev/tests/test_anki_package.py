@@ -0,0 +1,119 @@
+# Tests for anki_package audio planning and prefetching.
+
+import asyncio
+import os
+import time
+import zipfile
+
+import anki_package
+import constants
+import tts
+from tts_cache import TTSAudioCache
+
+
+def test_identical_audio_text_is_synthesized_once(monkeypatch, tmp_path):
+    batches = []
+
+    def fake_run_async_batch(tasks, concurrency=None, progress_callback=None):
+        batches.append([dict(task) for task in tasks])
+        for task in tasks:
+            with open(task["path"], "wb") as handle:
+                handle.write(b"x" * 500)
+
+    monkeypatch.setattr(anki_package, "run_async_batch", fake_run_async_batch)
+    monkeypatch.setattr(anki_package, "APKG_TEMP_DIR", str(tmp_path))
+    cards = [
+        {"w": "run", "m": "跑", "e": "We run every day."},
+        {"w": "run", "m": "经营", "e": "They run a shop."},
+        {"w": "jog", "m": "慢跑", "e": "We run every day."},
+    ]
+    messages = []
+
+    path = anki_package.generate_anki_package(
+        cards,
+        "Deck",
+        enable_tts=True,
+        progress_callback=lambda ratio, text: messages.append(text),
+        card_template="word_front",
+        tts_mode="word_and_example",
+    )
+
+    texts = sorted(task["text"] for task in batches[0])
+    assert texts == ["They run a shop.", "We run every day.", "jog", "run"]
+    assert any("少合成 2 个" in message for message in messages)
+    with zipfile.ZipFile(path) as package:
+        # Collection and media manifest, plus one file per unique clip.
+        assert len(package.namelist()) == 2 + len(texts)
+    os.remove(path)
+
+
+def test_prefetched_audio_is_reused_when_packaging(monkeypatch, tmp_path):
+    synthesized = []
+
+    async def fake_synthesize(task):
+        synthesized.append(task["text"])
+        with open(task["path"], "wb") as handle:
+            handle.write(b"x" * 500)
+
+    cache = TTSAudioCache(str(tmp_path / "audio"), 10 ** 6)
+    monkeypatch.setattr(tts, "_synthesize", fake_synthesize)
+    monkeypatch.setattr(tts, "get_tts_cache", lambda: cache)
+    monkeypatch.setattr(anki_package, "get_tts_cache", lambda: cache)
+    monkeypatch.setattr(anki_package, "APKG_TEMP_DIR", str(tmp_path))
+    cards = [
+        {"w": "run", "m": "跑", "e": "We run every day."},
+        {"w": "jog", "m": "慢跑", "e": "We jog at dawn."},
+    ]
+
+    with anki_package.AudioPrefetcher(True, "v", card_template="word_front", tts_mode="word_and_example") as prefetcher:
+        assert prefetcher.add(cards[:1]) == 2
+        assert prefetcher.add(cards) == 2
+        prefetcher.wait()
+        path = anki_package.generate_anki_package(
+            cards,
+            "Deck",
+            enable_tts=True,
+            tts_voice="v",
+            card_template="word_front",
+            tts_mode="word_and_example",
+        )
+
+    assert sorted(synthesized) == ["We jog at dawn.", "We run every day.", "jog", "run"]
+    with zipfile.ZipFile(path) as package:
+        assert len(package.namelist()) == 2 + 4
+    os.remove(path)
+
+
+def test_closing_prefetcher_abandons_unfinished_audio(monkeypatch, tmp_path):
+    async def slow_synthesize(task):
+        await asyncio.sleep(60)
+
+    cache = TTSAudioCache(str(tmp_path / "audio"), 10 ** 6)
+    worker = tts.TTSWorker()
+    monkeypatch.setattr(tts, "_synthesize", slow_synthesize)
+    monkeypatch.setattr(tts, "get_tts_cache", lambda: cache)
+    monkeypatch.setattr(anki_package, "get_tts_cache", lambda: cache)
+    monkeypatch.setattr(anki_package, "get_tts_worker", lambda: worker)
+    cards = [{"w": f"word{index}", "m": "释义", "e": f"Example {index} here."} for index in range(20)]
+
+    started = time.monotonic()
+    with anki_package.AudioPrefetcher(True, "v", card_template="word_front", tts_mode="word_and_example") as prefetcher:
+        assert prefetcher.add(cards) == 40
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 2
+    assert prefetcher._tmp_dir is None
+    time.sleep(0.1)
+    assert worker.alive
+
+    async def fast_synthesize(task):
+        with open(task["path"], "wb") as handle:
+            handle.write(b"x" * 500)
+
+    monkeypatch.setattr(tts, "_synthesize", fast_synthesize)
+    monkeypatch.setattr(constants, "TTS_JOB_STALL_SECONDS", 5)
+    later = worker.submit([{"text": "later", "path": str(tmp_path / "later.mp3"), "voice": "v"}], "other")
+    later.wait()
+    worker.stop()
+
+    assert later.completed == 1 and (tmp_path / "later.mp3").exists()
@@ -1,8 +1,8 @@
-# Tests for anki_parse.parse_anki_data.
+# Tests for anki_parse.parse_anki_data and IncrementalCardParser.
 
 import pytest
 
-from anki_parse import parse_anki_data
+from anki_parse import IncrementalCardParser, parse_anki_data
 
 
 def test_parse_anki_data_empty():
@@ -130,3 +130,44 @@ def test_parse_anki_data_supports_three_examples_without_translation():
     assert result[0]["m"] == "a unit of language"
     assert result[0]["e"].count("<br>") == 2
     assert result[0]["ec"] == ""
+
+
+def test_incremental_parser_matches_full_parse():
+    raw = (
+        "```text\n"
+        "apple ||| ||| n. 苹果 ||| An apple a day. ||| ||| \n"
+        "bad line\n"
+        "Apple ||| ||| n. 重复 ||| Again. ||| ||| \n"
+        "river ||| ||| n. 河 ||| The river runs. ||| ||| \n"
+        "```"
+    )
+    parser = IncrementalCardParser()
+    streamed = []
+    for start in range(0, len(raw), 5):
+        cards = parser.feed(raw[start:start + 5])
+        streamed.extend(cards)
+        # A card is only returned once its whole line has arrived.
+        assert all(raw.index(card["e"]) < start + 5 for card in cards)
+    streamed.extend(parser.finish())
+
+    assert streamed == parse_anki_data(raw)
+
+
+def test_incremental_parser_finish_parses_unterminated_line():
+    parser = IncrementalCardParser()
+    assert parser.feed("stone ||| n. 石头 ||| A stone.") == []
+    assert [card["w"] for card in parser.finish()] == ["stone"]
+
+
+def test_incremental_parser_ignores_lines_after_a_closed_fence():
+    raw = (
+        "```text\n"
+        "apple ||| ||| n. 苹果 ||| An apple a day. ||| ||| \n"
+        "```\n"
+        "note ||| this trailing line is not a card ||| \n"
+    )
+    parser = IncrementalCardParser()
+    streamed = parser.feed(raw) + parser.finish()
+
+    assert streamed == parse_anki_data(raw)
+    assert [card["w"] for card in streamed] == ["apple"]
@@ -1,14 +1,18 @@
 # Tests for extraction.clean_anki_field and parse_anki_txt_export.
 
+import re
 from io import BytesIO
 
 import pytest
 
 from extraction import (
+    TextChunkStream,
     clean_anki_field,
+    extract_from_txt,
     extract_text_from_url,
     get_extraction_error_message,
     is_extraction_error_text,
+    iter_text_chunks_from_file,
     make_extraction_error,
     parse_anki_txt_export,
     validate_article_url,
@@ -96,3 +100,32 @@ def test_extract_text_from_url_rejects_before_network():
     result = extract_text_from_url("http://127.0.0.1:8501")
     assert is_extraction_error_text(result)
     assert "URL" in get_extraction_error_message(result) or "IP" in get_extraction_error_message(result)
+
+
+def test_iter_text_chunks_from_txt_never_splits_words(monkeypatch):
+    monkeypatch.setattr("constants.TEXT_STREAM_CHUNK_BYTES", 7)
+    text = "Self-deprecating wit isn't rare.\nCafé owners don't mind long-winded guests. " * 20
+    f = BytesIO(text.encode("utf-8"))
+    f.name = "book.txt"
+    chunks = list(iter_text_chunks_from_file(f))
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+    token_pattern = r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*"
+    chunked_tokens = [token for chunk in chunks for token in re.findall(token_pattern, chunk)]
+    assert chunked_tokens == re.findall(token_pattern, text)
+
+
+def test_txt_falls_back_to_latin1_at_first_decode_error(monkeypatch):
+    monkeypatch.setattr("constants.TEXT_STREAM_CHUNK_BYTES", 5)
+    monkeypatch.setattr("extraction.detect_file_encoding", lambda data: "utf-8")
+    f = BytesIO("Café au lait ".encode("utf-8") + b"\xff tail")
+    f.name = "notes.txt"
+
+    assert extract_from_txt(f) == "Café au lait ÿ tail"
+
+
+def test_text_chunk_stream_stops_at_extraction_error():
+    stream = TextChunkStream(["first page", make_extraction_error("读取失败"), "never read"])
+    assert list(stream) == ["first page"]
+    assert stream.error == "读取失败"
+    assert stream.char_count == len("first page")
@@ -0,0 +1,112 @@
+# Tests for the tiered simple lookup.
+
+import csv
+
+import pytest
+
+import ai
+import constants
+from ai_cache import AIResponseCache, make_cache_key
+from lookup_tiers import TieredLookup
+from resources import BASE_DIR
+
+LEXICON_PATH = BASE_DIR / constants.LOCAL_CARD_LEXICON_FILE
+
+TEST_CONFIG = {"ai_provider": "deepseek", "ai_base_url": "https://example.invalid", "ai_model": "test-model"}
+
+ENTRY = {
+    "word": "harbor",
+    "normalized_word": "harbor",
+    "pos": "n.",
+    "phonetic": "/ˈhɑːrbər/",
+    "english_definition": "a sheltered place where ships stay",
+    "chinese_definition": "港口，避风港",
+    "example": "The boats returned to the harbor.",
+    "example_translation": "船只回到了港口。",
+}
+
+
+def test_policy_order_fallthrough_and_metrics():
+    calls = []
+
+    def tier(name, result):
+        def run(word):
+            calls.append(name)
+            return result
+        return run
+
+    lookup = TieredLookup({"local": tier("local", None), "cache": tier("cache", {"result": "hit"}), "ai": tier("ai", {})})
+
+    result = lookup.lookup("word")
+    assert (result["result"], result["source"]) == ("hit", "cache")
+    assert calls == ["local", "cache"]
+
+    assert lookup.lookup("word", policy="ai_only")["source"] == "ai"
+    assert lookup.lookup("word", policy="offline")["source"] == "cache"
+    metrics = {row["tier"]: row for row in lookup.metrics()}
+    assert (metrics["local"]["calls"], metrics["local"]["hits"]) == (2, 0)
+    assert metrics["cache"]["hit_rate"] == 1.0
+
+
+def test_local_tier_answers_without_ai(monkeypatch):
+    monkeypatch.setattr(ai, "lookup_local_card_entry", lambda word: dict(ENTRY) if word == "harbor" else None)
+    monkeypatch.setattr(ai, "get_vocab_dict", lambda: {"harbor": 2100})
+    monkeypatch.setattr(ai, "_ai_simple_definition", lambda word: (_ for _ in ()).throw(AssertionError("AI called")))
+
+    result = ai.get_word_simple_definition("Harbor")
+
+    assert result["source"] == "local"
+    assert result["rank"] == 2100
+    assert result["result"].splitlines() == [
+        "harbor /ˈhɑːrbər/",
+        "1. 港口，避风港 | a sheltered place where ships stay",
+        "• The boats returned to the harbor.",
+        "船只回到了港口。",
+    ]
+    assert result["latency_ms"] < 50
+
+
+def test_local_tier_uses_pos_when_entry_has_no_chinese_gloss(monkeypatch):
+    entry = {**ENTRY, "chinese_definition": "", "phonetic": ""}
+    monkeypatch.setattr(ai, "lookup_local_card_entry", lambda word: entry)
+    monkeypatch.setattr(ai, "get_vocab_dict", lambda: {})
+
+    result = ai._local_simple_definition("harbor")
+
+    assert result["result"].splitlines()[:2] == ["harbor", "1. n. | a sheltered place where ships stay"]
+
+
+@pytest.mark.skipif(not LEXICON_PATH.exists(), reason="local card lexicon has not been built")
+def test_local_tier_answers_from_the_built_lexicon(monkeypatch):
+    with LEXICON_PATH.open(encoding="utf-8", newline="") as csv_file:
+        row = next(csv.DictReader(csv_file))
+    monkeypatch.setattr(constants, "LOOKUP_LOCAL_REQUIRE_EXAMPLE", False)
+    monkeypatch.setattr(ai, "SIMPLE_LOOKUP", TieredLookup({
+        "local": ai._local_simple_definition,
+        "cache": lambda word: None,
+        "ai": lambda word: (_ for _ in ()).throw(AssertionError("AI called")),
+    }))
+
+    ai.get_word_simple_definition(row["normalized_word"])
+    result = ai.get_word_simple_definition(row["normalized_word"])
+
+    assert result["source"] == "local"
+    assert row["english_definition"] in result["result"].splitlines()[1]
+    assert result["latency_ms"] < 5
+
+
+def test_cache_tier_reuses_stored_ai_response(tmp_path, monkeypatch):
+    cache = AIResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=100, max_entries=10)
+    monkeypatch.setattr(ai, "get_ai_cache", lambda: cache)
+    monkeypatch.setattr(ai, "get_config", lambda: dict(TEST_CONFIG))
+    monkeypatch.setattr(ai, "get_vocab_dict", lambda: {})
+    monkeypatch.setattr(ai, "lookup_local_card_entry", lambda word: None)
+    key = make_cache_key(
+        "deepseek", "https://example.invalid", "test-model", ai._simple_definition_messages("gale"), 0.2
+    )
+    cache.put(key, {"content": "gale /ɡeɪl/\n1. 大风 | A very strong wind"})
+
+    result = ai.get_word_simple_definition("gale")
+
+    assert (result["source"], result["headword"]) == ("cache", "gale")
+    assert ai.get_word_simple_definition("breeze", policy="offline")["source"] == "none"
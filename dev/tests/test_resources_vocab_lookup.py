@@ -31,3 +31,60 @@ def test_local_card_lexicon_uses_wordnet_examples_when_available():
     assert entry["english_definition"].startswith("having or appealing")
     assert entry["example"] == "sophisticated young socialites"
     assert "WordNet" in entry["sources"]
+
+
+def test_vocab_rank_index_selects_rank_ranges():
+    from resources import VocabRankIndex
+
+    rows = [{"word": "b", "rank": "2"}, {"word": "a", "rank": 1}, {"word": "bad", "rank": "x"}, {"word": "c", "rank": 3.0}]
+    index = VocabRankIndex.from_rows(rows)
+    assert index.select(2, 3, 10) == [("b", 2), ("c", 3)]
+    assert index.select(1, 3, 2) == [("a", 1), ("b", 2)]
+    assert index.count_between(4, 9) == 0 and index.select(3, 1, 5) == []
+    assert sorted(index.select(1, 3, 2, randomize=True)) in ([("a", 1), ("b", 2)], [("a", 1), ("c", 3)], [("b", 2), ("c", 3)])
+
+
+def test_vocab_rank_index_reads_the_loaded_vocab_store():
+    from resources import get_vocab_rank_index, load_vocab_data
+
+    _, rows = load_vocab_data()
+    index = get_vocab_rank_index(rows)
+    assert get_vocab_rank_index(rows) is index
+    assert len(index) == constants.VOCAB_PROJECT_MAX_RANK
+    expected = [(row["word"], row["rank"]) for row in rows if 100 <= row["rank"] <= 104]
+    assert index.select(100, 104, 50) == expected
+
+
+def test_vocab_search_index_completes_and_corrects():
+    from resources import VocabSearchIndex
+
+    index = VocabSearchIndex({"receive": 5, "relieve": 9, "recipe": 7, "apple": 3, "apply": 2, "zebra": 40})
+    assert index.complete("app") == ["apply", "apple"]
+    assert index.complete("q") == []
+    assert index.fuzzy("recieve") == [("receive", 1), ("relieve", 1), ("recipe", 2)]
+    assert index.fuzzy("zzzz") == []
+
+
+def test_suggest_vocab_words_uses_loaded_vocab():
+    from resources import suggest_vocab_words
+
+    assert suggest_vocab_words("accomodation")[0] == "accommodation"
+
+
+def test_lookup_local_card_entries_resolves_batch_through_aliases(monkeypatch):
+    import resources
+
+    lexicon = {
+        "company": {"word": "company", "english_definition": "a business"},
+        "be": {"word": "be", "english_definition": "exist"},
+    }
+    monkeypatch.setattr(resources, "load_local_card_lexicon", lambda: lexicon)
+    resolved = resources.lookup_local_card_entries(["companies", "was", "Company", "zzz", "companies"])
+
+    assert list(resolved) == ["companies", "was", "Company", "zzz"]
+    assert resolved["companies"]["word"] == "company"
+    assert resolved["was"]["word"] == "be"
+    assert resolved["Company"] == resources.lookup_local_card_entry("company")
+    assert resolved["zzz"] is None
+    resolved["companies"]["word"] = "changed"
+    assert lexicon["company"]["word"] == "company"
@@ -0,0 +1,96 @@
+# Tests for single_flight.SingleFlight and coalesced AI lookups.
+
+import threading
+import time
+
+import pytest
+
+import ai
+from single_flight import SingleFlight
+
+
+def _run_concurrently(count, target):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(position):
+        try:
+            results[position] = target()
+        except BaseException as e:  # noqa: BLE001 - recorded for assertions
+            errors[position] = e
+
+    threads = [threading.Thread(target=worker, args=(position,)) for position in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"result": "ok"}
+
+    results, errors = _run_concurrently(5, lambda: flights.do("apple", slow))
+
+    assert calls == [1]
+    assert errors == [None] * 5
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert flights.in_flight() == 0
+    assert flights.do("apple", slow) == ({"result": "ok"}, False)
+
+
+def test_errors_reach_every_waiter():
+    flights = SingleFlight()
+
+    def boom():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    _, errors = _run_concurrently(3, lambda: flights.do("k", boom))
+
+    assert all(isinstance(error, ValueError) for error in errors)
+
+
+def test_interrupted_leader_hands_over_to_waiter():
+    flights = SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    def leader_fn():
+        started.set()
+        time.sleep(0.05)
+        raise KeyboardInterrupt
+
+    leader = threading.Thread(target=lambda: pytest.raises(KeyboardInterrupt, flights.do, "k", leader_fn))
+    leader.start()
+    started.wait()
+    result = flights.do("k", lambda: calls.append(1) or "fresh")
+    leader.join()
+
+    assert result == ("fresh", False)
+    assert calls == [1]
+
+
+def test_identical_lookups_are_coalesced(monkeypatch):
+    calls = []
+
+    def fake_fetch(word):
+        calls.append(word)
+        time.sleep(0.1)
+        return {"result": f"def of {word}", "headword": word.lower()}
+
+    monkeypatch.setattr(ai, "get_config", lambda: {"ai_provider": "p", "ai_base_url": "u", "ai_model": "m"})
+    monkeypatch.setattr(ai, "_fetch_word_simple_definition", fake_fetch)
+
+    results, _ = _run_concurrently(4, lambda: ai.get_word_simple_definition(" Apple ", policy="ai_only"))
+
+    assert len(calls) == 1
+    assert all(result["result"] == "def of  Apple " and result["source"] == "ai" for result in results)
+    # Each session gets its own copy of the shared result.
+    assert results[0] is not results[1]
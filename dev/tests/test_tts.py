@@ -0,0 +1,102 @@
+# Tests for adaptive TTS concurrency.
+
+import asyncio
+import threading
+import time
+
+import constants
+import tts
+
+
+def test_limit_grows_on_fast_successes_and_halves_on_failure():
+    async def scenario():
+        limiter = tts.AdaptiveConcurrency(4)
+        for _ in range(8):
+            await limiter.acquire()
+            await limiter.release(True, 0.1)
+        grown = limiter.limit
+        await limiter.acquire()
+        await limiter.release(False, 0.1)
+        return grown, limiter.limit
+
+    grown, after_failure = asyncio.run(scenario())
+
+    assert grown > 5
+    assert after_failure == grown / 2
+
+
+def test_healthy_batch_ramps_up_without_jitter(tmp_path, monkeypatch):
+    async def fake_synthesize(task):
+        await asyncio.sleep(0.01)
+        with open(task["path"], "wb") as handle:
+            handle.write(b"x" * 500)
+
+    def no_jitter(*args):
+        raise AssertionError("jitter used on the happy path")
+
+    monkeypatch.setattr(tts, "_synthesize", fake_synthesize)
+    monkeypatch.setattr(tts, "get_tts_cache", lambda: None)
+    monkeypatch.setattr(tts.random, "uniform", no_jitter)
+    worker = tts.TTSWorker()
+    tasks = [{"text": f"w{index}", "path": str(tmp_path / f"{index}.mp3"), "voice": "v"} for index in range(60)]
+    progress = []
+
+    worker.submit(tasks, "s1").wait(lambda ratio, message: progress.append(threading.get_ident()))
+    worker.stop()
+
+    assert all((tmp_path / f"{index}.mp3").exists() for index in range(60))
+    assert worker.limiter.limit > constants.TTS_CONCURRENCY
+    # Progress is relayed on the waiting thread, not the worker's loop thread.
+    assert len(progress) == 60 and set(progress) == {threading.get_ident()}
+
+
+def test_sessions_are_served_round_robin(tmp_path, monkeypatch):
+    gate = threading.Event()
+    order = []
+
+    async def fake_synthesize(task):
+        order.append(task["text"])
+        while not gate.is_set():
+            await asyncio.sleep(0.01)
+        with open(task["path"], "wb") as handle:
+            handle.write(b"x" * 500)
+
+    monkeypatch.setattr(tts, "_synthesize", fake_synthesize)
+    monkeypatch.setattr(tts, "get_tts_cache", lambda: None)
+    monkeypatch.setattr(constants, "TTS_CONCURRENCY_MAX", 1)
+    worker = tts.TTSWorker()
+
+    def tasks(prefix, count):
+        return [{"text": f"{prefix}{index}", "path": str(tmp_path / f"{prefix}{index}.mp3"), "voice": "v"} for index in range(count)]
+
+    first = worker.submit(tasks("a", 4), "a")
+    while not order:
+        time.sleep(0.01)
+    second = worker.submit(tasks("b", 2), "b")
+    time.sleep(0.05)
+    gate.set()
+    first.wait()
+    second.wait()
+    worker.stop()
+
+    assert order == ["a0", "a1", "b0", "a2", "b1", "a3"]
+
+
+def test_malformed_task_is_skipped_and_stop_releases_waiters(tmp_path, monkeypatch):
+    async def slow_synthesize(task):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(tts, "get_tts_cache", lambda: None)
+    monkeypatch.setattr(tts, "_synthesize", slow_synthesize)
+    worker = tts.TTSWorker()
+
+    worker.submit([{"path": str(tmp_path / "bad.mp3")}], "s").wait()
+    assert worker.alive
+
+    job = worker.submit([{"text": "w", "path": str(tmp_path / "w.mp3"), "voice": "v"}], "s")
+    waiter = threading.Thread(target=job.wait)
+    waiter.start()
+    worker.stop()
+    waiter.join(timeout=5)
+
+    assert not waiter.is_alive() and not worker.alive
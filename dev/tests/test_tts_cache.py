@@ -0,0 +1,60 @@
+# Tests for the content-addressed TTS audio cache.
+
+import os
+
+import tts
+from tts_cache import TTSAudioCache, make_tts_key
+
+
+def _write(path, size=500):
+    with open(path, "wb") as handle:
+        handle.write(b"x" * size)
+
+
+def test_key_depends_on_voice_and_normalized_text():
+    assert make_tts_key(" the  harbor ", "en-US-JennyNeural") == make_tts_key("the harbor", "en-US-JennyNeural")
+    assert make_tts_key("the harbor", "en-US-JennyNeural") != make_tts_key("the harbor", "en-GB-SoniaNeural")
+
+
+def test_fetch_links_cached_clip_and_prune_drops_least_recent(tmp_path):
+    cache = TTSAudioCache(str(tmp_path / "audio"), max_bytes=1200)
+    for index, key in enumerate(["a" * 64, "b" * 64, "c" * 64]):
+        source = tmp_path / f"{index}.mp3"
+        _write(source)
+        cache.put(key, str(source))
+        os.utime(cache.path_for(key), (1000 + index, 1000 + index))
+
+    assert cache.fetch("a" * 64, str(tmp_path / "copy.mp3"))
+    assert (tmp_path / "copy.mp3").stat().st_size == 500
+    assert not cache.fetch("d" * 64, str(tmp_path / "missing.mp3"))
+
+    assert cache.prune() == 1
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) and cache.get("c" * 64)
+
+
+def test_batch_synthesizes_only_cache_misses(tmp_path, monkeypatch):
+    cache = TTSAudioCache(str(tmp_path / "audio"), max_bytes=10_000_000)
+    spoken = []
+
+    class FakeCommunicate:
+        def __init__(self, text, voice):
+            spoken.append(text)
+
+        async def save(self, path):
+            _write(path)
+
+    monkeypatch.setattr(tts, "get_tts_cache", lambda: cache)
+    monkeypatch.setattr(tts.edge_tts, "Communicate", FakeCommunicate)
+    monkeypatch.setattr(tts.random, "uniform", lambda low, high: 0)
+
+    first = [{"text": "harbor", "path": str(tmp_path / "1.mp3"), "voice": "v"}]
+    tts.run_async_batch(first)
+    second = [
+        {"text": "harbor", "path": str(tmp_path / "2.mp3"), "voice": "v"},
+        {"text": "gale", "path": str(tmp_path / "3.mp3"), "voice": "v"},
+    ]
+    tts.run_async_batch(second)
+
+    assert spoken == ["harbor", "gale"]
+    assert all(os.path.getsize(task["path"]) == 500 for task in first + second)
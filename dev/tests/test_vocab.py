@@ -4,8 +4,8 @@ import pytest
 
 # Set up minimal vocab dict and mock NLP so tests run without Streamlit/NLTK
 import resources
-resources.VOCAB_DICT = {"run": 100, "running": 100, "hello": 500, "known": 50}
-resources.FULL_DF = None
+
+TEST_VOCAB_DICT = {"run": 100, "running": 100, "hello": 500, "known": 50}
 
 
 class MockLemminflect:
@@ -21,10 +21,22 @@ class MockLemminflect:
 def mock_nlp(monkeypatch):
     def fake_load_nlp():
         return (None, MockLemminflect())
-    monkeypatch.setattr("vocab.load_nlp_resources", fake_load_nlp)
+    monkeypatch.setattr("vocab_logic.load_nlp_resources", fake_load_nlp)
+    monkeypatch.setattr(resources, "VOCAB_DICT", dict(TEST_VOCAB_DICT))
+    monkeypatch.setattr(resources, "FULL_DF", None)
+    clear_lemma_cache()
 
 
 from vocab import is_valid_word, analyze_logic
+from vocab_logic import (
+    build_surface_index,
+    clear_lemma_cache,
+    get_lemma,
+    get_lemma_cache_stats,
+    get_surface_index,
+    resolve_surface_form,
+    warm_lemma_cache,
+)
 
 
 def test_is_valid_word_length():
@@ -81,3 +93,73 @@ def test_analyze_logic_sort_by_rank():
     candidates, _, _ = analyze_logic(text, current_level=10, target_level=2000, include_unknown=False)
     ranks = [r for _, r in candidates]
     assert ranks == sorted(ranks)
+
+
+def test_get_lemma_caches_results():
+    assert get_lemma("running", MockLemminflect()) == "run"
+    assert get_lemma("running", MockLemminflect()) == "run"
+    stats = get_lemma_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_warm_lemma_cache_includes_inflections():
+    class InflectingLemminflect(MockLemminflect):
+        @staticmethod
+        def getAllInflections(word):
+            return {"VBG": (f"{word}ning",)} if word == "run" else {}
+
+    added = warm_lemma_cache(["run"], InflectingLemminflect())
+    assert added >= 2
+    assert get_lemma("running", None) == "run"
+    assert get_lemma_cache_stats()["misses"] == 0
+
+
+def test_surface_index_matches_on_the_fly_resolution():
+    vocab_dict = resources.VOCAB_DICT
+    display_dict = {word: word for word in vocab_dict}
+    index = build_surface_index(vocab_dict, display_dict, MockLemminflect())
+    assert index["running"] == (100, "run", "run")
+    for surface, entry in index.items():
+        assert resolve_surface_form(surface, MockLemminflect(), vocab_dict, display_dict) == entry
+
+
+def test_surface_index_ignored_for_other_vocabularies():
+    assert get_surface_index(resources.VOCAB_DICT, {}) == {}
+
+
+def test_resolve_surface_form_uses_irregular_forms_for_unknown_tokens():
+    vocab_dict = {"child": 101}
+    assert resolve_surface_form("children", MockLemminflect(), vocab_dict, {}) == (101, "child", "child")
+
+
+def test_analyze_chunks_matches_joined_text():
+    from vocab import analyze_chunks_with_remaining, analyze_logic_with_remaining
+
+    chunks = ["hello run", "running known", "hello"]
+    assert analyze_chunks_with_remaining(chunks, 10, 2000, False) == analyze_logic_with_remaining(
+        "\n".join(chunks), 10, 2000, False
+    )
+
+
+def test_parallel_token_count_matches_serial(monkeypatch):
+    from vocab_logic import count_text_tokens, count_text_tokens_auto
+
+    monkeypatch.setattr("constants.ANALYSIS_SHARD_CHARS", 200)
+    monkeypatch.setattr("constants.ANALYSIS_PARALLEL_MIN_CHARS", 400)
+    monkeypatch.setattr("constants.ANALYSIS_MAX_WORKERS", 2)
+    monkeypatch.setattr("vocab_logic.os.cpu_count", lambda: 2)
+    chunks = ["Hello runner, running known words again. " * 30, "Zebra quietly ran home.", "known " * 50]
+
+    serial_counts, serial_raw = count_text_tokens(chunks)
+    parallel_counts, parallel_raw = count_text_tokens_auto(chunks)
+    assert parallel_raw == serial_raw
+    assert list(parallel_counts.items()) == list(serial_counts.items())
+
+
+def test_count_text_tokens_folds_case_in_first_seen_order():
+    from vocab_logic import count_text_tokens
+
+    counts, raw_total = count_text_tokens(["Known zzz Hello known", "HELLO apple Known"])
+    assert raw_total == 7
+    assert list(counts.items()) == [("known", 3), ("hello", 2), ("apple", 1)]
@@ -0,0 +1,44 @@
+import resources
+import vocab_snapshot
+
+
+def _write_csv(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def _build_snapshot(csv_path, snapshot_path):
+    vocab_dict, _ = resources._load_vocab_csv(csv_path)
+    display_dict = dict(resources.VOCAB_DISPLAY_DICT)
+    entries = [(word, display_dict[word], rank) for word, rank in vocab_dict.items()]
+    vocab_snapshot.write_snapshot(snapshot_path, entries, vocab_snapshot.file_sha1(csv_path))
+
+
+def test_snapshot_store_matches_vocab_csv(tmp_path, monkeypatch):
+    csv_path = _write_csv(tmp_path / "vocab.csv", "word,rank\nthe,1\nMonday,3\ncafé,2\n")
+    snapshot_path = tmp_path / "vocab.bin"
+    monkeypatch.setattr("constants.VOCAB_SNAPSHOT_FILE", str(snapshot_path))
+    monkeypatch.setattr(resources, "VOCAB_DISPLAY_DICT", {})
+    _build_snapshot(csv_path, snapshot_path)
+    csv_vocab, csv_rows = resources._load_vocab_csv(csv_path)
+    csv_display = dict(resources.VOCAB_DISPLAY_DICT)
+
+    store, rows = resources._load_vocab_snapshot(csv_path)
+    assert list(store.items()) == list(csv_vocab.items()) == [("the", 1), ("café", 2), ("monday", 3)]
+    assert store.get("café") == 2 and store.get("cafe") is None and 42 not in store
+    assert resources.VOCAB_DISPLAY_DICT == csv_display
+    assert resources.VOCAB_DISPLAY_DICT.get("monday") == "Monday"
+    assert list(rows) == csv_rows and rows[-1] == {"word": "Monday", "rank": 3}
+
+
+def test_stale_snapshot_falls_back_to_csv(tmp_path, monkeypatch):
+    csv_path = _write_csv(tmp_path / "vocab.csv", "word,rank\nthe,1\nof,2\n")
+    snapshot_path = tmp_path / "vocab.bin"
+    monkeypatch.setattr("constants.VOCAB_SNAPSHOT_FILE", str(snapshot_path))
+    monkeypatch.setattr(resources, "VOCAB_DISPLAY_DICT", {})
+    _build_snapshot(csv_path, snapshot_path)
+
+    _write_csv(csv_path, "word,rank\nthe,1\nof,2\nand,3\n")
+    assert resources._load_vocab_snapshot(csv_path) is None
+    vocab_dict, _ = resources._load_vocab_file(csv_path)
+    assert vocab_dict == {"the": 1, "of": 2, "and": 3}
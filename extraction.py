@@ -1,5 +1,6 @@
 # Text extraction from files, URL, and Anki export.
 
+import codecs
 import csv
 import html
 import ipaddress
@@ -8,7 +9,7 @@ import re
 import sqlite3
 import tempfile
 from io import StringIO
-from typing import Any
+from typing import Any, Iterable, Iterator
 from urllib.parse import urlparse
 
 import pandas as pd
@@ -18,6 +19,7 @@ import constants
 from errors import ErrorHandler
 from resources import get_file_parsers
 from utils import detect_file_encoding
+from vocab_logic import TRAILING_WORD_PATTERN
 
 logger = __import__("logging").getLogger(__name__)
 
@@ -43,6 +45,80 @@ def _handle_extraction_error(error: Exception, file_type: str) -> str:
     return make_extraction_error(ErrorHandler.handle_file_error(error, file_type))
 
 
+class TextChunkStream:
+    """Iterate extractor chunks, stopping at and remembering a marked extraction error."""
+
+    def __init__(self, chunks: Iterable[str]) -> None:
+        self._chunks = chunks
+        self.error = ""
+        self.char_count = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self._chunks:
+            if is_extraction_error_text(chunk):
+                self.error = get_extraction_error_message(chunk)
+                return
+            self.char_count += len(chunk)
+            yield chunk
+
+
+def _join_chunks(chunks: Iterable[str], separator: str) -> str:
+    """Join extractor chunks into one string, returning a marked error as-is."""
+    parts = []
+    for chunk in chunks:
+        if is_extraction_error_text(chunk):
+            return chunk
+        parts.append(chunk)
+    return separator.join(parts)
+
+
+def _split_at_word_boundaries(pieces: Iterable[str]) -> Iterator[str]:
+    """Re-cut arbitrary text pieces so no chunk boundary falls inside a word."""
+    carry = ""
+    for piece in pieces:
+        text = carry + piece
+        match = TRAILING_WORD_PATTERN.search(text)
+        if match is None:
+            carry = text
+            continue
+        cut = match.start() + 1
+        carry = text[cut:]
+        if cut:
+            yield text[:cut]
+    if carry:
+        yield carry
+
+
+def _decode_in_slices(bytes_data: bytes, encoding: str, fallback: str = "latin-1") -> Iterator[str]:
+    """Decode bytes incrementally so only one slice of decoded text exists at a time.
+
+    On the first UnicodeDecodeError the rest of the data, from the start of
+    the failing slice, is decoded with fallback instead, ignoring errors.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    view = memoryview(bytes_data)
+    step = constants.TEXT_STREAM_CHUNK_BYTES
+    start = 0
+    while True:
+        final = start + step >= len(view)
+        pending = decoder.getstate()[0]
+        try:
+            text = decoder.decode(view[start:start + step], final=final)
+        except UnicodeDecodeError:
+            if decoder.errors == "ignore":
+                raise
+            logger.warning("Decode failed with %s, trying %s", encoding, fallback)
+            # Re-read the bytes the failed decoder was still holding, too.
+            start -= len(pending)
+            decoder = codecs.getincrementaldecoder(fallback)(errors="ignore")
+            continue
+        if text:
+            yield text
+        if final:
+            return
+        start += step
+
+
 def validate_article_url(url: str) -> tuple[bool, str]:
     """Validate article URLs before fetching remote content."""
     cleaned_url = str(url or "").strip()
@@ -149,93 +225,126 @@ def extract_text_from_url(url: str) -> str:
 
 def extract_from_txt(uploaded_file: Any) -> str:
     """Extract text from TXT file."""
+    return "".join(iter_txt_chunks(uploaded_file))
+
+
+def iter_txt_chunks(uploaded_file: Any) -> Iterator[str]:
+    """Yield TXT file text in bounded chunks split between words."""
     bytes_data = uploaded_file.getvalue()
     encoding = detect_file_encoding(bytes_data)
-
-    try:
-        return bytes_data.decode(encoding)
-    except UnicodeDecodeError:
-        logger.warning("Decode failed with %s, trying latin-1", encoding)
-        return bytes_data.decode('latin-1', errors='ignore')
+    yield from _split_at_word_boundaries(_decode_in_slices(bytes_data, encoding))
 
 
-def extract_from_pdf(uploaded_file: Any) -> str:
-    """Extract text from PDF file."""
+def iter_pdf_chunks(uploaded_file: Any) -> Iterator[str]:
+    """Yield PDF text one page at a time."""
     pypdf, _, _, _, _ = get_file_parsers()
 
     try:
         reader = pypdf.PdfReader(uploaded_file)
-        pages_text = [page.extract_text() for page in reader.pages if page.extract_text()]
-        return "\n".join(pages_text)
+        for page in reader.pages:
+            page_text = page.extract_text()
+            if page_text:
+                yield page_text
     except Exception as e:
-        return _handle_extraction_error(e, "PDF")
+        yield _handle_extraction_error(e, "PDF")
 
 
-def extract_from_docx(uploaded_file: Any) -> str:
-    """Extract text from DOCX file."""
+def extract_from_pdf(uploaded_file: Any) -> str:
+    """Extract text from PDF file."""
+    return _join_chunks(iter_pdf_chunks(uploaded_file), "\n")
+
+
+def iter_docx_chunks(uploaded_file: Any) -> Iterator[str]:
+    """Yield DOCX text one non-empty paragraph at a time."""
     _, docx, _, _, _ = get_file_parsers()
 
     try:
         doc = docx.Document(uploaded_file)
-        return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+        for para in doc.paragraphs:
+            if para.text.strip():
+                yield para.text
     except Exception as e:
-        return _handle_extraction_error(e, "DOCX")
+        yield _handle_extraction_error(e, "DOCX")
 
 
-def extract_from_epub(uploaded_file: Any) -> str:
-    """Extract text from EPUB file."""
+def extract_from_docx(uploaded_file: Any) -> str:
+    """Extract text from DOCX file."""
+    return _join_chunks(iter_docx_chunks(uploaded_file), "\n")
+
+
+def iter_epub_chunks(uploaded_file: Any) -> Iterator[str]:
+    """Yield EPUB text one document (chapter) at a time."""
     _, _, ebooklib, epub, BeautifulSoup = get_file_parsers()
 
     try:
         book = epub.read_epub(uploaded_file)
-        text_parts = []
         for item in book.get_items():
             if item.get_type() == ebooklib.ITEM_DOCUMENT:
                 soup = BeautifulSoup(item.get_content(), 'html.parser')
-                text_parts.append(soup.get_text(separator=' ', strip=True))
-        return "\n".join(text_parts)
+                yield soup.get_text(separator=' ', strip=True)
     except Exception as e:
-        return _handle_extraction_error(e, "EPUB")
+        yield _handle_extraction_error(e, "EPUB")
 
 
-def extract_from_csv(uploaded_file: Any) -> str:
-    """Extract text from CSV file."""
+def extract_from_epub(uploaded_file: Any) -> str:
+    """Extract text from EPUB file."""
+    return _join_chunks(iter_epub_chunks(uploaded_file), "\n")
+
+
+def _iter_dataframe_columns(frames: Iterable[Any]) -> Iterator[str]:
+    """Yield the non-empty cell text of each DataFrame column as one chunk."""
+    for frame in frames:
+        for col in frame.columns:
+            col_text = frame[col].astype(str)
+            col_text = col_text[col_text.notna() & (col_text != '') & (col_text != 'nan')]
+            if len(col_text):
+                yield " ".join(col_text.tolist())
+
+
+def iter_csv_chunks(uploaded_file: Any) -> Iterator[str]:
+    """Yield CSV text one column at a time."""
     bytes_data = uploaded_file.getvalue()
     encoding = detect_file_encoding(bytes_data)
 
     try:
         content = bytes_data.decode(encoding)
         df = pd.read_csv(StringIO(content))
-        text_parts = []
-        for col in df.columns:
-            col_text = df[col].astype(str)
-            col_text = col_text[col_text.notna() & (col_text != '') & (col_text != 'nan')]
-            text_parts.extend(col_text.tolist())
-        return " ".join(text_parts)
+        del content
+        yield from _iter_dataframe_columns([df])
     except Exception as e:
-        return _handle_extraction_error(e, "CSV")
+        yield _handle_extraction_error(e, "CSV")
 
 
-def extract_from_excel(uploaded_file: Any) -> str:
-    """Extract text from Excel file."""
+def extract_from_csv(uploaded_file: Any) -> str:
+    """Extract text from CSV file."""
+    return _join_chunks(iter_csv_chunks(uploaded_file), " ")
+
+
+def iter_excel_chunks(uploaded_file: Any) -> Iterator[str]:
+    """Yield Excel text one column at a time across all sheets."""
     try:
         df = pd.read_excel(uploaded_file, sheet_name=None, engine='openpyxl')
     except Exception:
         try:
             df = pd.read_excel(uploaded_file, sheet_name=None, engine='xlrd')
         except Exception as e:
-            return _handle_extraction_error(e, "Excel 文件")
+            yield _handle_extraction_error(e, "Excel 文件")
+            return
 
     try:
-        text_parts = []
-        for sheet_name, sheet_df in df.items():
-            for col in sheet_df.columns:
-                col_text = sheet_df[col].astype(str)
-                col_text = col_text[col_text.notna() & (col_text != '') & (col_text != 'nan')]
-                text_parts.extend(col_text.tolist())
-        return " ".join(text_parts)
+        yield from _iter_dataframe_columns(df.values())
     except Exception as e:
-        return _handle_extraction_error(e, "Excel 文件")
+        yield _handle_extraction_error(e, "Excel 文件")
+
+
+def extract_from_excel(uploaded_file: Any) -> str:
+    """Extract text from Excel file."""
+    return _join_chunks(iter_excel_chunks(uploaded_file), " ")
+
+
+def iter_sqlite_chunks(uploaded_file: Any) -> Iterator[str]:
+    """Yield SQLite word text as a single chunk."""
+    yield extract_from_sqlite(uploaded_file)
 
 
 def extract_from_sqlite(uploaded_file: Any) -> str:
@@ -300,6 +409,39 @@ def extract_text_from_file(uploaded_file: Any) -> str:
     return make_extraction_error(f"暂不支持这种文件类型：{file_type}")
 
 
+def iter_text_chunks_from_file(uploaded_file: Any) -> Iterator[str]:
+    """Stream text chunks (pages, paragraphs, chapters, columns) from an uploaded file.
+
+    Errors are yielded as a single marked chunk; wrap the result in
+    TextChunkStream to stop at it.
+    """
+    file_name = getattr(uploaded_file, "name", "")
+    if "." not in file_name:
+        yield make_extraction_error("无法识别文件类型，请上传带扩展名的文件。")
+        return
+
+    file_type = file_name.split('.')[-1].lower()
+
+    chunk_extractors = {
+        'txt': iter_txt_chunks,
+        'pdf': iter_pdf_chunks,
+        'docx': iter_docx_chunks,
+        'epub': iter_epub_chunks,
+        'db': iter_sqlite_chunks,
+        'sqlite': iter_sqlite_chunks,
+        'csv': iter_csv_chunks,
+        'xlsx': iter_excel_chunks,
+        'xls': iter_excel_chunks,
+    }
+
+    chunk_extractor = chunk_extractors.get(file_type)
+    if chunk_extractor:
+        yield from chunk_extractor(uploaded_file)
+        return
+
+    yield make_extraction_error(f"暂不支持这种文件类型：{file_type}")
+
+
 def is_upload_too_large(uploaded_file: Any) -> bool:
     """Check if uploaded file exceeds size limit."""
     if not uploaded_file:
@@ -0,0 +1,84 @@
+# Tiered word lookup (local lexicon, response cache, AI) with per-tier latency metrics.
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import constants
+
+logger = logging.getLogger(__name__)
+
+# A tier returns a finished lookup result, or None to fall through to the next tier.
+LookupTier = Callable[[str], Optional[Dict[str, Any]]]
+
+
+@dataclass
+class TierMetrics:
+    calls: int = 0
+    hits: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class TieredLookup:
+    """Try lookup tiers in the order a policy names them and answer from the first hit.
+
+    Policies are tuples of tier names from constants.LOOKUP_POLICIES; the
+    result records which tier answered and how long the whole lookup took.
+    """
+
+    def __init__(self, tiers: Dict[str, LookupTier]) -> None:
+        self._tiers = tiers
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, TierMetrics] = {name: TierMetrics() for name in tiers}
+
+    def _policy_tiers(self, policy: Optional[str]) -> Tuple[str, ...]:
+        name = policy or constants.LOOKUP_POLICY_DEFAULT
+        tiers = constants.LOOKUP_POLICIES.get(name)
+        if tiers is None:
+            logger.warning("Unknown lookup policy %r; using %r", name, constants.LOOKUP_POLICY_DEFAULT)
+            tiers = constants.LOOKUP_POLICIES[constants.LOOKUP_POLICY_DEFAULT]
+        return tuple(tier for tier in tiers if tier in self._tiers)
+
+    def lookup(self, word: str, policy: Optional[str] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        for name in self._policy_tiers(policy):
+            tier_started = time.perf_counter()
+            try:
+                result = self._tiers[name](word)
+            except Exception as e:
+                logger.warning("Lookup tier %s failed for %r: %s", name, word, e)
+                result = None
+            self._record(name, time.perf_counter() - tier_started, result is not None)
+            if result is not None:
+                return {
+                    **result,
+                    "source": name,
+                    "latency_ms": (time.perf_counter() - started) * 1000,
+                }
+        return {"error": "本地词典和缓存中没有找到该词。", "source": "none"}
+
+    def _record(self, name: str, seconds: float, hit: bool) -> None:
+        with self._lock:
+            metrics = self._metrics[name]
+            metrics.calls += 1
+            metrics.hits += int(hit)
+            metrics.total_seconds += seconds
+            metrics.max_seconds = max(metrics.max_seconds, seconds)
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """Return calls, hit rate and latency per tier, in tier order."""
+        with self._lock:
+            return [
+                {
+                    "tier": name,
+                    "calls": metrics.calls,
+                    "hits": metrics.hits,
+                    "hit_rate": metrics.hits / metrics.calls if metrics.calls else 0.0,
+                    "avg_ms": metrics.total_seconds * 1000 / metrics.calls if metrics.calls else 0.0,
+                    "max_ms": metrics.max_seconds * 1000,
+                }
+                for name, metrics in self._metrics.items()
+            ]
@@ -3,9 +3,14 @@
 import logging
 import os
 import csv
+import random
 import re
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
 try:
     import streamlit as st
@@ -32,15 +37,18 @@ except ModuleNotFoundError:
     st = _StreamlitFallback()
 
 import constants
+import vocab_snapshot
 from errors import ErrorHandler
+from vocab_snapshot import VocabRows, VocabStore
 
 logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 
-# Set by app after load_vocab_data() so vocab module can use them.
-VOCAB_DICT: Dict[str, int] = {}
-VOCAB_DISPLAY_DICT: Dict[str, str] = {}
+# Set by app after load_vocab_data() so vocab module can use them. Both are
+# read-only views over the memory-mapped VocabStore when the snapshot is current.
+VOCAB_DICT: Mapping[str, int] = {}
+VOCAB_DISPLAY_DICT: Mapping[str, str] = {}
 FULL_DF: Optional[Any] = None
 VOCAB_LOAD_ATTEMPTED = False
 
@@ -108,7 +116,7 @@ IRREGULAR_VOCAB_FORMS = {
 }
 
 
-def get_vocab_dict() -> Dict[str, int]:
+def get_vocab_dict() -> Mapping[str, int]:
     """Return current VOCAB_DICT (set by app after load_vocab_data())."""
     global VOCAB_DICT, FULL_DF, VOCAB_LOAD_ATTEMPTED
     if not VOCAB_DICT and not VOCAB_LOAD_ATTEMPTED:
@@ -116,13 +124,13 @@ def get_vocab_dict() -> Dict[str, int]:
         default_path = BASE_DIR / constants.VOCAB_PROJECT_FILE
         if default_path.exists():
             try:
-                VOCAB_DICT, FULL_DF = _load_vocab_csv(default_path)
+                VOCAB_DICT, FULL_DF = _load_vocab_file(default_path)
             except Exception as e:
                 logger.warning(f"Could not lazy-load default vocab CSV {default_path}: {e}")
     return VOCAB_DICT
 
 
-def get_vocab_display_dict() -> Dict[str, str]:
+def get_vocab_display_dict() -> Mapping[str, str]:
     """Return display spelling by normalized word key."""
     if not VOCAB_DISPLAY_DICT:
         get_vocab_dict()
@@ -138,13 +146,13 @@ def _normalize_vocab_lookup_key(value: str) -> str:
     return re.sub(r"\s+", " ", cleaned)
 
 
-def _add_vocab_candidate(candidates: list[str], value: str) -> None:
+def _add_vocab_candidate(candidates: Dict[str, None], value: str) -> None:
     candidate = _normalize_vocab_lookup_key(value)
-    if candidate and candidate not in candidates:
-        candidates.append(candidate)
+    if candidate:
+        candidates.setdefault(candidate)
 
 
-def _add_simple_inflection_candidates(candidates: list[str], key: str) -> None:
+def _add_simple_inflection_candidates(candidates: Dict[str, None], key: str) -> None:
     """Add lightweight English inflection candidates without requiring NLP packages."""
     if not re.fullmatch(r"[a-z][a-z'-]*", key):
         return
@@ -195,9 +203,10 @@ def _add_simple_inflection_candidates(candidates: list[str], key: str) -> None:
             _add_vocab_candidate(candidates, stem[:-1])
 
 
-def vocab_lookup_candidates(value: str) -> list[str]:
-    """Return exact and simple lemma candidates for a vocabulary lookup."""
-    candidates: list[str] = []
+@lru_cache(maxsize=constants.VOCAB_CANDIDATE_CACHE_MAX)
+def _vocab_lookup_candidates(value: str) -> Tuple[str, ...]:
+    # Ordered set: keeps first-added order without list membership scans.
+    candidates: Dict[str, None] = {}
     key = _normalize_vocab_lookup_key(value)
     _add_vocab_candidate(candidates, key)
 
@@ -208,7 +217,12 @@ def vocab_lookup_candidates(value: str) -> list[str]:
         _add_vocab_candidate(candidates, key.replace("'", ""))
 
     _add_simple_inflection_candidates(candidates, key)
-    return candidates
+    return tuple(candidates)
+
+
+def vocab_lookup_candidates(value: str) -> list[str]:
+    """Return exact and simple lemma candidates for a vocabulary lookup."""
+    return list(_vocab_lookup_candidates(str(value or "")))
 
 
 def resolve_vocab_rank(value: str) -> Tuple[Optional[int], str]:
@@ -222,9 +236,205 @@ def resolve_vocab_rank(value: str) -> Tuple[Optional[int], str]:
     return None, ""
 
 
-@st.cache_data
+def _safe_rank(value: Any) -> Optional[int]:
+    """Convert a loose rank value, returning None instead of raising."""
+    try:
+        return int(float(str(value).strip()))
+    except (TypeError, ValueError):
+        return None
+
+
+class VocabRankIndex:
+    """Rank-sorted vocabulary columns that answer rank-range queries by bisect."""
+
+    def __init__(self, ranks: Sequence[int], word_at: Callable[[int], str]) -> None:
+        self._ranks = ranks
+        self._word_at = word_at
+
+    @classmethod
+    def from_rows(cls, full_df: Any) -> "VocabRankIndex":
+        """Build an index from a VocabStore, a list of row dicts, or a DataFrame."""
+        if isinstance(full_df, VocabRows):
+            store = full_df.store
+            return cls(store.ranks, store.display_at)
+
+        pairs: list[tuple[int, str]] = []
+        if isinstance(full_df, Sequence):
+            for row in full_df:
+                if not isinstance(row, dict):
+                    continue
+                word = str(row.get("word", "")).strip()
+                rank = _safe_rank(row.get("rank"))
+                if word and rank is not None:
+                    pairs.append((rank, word))
+        elif full_df is not None:
+            rank_col = next((column for column in full_df.columns if "rank" in str(column).lower()), None)
+            word_col = next((column for column in full_df.columns if "word" in str(column).lower()), None)
+            if rank_col is not None and word_col is not None:
+                for word, raw_rank in zip(full_df[word_col], full_df[rank_col]):
+                    rank = _safe_rank(raw_rank)
+                    if rank is not None:
+                        pairs.append((rank, str(word)))
+
+        pairs.sort(key=lambda pair: pair[0])
+        words = [word for _, word in pairs]
+        return cls(array("i", (rank for rank, _ in pairs)), words.__getitem__)
+
+    def __len__(self) -> int:
+        return len(self._ranks)
+
+    def bounds(self, min_rank: int, max_rank: int) -> Tuple[int, int]:
+        """Return the [start, end) positions of ranks within [min_rank, max_rank]."""
+        start = bisect_left(self._ranks, min_rank)
+        return start, max(start, bisect_right(self._ranks, max_rank))
+
+    def count_between(self, min_rank: int, max_rank: int) -> int:
+        start, end = self.bounds(min_rank, max_rank)
+        return end - start
+
+    def select(self, min_rank: int, max_rank: int, count: int, randomize: bool = False) -> list[tuple[str, int]]:
+        """Return the first `count` (word, rank) rows in range, or a random sample."""
+        start, end = self.bounds(min_rank, max_rank)
+        count = max(0, min(count, end - start))
+        if randomize:
+            positions = random.sample(range(start, end), k=count)
+        else:
+            positions = range(start, start + count)
+        return [(self._word_at(position), int(self._ranks[position])) for position in positions]
+
+
+# Rank index for the rows object it was built from.
+_RANK_INDEX_STATE: Dict[str, Any] = {"rows": None, "index": None}
+
+
+def get_vocab_rank_index(full_df: Any) -> VocabRankIndex:
+    """Return the rank index for full_df, building it once per rows object."""
+    if _RANK_INDEX_STATE["index"] is None or _RANK_INDEX_STATE["rows"] is not full_df:
+        _RANK_INDEX_STATE["index"] = VocabRankIndex.from_rows(full_df)
+        _RANK_INDEX_STATE["rows"] = full_df
+    return _RANK_INDEX_STATE["index"]
+
+
+class VocabSearchIndex:
+    """Sorted headword list used as an implicit trie for prefix and typo lookups.
+
+    Fuzzy search walks the sorted keys with one edit-distance row per prefix
+    character, reusing rows shared with the previous key and skipping every
+    key under a prefix whose row already exceeds the distance limit.
+    """
+
+    def __init__(self, vocab_dict: Mapping[str, int]) -> None:
+        self._vocab = vocab_dict
+        self._keys = sorted(vocab_dict)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _by_rank(self, words: Iterable[str]) -> list[str]:
+        return sorted(words, key=lambda word: (self._vocab.get(word, 99999), word))
+
+    def complete(self, prefix: str, limit: int = constants.VOCAB_SUGGESTION_LIMIT) -> list[str]:
+        """Return the most frequent headwords starting with prefix."""
+        prefix = _normalize_vocab_lookup_key(prefix)
+        if not prefix:
+            return []
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo=start)
+        return self._by_rank(self._keys[start:end])[:limit]
+
+    def fuzzy(
+        self,
+        word: str,
+        max_distance: int = constants.VOCAB_SUGGESTION_MAX_DISTANCE,
+        limit: int = constants.VOCAB_SUGGESTION_LIMIT,
+    ) -> list[Tuple[str, int]]:
+        """Return (headword, distance) pairs within max_distance edits, closest and most frequent first.
+
+        Distance counts insertions, deletions, substitutions and adjacent
+        transpositions (optimal string alignment).
+        """
+        query = _normalize_vocab_lookup_key(word)
+        if not query:
+            return []
+        keys = self._keys
+        query_length = len(query)
+        rows = [list(range(query_length + 1))]
+        previous = ""
+        matches: list[Tuple[str, int]] = []
+        position = 0
+        while position < len(keys):
+            key = keys[position]
+            shared = 0
+            limit_shared = min(len(previous), len(key), len(rows) - 1)
+            while shared < limit_shared and previous[shared] == key[shared]:
+                shared += 1
+            del rows[shared + 1:]
+
+            pruned = False
+            for depth in range(shared, len(key)):
+                char = key[depth]
+                above = rows[depth]
+                row = [depth + 1]
+                for column in range(1, query_length + 1):
+                    cost = 0 if query[column - 1] == char else 1
+                    value = min(above[column] + 1, row[column - 1] + 1, above[column - 1] + cost)
+                    if (
+                        depth
+                        and column > 1
+                        and query[column - 1] == key[depth - 1]
+                        and query[column - 2] == char
+                    ):
+                        value = min(value, rows[depth - 1][column - 2] + 1)
+                    row.append(value)
+                rows.append(row)
+                if min(row) > max_distance:
+                    pruned = True
+                    break
+
+            if pruned:
+                previous = key[:len(rows) - 1]
+                position = bisect_left(keys, previous[:-1] + chr(ord(previous[-1]) + 1), lo=position + 1)
+                continue
+            distance = rows[len(key)][query_length]
+            if distance <= max_distance:
+                matches.append((key, distance))
+            previous = key
+            position += 1
+
+        matches.sort(key=lambda match: (match[1], self._vocab.get(match[0], 99999), match[0]))
+        return matches[:limit]
+
+
+# Search index for the vocabulary object it was built from.
+_SEARCH_INDEX_STATE: Dict[str, Any] = {"vocab": None, "index": None}
+
+
+def get_vocab_search_index() -> VocabSearchIndex:
+    """Return the prefix/fuzzy index over the current vocabulary, building it once."""
+    vocab_dict = get_vocab_dict()
+    if _SEARCH_INDEX_STATE["index"] is None or _SEARCH_INDEX_STATE["vocab"] is not vocab_dict:
+        _SEARCH_INDEX_STATE["index"] = VocabSearchIndex(vocab_dict)
+        _SEARCH_INDEX_STATE["vocab"] = vocab_dict
+    return _SEARCH_INDEX_STATE["index"]
+
+
+def suggest_vocab_words(value: str, limit: int = constants.VOCAB_SUGGESTION_LIMIT) -> list[str]:
+    """Return display spellings of likely intended headwords for an unknown query.
+
+    Close spellings come first, then frequent completions of the query.
+    """
+    index = get_vocab_search_index()
+    display_dict = get_vocab_display_dict()
+    suggestions: list[str] = []
+    for word in [match[0] for match in index.fuzzy(value, limit=limit)] + index.complete(value, limit=limit):
+        if word not in suggestions:
+            suggestions.append(word)
+    return [display_dict.get(word, word) for word in suggestions[:limit]]
+
+
+@st.cache_resource
 def load_local_card_lexicon() -> Dict[str, dict[str, str]]:
-    """Load local dictionary definitions used to ground generated cards."""
+    """Load local dictionary definitions used to ground generated cards (shared, read-only)."""
     path = BASE_DIR / constants.LOCAL_CARD_LEXICON_FILE
     if not path.exists():
         return {}
@@ -243,6 +453,8 @@ def load_local_card_lexicon() -> Dict[str, dict[str, str]]:
                 "pos": str(row.get("pos", "")).strip(),
                 "phonetic": str(row.get("phonetic", "")).strip(),
                 "english_definition": definition,
+                # Optional column; the simple lookup answers locally only when it is present.
+                "chinese_definition": str(row.get("chinese_definition", "")).strip(),
                 "example": str(row.get("example", "")).strip(),
                 "example_translation": str(row.get("example_translation", "")).strip(),
                 "sources": str(row.get("sources", "")).strip(),
@@ -251,14 +463,82 @@ def load_local_card_lexicon() -> Dict[str, dict[str, str]]:
     return entries
 
 
+# Memoised lookup key -> lexicon headword (or None) for the lexicon it was built for.
+_LEXICON_ALIAS_STATE: Dict[str, Any] = {"entries": None, "aliases": {}}
+
+
+def _local_card_aliases(entries: Dict[str, dict[str, str]]) -> Dict[str, Optional[str]]:
+    """Return the alias memo for entries, seeding it with the irregular forms."""
+    if _LEXICON_ALIAS_STATE["entries"] is not entries:
+        aliases: Dict[str, Optional[str]] = {
+            form: headword for form, headword in IRREGULAR_VOCAB_FORMS.items() if headword in entries and form not in entries
+        }
+        _LEXICON_ALIAS_STATE["aliases"] = aliases
+        _LEXICON_ALIAS_STATE["entries"] = entries
+    return _LEXICON_ALIAS_STATE["aliases"]
+
+
+def _local_card_headword(value: str, entries: Dict[str, dict[str, str]]) -> Optional[str]:
+    """Resolve a word to its lexicon headword, generating candidates once per distinct word."""
+    aliases = _local_card_aliases(entries)
+    key = str(value or "")
+    if key in entries:
+        return key
+    if key in aliases:
+        return aliases[key]
+    headword = next((candidate for candidate in _vocab_lookup_candidates(key) if candidate in entries), None)
+    if len(aliases) < constants.VOCAB_CANDIDATE_CACHE_MAX:
+        aliases[key] = headword
+    return headword
+
+
+def lookup_local_card_entries(values: Iterable[str]) -> Dict[str, Optional[dict[str, str]]]:
+    """Resolve many words in one pass; each distinct word maps to a copy of its entry or None."""
+    entries = load_local_card_lexicon()
+    resolved: Dict[str, Optional[dict[str, str]]] = {}
+    for value in values:
+        if value in resolved:
+            continue
+        headword = _local_card_headword(value, entries) if entries else None
+        resolved[value] = dict(entries[headword]) if headword is not None else None
+    return resolved
+
+
 def lookup_local_card_entry(value: str) -> Optional[dict[str, str]]:
     """Return a local dictionary entry, matching simple inflections when possible."""
     entries = load_local_card_lexicon()
-    for candidate in vocab_lookup_candidates(value):
-        entry = entries.get(candidate)
-        if entry is not None:
-            return dict(entry)
-    return None
+    headword = _local_card_headword(value, entries) if entries else None
+    return dict(entries[headword]) if headword is not None else None
+
+
+@st.cache_resource
+def load_surface_index() -> Tuple[str, Dict[str, Tuple[int, str, str]]]:
+    """Load the prebuilt surface-form index as (vocab fingerprint, entries)."""
+    path = BASE_DIR / constants.VOCAB_SURFACE_INDEX_FILE
+    if not path.exists():
+        return "", {}
+
+    fingerprint = ""
+    entries: Dict[str, Tuple[int, str, str]] = {}
+    try:
+        with path.open("r", encoding="utf-8", newline="") as csv_file:
+            header = csv_file.readline().strip()
+            if header.startswith("# vocab_sha1="):
+                fingerprint = header.split("=", 1)[1].strip()
+            reader = csv.DictReader(csv_file)
+            for row in reader:
+                surface = str(row.get("surface", "")).strip()
+                if not surface:
+                    continue
+                entries[surface] = (
+                    int(row["rank"]),
+                    str(row.get("word", "")),
+                    str(row.get("lemma", "")),
+                )
+    except Exception as e:
+        logger.warning(f"Could not load surface index {path}: {e}")
+        return "", {}
+    return fingerprint, entries
 
 
 @st.cache_resource(show_spinner="正在加载分词与词形还原资源...")
@@ -352,9 +632,35 @@ def _load_vocab_csv(file_path: Path) -> Tuple[Dict[str, int], list[dict[str, Any
     return {}, []
 
 
-@st.cache_data
-def load_vocab_data() -> Tuple[Dict[str, int], Optional[Any]]:
-    """Load vocabulary data from pickle or CSV files."""
+def _load_vocab_snapshot(csv_path: Path) -> Optional[Tuple[VocabStore, VocabRows]]:
+    """Map the binary vocab snapshot if it was built from csv_path's current contents."""
+    global VOCAB_DISPLAY_DICT
+    snapshot_path = BASE_DIR / constants.VOCAB_SNAPSHOT_FILE
+    if not snapshot_path.exists():
+        return None
+    store = VocabStore.open(snapshot_path, vocab_snapshot.file_sha1(csv_path))
+    if store is None:
+        return None
+
+    VOCAB_DISPLAY_DICT = store.displays
+    return store, store.rows
+
+
+def _load_vocab_file(file_path: Path) -> Tuple[Mapping[str, int], Sequence[dict[str, Any]]]:
+    """Load a word/rank CSV, using its binary snapshot when one is current."""
+    try:
+        loaded = _load_vocab_snapshot(file_path)
+    except Exception as e:
+        logger.warning(f"Could not load vocab snapshot for {file_path}: {e}")
+        loaded = None
+    if loaded is not None:
+        return loaded
+    return _load_vocab_csv(file_path)
+
+
+@st.cache_resource
+def load_vocab_data() -> Tuple[Mapping[str, int], Optional[Any]]:
+    """Load vocabulary data from pickle, snapshot or CSV files (shared, read-only)."""
     global VOCAB_DISPLAY_DICT
     pickle_candidates = [BASE_DIR / "vocab.pkl", DATA_DIR / "vocab.pkl"]
     for pickle_path in pickle_candidates:
@@ -382,7 +688,7 @@ def load_vocab_data() -> Tuple[Dict[str, int], Optional[Any]]:
 
     if file_path:
         try:
-            return _load_vocab_csv(file_path)
+            return _load_vocab_file(file_path)
         except Exception as e:
             logger.error(f"Error loading CSV file {file_path}: {e}")
             return {}, None
@@ -0,0 +1,48 @@
+"""Build the surface-form index used to rank extracted tokens.
+
+Every headword in the app vocabulary, its lemminflect inflections and the
+irregular forms are resolved once with the same rules as text analysis, and
+written as `surface,rank,word,lemma` rows. The first line records a hash of
+the vocabulary so the app ignores the index when the word list changes.
+
+Unlike the other build scripts this one needs `lemminflect` installed.
+"""
+
+from __future__ import annotations
+
+import csv
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import constants  # noqa: E402
+import resources  # noqa: E402
+from vocab_logic import build_surface_index, vocab_fingerprint  # noqa: E402
+
+OUTPUT_PATH = ROOT / constants.VOCAB_SURFACE_INDEX_FILE
+
+
+def main() -> None:
+    import lemminflect
+
+    vocab_dict, _ = resources._load_vocab_csv(ROOT / constants.VOCAB_PROJECT_FILE)
+    display_dict = dict(resources.VOCAB_DISPLAY_DICT)
+    index = build_surface_index(vocab_dict, display_dict, lemminflect)
+
+    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with OUTPUT_PATH.open("w", encoding="utf-8", newline="") as csv_file:
+        csv_file.write(f"# vocab_sha1={vocab_fingerprint(vocab_dict, display_dict)}\n")
+        writer = csv.writer(csv_file)
+        writer.writerow(["surface", "rank", "word", "lemma"])
+        for surface, (rank, word, lemma) in sorted(index.items(), key=lambda item: (item[1][0], item[0])):
+            writer.writerow([surface, rank, word, lemma])
+
+    print(f"Wrote {len(index)} surface forms to {OUTPUT_PATH.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Build the binary vocabulary snapshot loaded at app start-up.
+
+Parses `ngsl_31k_priority.csv` with the app's own CSV loader and writes the
+result as a rank-ordered string table (see vocab_snapshot.py). The snapshot
+stores the CSV's SHA-1, so the app falls back to the CSV whenever the word
+list changes and the snapshot has not been rebuilt.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import constants  # noqa: E402
+import resources  # noqa: E402
+import vocab_snapshot  # noqa: E402
+
+SOURCE_PATH = ROOT / constants.VOCAB_PROJECT_FILE
+OUTPUT_PATH = ROOT / constants.VOCAB_SNAPSHOT_FILE
+
+
+def main() -> None:
+    vocab_dict, _ = resources._load_vocab_csv(SOURCE_PATH)
+    display_dict = dict(resources.VOCAB_DISPLAY_DICT)
+    entries = [(word, display_dict.get(word, word), rank) for word, rank in vocab_dict.items()]
+
+    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    count = vocab_snapshot.write_snapshot(OUTPUT_PATH, entries, vocab_snapshot.file_sha1(SOURCE_PATH))
+    print(f"Wrote {count} vocabulary entries to {OUTPUT_PATH.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
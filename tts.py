@@ -1,98 +1,371 @@
-# TTS audio generation (edge_tts, async batch).
+# TTS audio generation (edge_tts) on a long-lived background event loop.
 
 import asyncio
 import logging
 import os
+import queue
 import random
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
 
 import edge_tts
 
 import constants
 from errors import ProgressCallback
+from tts_cache import get_tts_cache, make_tts_key, normalize_tts_text
 
 logger = logging.getLogger(__name__)
 
 
-async def _generate_audio_batch(
-    tasks: List[Dict[str, str]],
-    concurrency: int = constants.TTS_CONCURRENCY,
-    progress_callback: Optional[ProgressCallback] = None
-) -> None:
-    """Generate audio files concurrently with retry logic."""
-    semaphore = asyncio.Semaphore(concurrency)
-    total_files = len(tasks)
-    completed_files = 0
-
-    async def worker(task: Dict[str, str]) -> None:
-        nonlocal completed_files
-        success = False
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight TTS requests within one event loop.
+
+    Each fast success adds 1/limit (about +1 per round of requests); a
+    failure, timeout or slow response halves the limit. The limit is kept
+    between TTS_CONCURRENCY_MIN and TTS_CONCURRENCY_MAX.
+    """
+
+    def __init__(self, initial: float) -> None:
+        self.limit = min(max(float(initial), constants.TTS_CONCURRENCY_MIN), constants.TTS_CONCURRENCY_MAX)
+        self.in_flight = 0
+        self.peak = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    async def release(self, success: bool, latency: float) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            if success and latency <= constants.TTS_LATENCY_TARGET_SECONDS:
+                self.limit = min(constants.TTS_CONCURRENCY_MAX, self.limit + 1 / self.limit)
+            else:
+                self.limit = max(constants.TTS_CONCURRENCY_MIN, self.limit / 2)
+            self._condition.notify_all()
+
+    async def cancel(self) -> None:
+        """Give back a slot that was not used for a request."""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+
+async def _synthesize(task: Dict[str, str]) -> None:
+    """Write one clip to task['path'], raising if edge_tts fails or the file is too small."""
+    comm = edge_tts.Communicate(normalize_tts_text(task['text']), task['voice'])
+    await asyncio.wait_for(comm.save(task['path']), timeout=constants.TTS_TASK_TIMEOUT_SECONDS)
+    if not os.path.exists(task['path']) or os.path.getsize(task['path']) <= constants.MIN_AUDIO_FILE_SIZE:
+        raise Exception("File size too small")
+
+
+def _reuse_existing_audio(task: Dict[str, str], cache_key: str) -> bool:
+    """Return True when the clip already exists or was linked from the audio cache."""
+    cache = get_tts_cache()
+    return os.path.exists(task['path']) or (cache is not None and cache.fetch(cache_key, task['path']))
+
+
+def _remove_partial_audio(path: str) -> None:
+    if os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+async def _synthesize_with_retries(
+    task: Dict[str, str],
+    cache_key: str,
+    limiter: AdaptiveConcurrency,
+    cancelled: Optional[threading.Event] = None,
+) -> bool:
+    """Synthesize a clip; the caller already holds one limiter slot for the first attempt.
+
+    Only retries wait, with jittered backoff, so a healthy service is never
+    slowed down; a waiting retry does not hold a slot. No retry is made once
+    cancelled is set.
+    """
+    error_msg = ""
+    for attempt in range(constants.TTS_RETRY_ATTEMPTS):
+        if attempt:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * attempt)
+            if cancelled is not None and cancelled.is_set():
+                return False
+            await limiter.acquire()
+        started = time.monotonic()
+        try:
+            await _synthesize(task)
+        except asyncio.CancelledError:
+            # Cancelled by the caller, not a sign of congestion: keep the limit.
+            _remove_partial_audio(task['path'])
+            await limiter.cancel()
+            raise
+        except Exception as e:
+            error_msg = str(e)
+            _remove_partial_audio(task['path'])
+            await limiter.release(False, time.monotonic() - started)
+            continue
+        await limiter.release(True, time.monotonic() - started)
+        cache = get_tts_cache()
+        if cache is not None:
+            cache.put(cache_key, task['path'])
+        return True
+
+    logger.error("TTS failed for: %s | Error: %s", task['text'], error_msg)
+    return False
+
+
+class TTSJob:
+    """One caller's batch of TTS tasks; progress events are queued for the caller's thread."""
+
+    def __init__(
+        self,
+        tasks: List[Dict[str, str]],
+        session: str,
+        alive: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        self.tasks = tasks
+        self.session = session
+        self.total = len(tasks)
+        self.completed = 0
+        self.events: "queue.Queue[Tuple[float, str]]" = queue.Queue()
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+        self._alive = alive
+        if not tasks:
+            self.done.set()
+
+    def _task_finished(self) -> None:
+        self.completed += 1
+        self.events.put((self.completed / self.total, f"正在生成音频 ({self.completed}/{self.total})"))
+        if self.completed >= self.total:
+            self.done.set()
+
+    def _abort(self) -> None:
+        """Release waiters without finishing the remaining tasks."""
+        self.done.set()
+
+    def wait(self, progress_callback: Optional[ProgressCallback] = None) -> None:
+        """Block until the job is done, relaying progress on the calling thread.
+
+        Returns early when the worker died or no task finished for
+        TTS_JOB_STALL_SECONDS; clips not written by then are simply missing.
+        """
+        last_progress = time.monotonic()
+        while True:
+            try:
+                ratio, message = self.events.get(timeout=0.2)
+            except queue.Empty:
+                if self.done.is_set() and self.events.empty():
+                    return
+                if self._alive is not None and not self._alive():
+                    logger.error("TTS worker stopped with %s/%s clips done", self.completed, self.total)
+                    return
+                if time.monotonic() - last_progress > constants.TTS_JOB_STALL_SECONDS:
+                    logger.error("TTS job stalled with %s/%s clips done", self.completed, self.total)
+                    return
+                continue
+            last_progress = time.monotonic()
+            if progress_callback:
+                progress_callback(ratio, message)
+
+
+class TTSWorker:
+    """Background thread running one event loop that serves every session's TTS jobs.
+
+    Tasks are dispatched round-robin across sessions, so one large deck
+    cannot starve another session's audio, and all of them share a single
+    AdaptiveConcurrency limit towards the TTS service.
+    """
+
+    def __init__(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="tts-worker", daemon=True)
+        # Only touched on the worker loop's thread.
+        self._sessions: Deque[str] = deque()
+        self._pending: Dict[str, Deque[Tuple[TTSJob, Dict[str, str]]]] = {}
+        self._jobs: Set[TTSJob] = set()
+        self._running: Dict[TTSJob, Set["asyncio.Task[None]"]] = {}
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._setup(), self._loop).result()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _setup(self) -> None:
+        self.limiter = AdaptiveConcurrency(constants.TTS_CONCURRENCY)
+        self._wakeup = asyncio.Event()
+        self._dispatcher = self._loop.create_task(self._dispatch())
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive() and not self._loop.is_closed() and not self._dispatcher.done()
+
+    def submit(self, tasks: List[Dict[str, str]], session: str = "") -> TTSJob:
+        """Queue tasks for session and return the job to wait on."""
+        job = TTSJob(list(tasks), session, alive=lambda: self.alive)
+        if job.tasks:
+            self._loop.call_soon_threadsafe(self._enqueue, job)
+        return job
+
+    def _enqueue(self, job: TTSJob) -> None:
+        if self._dispatcher.done():
+            job._abort()
+            return
+        self._jobs = {active for active in self._jobs if not active.done.is_set()}
+        self._jobs.add(job)
+        if job.session not in self._pending:
+            self._pending[job.session] = deque()
+            self._sessions.append(job.session)
+        self._pending[job.session].extend((job, task) for task in job.tasks)
+        self._wakeup.set()
+
+    def _next_task(self) -> Tuple[TTSJob, Dict[str, str]]:
+        session = self._sessions.popleft()
+        pending = self._pending[session]
+        item = pending.popleft()
+        if pending:
+            self._sessions.append(session)
+        else:
+            del self._pending[session]
+        return item
+
+    def cancel(self, job: TTSJob) -> None:
+        """Drop the job's queued tasks, cancel its running clips and release its waiters."""
+        job.cancelled.set()
+        job._abort()
         try:
-            async with semaphore:
-                await asyncio.sleep(random.uniform(0.1, 0.8))
-
-                error_msg = ""
-
-                for attempt in range(constants.TTS_RETRY_ATTEMPTS):
-                    try:
-                        if not os.path.exists(task['path']):
-                            text = str(task['text']).strip()[:constants.TTS_TEXT_MAX_CHARS]
-                            comm = edge_tts.Communicate(text, task['voice'])
-                            await asyncio.wait_for(
-                                comm.save(task['path']),
-                                timeout=constants.TTS_TASK_TIMEOUT_SECONDS,
-                            )
-
-                            if os.path.exists(task['path']) and os.path.getsize(task['path']) > constants.MIN_AUDIO_FILE_SIZE:
-                                success = True
-                                break
-                            else:
-                                if os.path.exists(task['path']):
-                                    os.remove(task['path'])
-                                raise Exception("File size too small")
-                        else:
-                            success = True
-                            break
-                    except Exception as e:
-                        error_msg = str(e)
-                        if os.path.exists(task['path']):
-                            try:
-                                os.remove(task['path'])
-                            except OSError:
-                                pass
-                        await asyncio.sleep(1.0 * (attempt + 1))
-
-                if not success:
-                    logger.error("TTS failed for: %s | Error: %s", task['text'], error_msg)
+            self._loop.call_soon_threadsafe(self._discard, job)
+        except RuntimeError:
+            pass
+
+    def _task_done(self, job: TTSJob, task: "asyncio.Task[None]") -> None:
+        running = self._running.get(job)
+        if running is not None:
+            running.discard(task)
+            if not running:
+                del self._running[job]
+
+    def _discard(self, job: TTSJob) -> None:
+        self._jobs.discard(job)
+        for running in list(self._running.pop(job, ())):
+            running.cancel()
+        pending = self._pending.get(job.session)
+        if pending is None:
+            return
+        remaining = deque(item for item in pending if item[0] is not job)
+        if remaining:
+            self._pending[job.session] = remaining
+        else:
+            del self._pending[job.session]
+            self._sessions.remove(job.session)
+
+    def _abort_jobs(self) -> None:
+        """Drop every queued task and release all waiting callers."""
+        for job in self._jobs:
+            job._abort()
+        self._jobs.clear()
+        self._pending.clear()
+        self._sessions.clear()
+
+    async def _dispatch(self) -> None:
+        try:
+            while True:
+                if not self._sessions:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                # Pick the task only once a slot is free, so sessions arriving
+                # meanwhile take their turn.
+                await self.limiter.acquire()
+                if not self._sessions:
+                    # A cancel emptied the queue while this slot was awaited.
+                    await self.limiter.cancel()
+                    continue
+                job, task = self._next_task()
+                try:
+                    cache_key = make_tts_key(task['text'], task['voice'])
+                except Exception as e:
+                    logger.error("Skipping malformed TTS task %r: %s", task, e)
+                    await self.limiter.cancel()
+                    job._task_finished()
+                    continue
+                try:
+                    reused = _reuse_existing_audio(task, cache_key)
+                except Exception as e:
+                    logger.error("TTS cache lookup failed for: %s | Error: %s", task.get('text', ''), e)
+                    reused = False
+                if reused:
+                    await self.limiter.cancel()
+                    job._task_finished()
+                    continue
+                running = self._loop.create_task(self._run_task(job, task, cache_key))
+                self._running.setdefault(job, set()).add(running)
+                running.add_done_callback(lambda done, job=job: self._task_done(job, done))
+        except asyncio.CancelledError:
+            self._abort_jobs()
+            raise
+        except Exception as e:
+            logger.exception("TTS dispatcher failed: %s", e)
+            self._abort_jobs()
+
+    async def _run_task(self, job: TTSJob, task: Dict[str, str], cache_key: str) -> None:
+        try:
+            await _synthesize_with_retries(task, cache_key, self.limiter, job.cancelled)
         except Exception as e:
             logger.error("TTS worker failed for: %s | Error: %s", task.get('text', ''), e)
         finally:
-            completed_files += 1
-            if progress_callback:
-                progress_callback(
-                    completed_files / total_files,
-                    f"正在生成音频 ({completed_files}/{total_files})"
-                )
+            job._task_finished()
 
-    jobs = [worker(task) for task in tasks]
-    await asyncio.gather(*jobs, return_exceptions=True)
+    async def _shutdown(self) -> None:
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._abort_jobs()
+
+    def stop(self) -> None:
+        if not self.alive:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+
+_TTS_WORKER: Optional[TTSWorker] = None
+_TTS_WORKER_LOCK = threading.Lock()
+
+
+def get_tts_worker() -> TTSWorker:
+    """Return the process-wide TTS worker, starting it on first use."""
+    global _TTS_WORKER
+    with _TTS_WORKER_LOCK:
+        if _TTS_WORKER is None or not _TTS_WORKER.alive:
+            _TTS_WORKER = TTSWorker()
+        return _TTS_WORKER
 
 
 def run_async_batch(
     tasks: List[Dict[str, str]],
-    concurrency: int = constants.TTS_CONCURRENCY,
-    progress_callback: Optional[ProgressCallback] = None
+    progress_callback: Optional[ProgressCallback] = None,
+    session: Optional[str] = None,
 ) -> None:
-    """Run async audio generation batch with proper event loop handling."""
+    """Generate audio for tasks on the shared TTS worker, reporting progress from this thread.
+
+    session identifies the caller for fair queuing; it defaults to the
+    calling thread, which is one per Streamlit session.
+    """
     if not tasks:
         return
 
-    loop = asyncio.new_event_loop()
     try:
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(_generate_audio_batch(tasks, concurrency, progress_callback))
+        job = get_tts_worker().submit(tasks, session or str(threading.get_ident()))
+        job.wait(progress_callback)
     except Exception as e:
-        logger.error("Async loop error: %s", e)
-    finally:
-        asyncio.set_event_loop(None)
-        loop.close()
+        logger.error("TTS worker error: %s", e)
@@ -0,0 +1,151 @@
+# Persistent, content-addressed store of synthesized TTS clips, shared by every deck.
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from typing import List, Optional, Tuple
+
+import constants
+from ai_cache import AI_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_tts_text(text: str) -> str:
+    """Return the text exactly as it is sent to the TTS engine."""
+    return re.sub(r"\s+", " ", str(text or "")).strip()[:constants.TTS_TEXT_MAX_CHARS]
+
+
+def make_tts_key(text: str, voice: str) -> str:
+    """Hash everything that determines a clip: engine settings, voice and spoken text."""
+    payload = json.dumps(
+        {
+            "version": constants.TTS_CACHE_VERSION,
+            "engine": "edge_tts",
+            "voice": voice,
+            "text": normalize_tts_text(text),
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSAudioCache:
+    """MP3 files named by their key under root, evicted least recently used past max_bytes.
+
+    Hits refresh the file's mtime, which is what eviction orders by, so the
+    store needs no index and several processes can share the directory.
+    """
+
+    def __init__(self, root: str, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.mp3")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached clip's path, or None when it is missing or unusable."""
+        path = self.path_for(key)
+        try:
+            if os.path.getsize(path) <= constants.MIN_AUDIO_FILE_SIZE:
+                return None
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def fetch(self, key: str, dest_path: str) -> bool:
+        """Hard-link (or copy) a cached clip to dest_path; False on a miss."""
+        path = self.get(key)
+        if path is None:
+            return False
+        try:
+            try:
+                os.link(path, dest_path)
+            except OSError:
+                shutil.copyfile(path, dest_path)
+        except OSError as e:
+            logger.warning("TTS cache read failed: %s", e)
+            return False
+        return True
+
+    def put(self, key: str, source_path: str) -> None:
+        """Copy a freshly synthesized clip into the store; failures are logged and ignored."""
+        path = self.path_for(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+            os.close(fd)
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("TTS cache write failed: %s", e)
+            return
+
+        with self._lock:
+            self._puts_since_prune += 1
+            should_prune = self._puts_since_prune >= constants.TTS_CACHE_PRUNE_EVERY
+            if should_prune:
+                self._puts_since_prune = 0
+        if should_prune:
+            self.prune()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith(".mp3"):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def prune(self) -> int:
+        """Delete the least recently used clips until the store fits max_bytes; return the count."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        deleted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            deleted += 1
+        return deleted
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+_TTS_CACHE: Optional[TTSAudioCache] = None
+_TTS_CACHE_LOCK = threading.Lock()
+
+
+def get_tts_cache() -> Optional[TTSAudioCache]:
+    """Return the process-wide audio cache, or None when it is disabled."""
+    global _TTS_CACHE
+    if not constants.TTS_CACHE_ENABLED:
+        return None
+    with _TTS_CACHE_LOCK:
+        if _TTS_CACHE is None:
+            _TTS_CACHE = TTSAudioCache(
+                os.path.join(AI_CACHE_DIR, constants.TTS_CACHE_SUBDIR),
+                constants.TTS_CACHE_MAX_BYTES,
+            )
+        return _TTS_CACHE
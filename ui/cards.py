@@ -8,10 +8,13 @@ import streamlit as st
 
 import constants
 from ai import process_ai_in_batches
-from anki_package import cleanup_old_apkg_files, generate_anki_package
-from anki_parse import parse_anki_data
+from ai_batching import BATCH_SIZER
+from ai_cache import get_ai_cache, make_card_params_key
+from ai_limits import is_circuit_open
+from ai_usage import USAGE_TRACKER
+from anki_package import AudioPrefetcher, cleanup_old_apkg_files, generate_anki_package
 from config import get_config
-from resources import get_vocab_dict, lookup_local_card_entry, resolve_vocab_rank
+from resources import get_vocab_dict, lookup_local_card_entries, lookup_local_card_entry, resolve_vocab_rank
 from ui.helpers import (
     get_prepared_word_list_text,
     parse_unique_words,
@@ -81,16 +84,25 @@ def _local_card_meaning(entry: dict[str, str], card_template: str) -> str:
     return definition
 
 
-def _local_entry_for_word(word: str) -> dict[str, str] | None:
-    """Look up local dictionary data for one requested word."""
+LocalEntries = dict[str, dict[str, str] | None]
+
+
+def _local_entry_for_word(word: str, local_entries: LocalEntries | None = None) -> dict[str, str] | None:
+    """Look up local dictionary data for one requested word, preferring batch-resolved entries."""
+    if local_entries is not None and word in local_entries:
+        return local_entries[word]
     return lookup_local_card_entry(word)
 
 
-def _local_meaning_overrides(words: list[str], card_template: str) -> dict[str, str]:
+def _local_meaning_overrides(
+    words: list[str],
+    card_template: str,
+    local_entries: LocalEntries | None = None,
+) -> dict[str, str]:
     """Return exact local meanings that the AI prompt should preserve."""
     overrides: dict[str, str] = {}
     for word in words:
-        entry = _local_entry_for_word(word)
+        entry = _local_entry_for_word(word, local_entries)
         if not entry:
             continue
         meaning = _local_card_meaning(entry, card_template)
@@ -100,7 +112,12 @@ def _local_meaning_overrides(words: list[str], card_template: str) -> dict[str,
     return overrides
 
 
-def _apply_local_card_content(cards: list[dict], requested_words: list[str], card_template: str) -> list[dict]:
+def _apply_local_card_content(
+    cards: list[dict],
+    requested_words: list[str],
+    card_template: str,
+    local_entries: LocalEntries | None = None,
+) -> list[dict]:
     """Overlay local dictionary definitions/examples onto parsed card data."""
     requested_by_key = {_card_word_key(word): word for word in requested_words}
     localized_cards = []
@@ -110,7 +127,7 @@ def _apply_local_card_content(cards: list[dict], requested_words: list[str], car
             _card_word_key(normalized_card.get("w", "")),
             str(normalized_card.get("w", "")),
         )
-        entry = _local_entry_for_word(requested_word)
+        entry = _local_entry_for_word(requested_word, local_entries)
         if not entry:
             localized_cards.append(normalized_card)
             continue
@@ -135,9 +152,13 @@ def _apply_local_card_content(cards: list[dict], requested_words: list[str], car
     return localized_cards
 
 
-def _build_local_complete_card(word: str, card_template: str) -> dict | None:
+def _build_local_complete_card(
+    word: str,
+    card_template: str,
+    local_entries: LocalEntries | None = None,
+) -> dict | None:
     """Build a card entirely from local dictionary fields when possible."""
-    entry = _local_entry_for_word(word)
+    entry = _local_entry_for_word(word, local_entries)
     if not entry:
         return None
 
@@ -160,11 +181,15 @@ def _build_local_complete_card(word: str, card_template: str) -> dict | None:
     }
 
 
-def _local_complete_cards(requested_words: list[str], card_template: str) -> list[dict]:
+def _local_complete_cards(
+    requested_words: list[str],
+    card_template: str,
+    local_entries: LocalEntries | None = None,
+) -> list[dict]:
     """Return cards that can be generated without AI."""
     cards = []
     for word in requested_words:
-        card = _build_local_complete_card(word, card_template)
+        card = _build_local_complete_card(word, card_template, local_entries)
         if card:
             cards.append(card)
     return cards
@@ -319,6 +344,47 @@ def _ordered_requested_cards(cards: list[dict], requested_words: list[str]) -> l
     return ordered_cards
 
 
+def _card_cache_params(
+    card_template: str,
+    definition_language: str,
+    example_count: int,
+    translate_examples: bool,
+) -> str:
+    """Return the card-store key for the current generation settings and model."""
+    cfg = get_config()
+    return make_card_params_key(
+        card_template=card_template,
+        definition_language=definition_language,
+        example_count=int(example_count),
+        translate_examples=bool(translate_examples),
+        provider=cfg.get("ai_provider", ""),
+        model=str(cfg.get("ai_model", "")).strip(),
+    )
+
+
+def _load_cached_cards(words: list[str], card_params: str, card_template: str) -> list[dict]:
+    """Return stored AI cards for words that are still structurally complete."""
+    cache = get_ai_cache()
+    if cache is None or not words:
+        return []
+    stored = cache.get_cards(card_params, [_card_word_key(word) for word in words])
+    cards = []
+    for word in words:
+        card = stored.get(_card_word_key(word))
+        if card and _card_is_complete(card, word, card_template):
+            cards.append({**card, "w": word})
+    return cards
+
+
+def _store_cached_cards(cards: list[dict], words: list[str], card_params: str, card_template: str) -> None:
+    """Store the complete AI cards (before local overlays and source notes) by word."""
+    cache = get_ai_cache()
+    if cache is None:
+        return
+    complete = _complete_cards_by_key(cards, words, card_template)
+    cache.put_cards(card_params, complete)
+
+
 def _generate_complete_cards_with_queue(
     requested_words: list[str],
     *,
@@ -328,18 +394,52 @@ def _generate_complete_cards_with_queue(
     card_template: str,
     content_status: Any,
     content_progress_bar: Any,
+    audio_prefetcher: AudioPrefetcher | None = None,
+    voice_status: Any = None,
 ) -> tuple[list[dict], list[str]]:
-    """Generate complete cards by re-queuing failed words at the tail."""
-    local_seed_cards = _append_source_notes(_local_complete_cards(requested_words, card_template), requested_words)
+    """Generate complete cards by re-queuing failed words at the tail.
+
+    Each complete card is handed to audio_prefetcher as soon as it arrives,
+    so its audio is synthesized while later AI batches are still running.
+    """
+    local_entries = lookup_local_card_entries(requested_words)
+    local_seed_cards = _append_source_notes(
+        _local_complete_cards(requested_words, card_template, local_entries),
+        requested_words,
+    )
     parsed_cards: list[dict] = _merge_card_results([], local_seed_cards, requested_words, card_template)
     pending_words = _incomplete_card_words(parsed_cards, requested_words, card_template)
+    card_params = _card_cache_params(card_template, definition_language, example_count, translate_examples)
+    cached_cards = _load_cached_cards(pending_words, card_params, card_template)
+    if cached_cards:
+        cached_cards = _apply_local_card_content(cached_cards, requested_words, card_template, local_entries)
+        parsed_cards = _merge_card_results(
+            parsed_cards,
+            _append_source_notes(cached_cards, requested_words),
+            requested_words,
+            card_template,
+        )
+        pending_words = _incomplete_card_words(parsed_cards, requested_words, card_template)
+
+    def prefetch_audio(cards: list[dict]) -> None:
+        if audio_prefetcher is None:
+            return
+        ready_cards = _complete_cards_by_key(cards, requested_words, card_template)
+        if audio_prefetcher.add(list(ready_cards.values())) and voice_status is not None:
+            voice_status.text(f"🎙️ 语音进度：已提前排队 {audio_prefetcher.queued} 个音频")
+
+    prefetch_audio(parsed_cards)
     attempts_by_key: dict[str, int] = {}
     total_words = len(requested_words)
     max_attempts_per_word = max(constants.MAX_RETRIES * 4, 12)
 
+    ai_provider = str(get_config().get("ai_provider", ""))
     while pending_words:
-        batch = pending_words[: constants.AI_BATCH_SIZE]
-        pending_words = pending_words[constants.AI_BATCH_SIZE:]
+        # One round fills every concurrent AI batch slot at the provider's current batch size.
+        batch_size = BATCH_SIZER.next_size(ai_provider)
+        round_size = batch_size * constants.AI_MAX_CONCURRENT_BATCHES
+        batch = pending_words[:round_size]
+        pending_words = pending_words[round_size:]
 
         for word in batch:
             key = _card_word_key(word)
@@ -348,7 +448,7 @@ def _generate_complete_cards_with_queue(
         completed_count = len(_complete_cards_by_key(parsed_cards, requested_words, card_template))
         content_status.text(
             f"🧠 正在生成卡片：已完成 {completed_count}/{total_words}，"
-            f"本组处理 {len(batch)}/{constants.AI_BATCH_SIZE} 个，队列剩余 {len(pending_words)} 个"
+            f"本组处理 {len(batch)}/{round_size} 个，队列剩余 {len(pending_words)} 个"
         )
 
         def update_queue_progress(current: int, total: int) -> None:
@@ -359,6 +459,18 @@ def _generate_complete_cards_with_queue(
                 f"已完成 {completed_count}/{total_words}，队列剩余 {len(pending_words)} 个"
             )
 
+        round_cards: list[dict] = []
+
+        def receive_streamed_cards(cards: list[dict]) -> None:
+            round_cards.extend(cards)
+            prefetch_audio(_apply_local_card_content(cards, requested_words, card_template, local_entries))
+            ratio = (completed_count + len(round_cards)) / total_words if total_words else 0
+            content_progress_bar.progress(min(ratio, 0.98))
+            content_status.text(
+                f"🧠 正在生成卡片：本组已收到 {len(round_cards)}/{len(batch)} 张（最新：{cards[-1].get('w', '')}），"
+                f"已完成 {completed_count}/{total_words}，队列剩余 {len(pending_words)} 个"
+            )
+
         result = process_ai_in_batches(
             batch,
             example_count=int(example_count),
@@ -366,10 +478,20 @@ def _generate_complete_cards_with_queue(
             translate_examples=bool(translate_examples),
             progress_callback=update_queue_progress,
             card_template=card_template,
-            meaning_overrides=_local_meaning_overrides(batch, card_template),
+            meaning_overrides=_local_meaning_overrides(batch, card_template, local_entries),
+            batch_size=batch_size,
+            card_callback=receive_streamed_cards,
         )
         if result:
-            local_cards = _apply_local_card_content(parse_anki_data(result), requested_words, card_template)
+            # Cards were already parsed line by line while the batches streamed.
+            ai_cards = round_cards
+            _store_cached_cards(ai_cards, batch, card_params, card_template)
+            local_cards = _apply_local_card_content(
+                ai_cards,
+                requested_words,
+                card_template,
+                local_entries,
+            )
             new_cards = _append_source_notes(local_cards, requested_words)
             parsed_cards = _merge_card_results(
                 parsed_cards,
@@ -379,6 +501,9 @@ def _generate_complete_cards_with_queue(
             )
 
         incomplete_words = _incomplete_card_words(parsed_cards, batch, card_template)
+        if incomplete_words and is_circuit_open(ai_provider):
+            # The provider keeps failing; stop re-queuing instead of burning attempts on it.
+            return parsed_cards, incomplete_words + pending_words
         exhausted_words = [
             word
             for word in incomplete_words
@@ -507,58 +632,69 @@ def render_cards_tab() -> None:
             voice_status = st.empty()
             voice_progress_bar = st.progress(0)
 
-            content_status.text("🧠 正在按 10 个一组生成卡片...")
+            batch_size = BATCH_SIZER.next_size(str(get_config().get("ai_provider", "")))
+            content_status.text(f"🧠 正在按每组约 {batch_size} 个生成卡片...")
             voice_status.text("🎙️ 语音进度：等待内容生成完成")
-            parsed_data, incomplete_words = _generate_complete_cards_with_queue(
-                words_for_generation,
-                example_count=int(selected_example_count),
-                definition_language=definition_language,
-                translate_examples=bool(translate_examples),
+            with AudioPrefetcher(
+                enable_audio_auto,
+                selected_voice_code,
                 card_template=card_template,
-                content_status=content_status,
-                content_progress_bar=content_progress_bar,
-            )
-
-            if incomplete_words:
-                preview = "、".join(incomplete_words[:20])
-                more = f" 等 {len(incomplete_words)} 个词" if len(incomplete_words) > 20 else ""
-                content_status.text("⚠️ 仍有卡片暂未生成完整")
-                st.warning(f"仍有 {len(incomplete_words)} 个词没有生成完整卡片：{preview}{more}。本次不会打包不完整卡片。")
-                return
-
-            try:
-                content_progress_bar.progress(1.0)
-                content_status.text(f"✅ 内容生成完成：共 {len(parsed_data)} 张卡片，正在打包...")
-                voice_status.text("🎙️ 正在准备语音和 Anki 包...")
-                voice_progress_bar.progress(0.0)
-                final_deck_name = deck_name.strip() or default_deck_name
-
-                def update_pkg_progress(ratio: float, text: str) -> None:
-                    voice_progress_bar.progress(ratio)
-                    voice_status.text(text)
-
-                file_path = generate_anki_package(
-                    parsed_data,
-                    final_deck_name,
-                    enable_tts=enable_audio_auto,
-                    tts_voice=selected_voice_code,
-                    progress_callback=update_pkg_progress,
+                tts_mode=selected_audio_mode,
+            ) as audio_prefetcher:
+                parsed_data, incomplete_words = _generate_complete_cards_with_queue(
+                    words_for_generation,
+                    example_count=int(selected_example_count),
+                    definition_language=definition_language,
+                    translate_examples=bool(translate_examples),
                     card_template=card_template,
-                    tts_mode=selected_audio_mode,
+                    content_status=content_status,
+                    content_progress_bar=content_progress_bar,
+                    audio_prefetcher=audio_prefetcher,
+                    voice_status=voice_status,
                 )
 
-                st.session_state["anki_cards_cache"] = parsed_data
-                set_anki_pkg(file_path, final_deck_name)
-
-                voice_progress_bar.progress(1.0)
-                voice_status.text("✅ 音频和打包完成")
-                content_status.markdown(f"✅ **处理完成！共生成 {len(parsed_data)} 张卡片**")
-                st.balloons()
-                run_gc()
-            except Exception as exc:
-                from errors import ErrorHandler
-
-                ErrorHandler.handle(exc, "生成出错")
+                if incomplete_words:
+                    preview = "、".join(incomplete_words[:20])
+                    more = f" 等 {len(incomplete_words)} 个词" if len(incomplete_words) > 20 else ""
+                    content_status.text("⚠️ 仍有卡片暂未生成完整")
+                    st.warning(f"仍有 {len(incomplete_words)} 个词没有生成完整卡片：{preview}{more}。本次不会打包不完整卡片。")
+                    return
+
+                try:
+                    content_progress_bar.progress(1.0)
+                    content_status.text(f"✅ 内容生成完成：共 {len(parsed_data)} 张卡片，正在打包...")
+                    voice_status.text("🎙️ 正在准备语音和 Anki 包...")
+                    voice_progress_bar.progress(0.0)
+                    final_deck_name = deck_name.strip() or default_deck_name
+
+                    def update_pkg_progress(ratio: float, text: str) -> None:
+                        voice_progress_bar.progress(ratio)
+                        voice_status.text(text)
+
+                    # Finish the clips queued during generation; packaging then reuses them from the audio cache.
+                    audio_prefetcher.wait(update_pkg_progress)
+                    file_path = generate_anki_package(
+                        parsed_data,
+                        final_deck_name,
+                        enable_tts=enable_audio_auto,
+                        tts_voice=selected_voice_code,
+                        progress_callback=update_pkg_progress,
+                        card_template=card_template,
+                        tts_mode=selected_audio_mode,
+                    )
+
+                    st.session_state["anki_cards_cache"] = parsed_data
+                    set_anki_pkg(file_path, final_deck_name)
+
+                    voice_progress_bar.progress(1.0)
+                    voice_status.text("✅ 音频和打包完成")
+                    content_status.markdown(f"✅ **处理完成！共生成 {len(parsed_data)} 张卡片**")
+                    st.balloons()
+                    run_gc()
+                except Exception as exc:
+                    from errors import ErrorHandler
+
+                    ErrorHandler.handle(exc, "生成出错")
 
     st.caption("⚠️ 智能生成内容可能存在错误，请人工复核。卡片反面会按字段标注本地词典、AI 和 rank 来源。")
 
@@ -588,3 +724,24 @@ def render_cards_tab() -> None:
                 if column_name in df_view.columns:
                     df_view[column_name] = df_view[column_name].astype(str).str.replace(r"<br\s*/?>", "\n", regex=True)
             st.dataframe(df_view.head(constants.MAX_PREVIEW_CARDS), use_container_width=True, hide_index=True)
+
+    usage_rows = USAGE_TRACKER.report()
+    if usage_rows:
+        with st.expander("📊 AI 用量（按模板）", expanded=False):
+            df_usage = pd.DataFrame(usage_rows)
+            df_usage["template"] = df_usage["template"].map(
+                lambda key: constants.CARD_TEMPLATES.get(key, {}).get("label", key)
+            )
+            df_usage = df_usage.rename(columns={
+                "template": "模板",
+                "batches": "批次",
+                "cards": "完整卡片",
+                "prompt_tokens": "输入 tokens",
+                "cached_prompt_tokens": "缓存命中 tokens",
+                "completion_tokens": "输出 tokens",
+                "tokens_per_card": "每张 tokens",
+                "cost_usd": "估算费用 (USD)",
+                "cost_per_card_usd": "每张费用 (USD)",
+            })
+            st.dataframe(df_usage, use_container_width=True, hide_index=True)
+            st.caption("费用按 constants 中的默认模型单价估算，仅统计本进程内实际调用的批次。")
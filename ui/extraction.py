@@ -1,6 +1,5 @@
 """Extraction tab rendering."""
 
-import random
 import time
 from typing import Any
 
@@ -9,13 +8,16 @@ import streamlit as st
 import constants
 from ai import select_priority_words
 from extraction import (
+    TextChunkStream,
     extract_text_from_file,
     extract_text_from_url,
     get_extraction_error_message,
     is_extraction_error_text,
     is_upload_too_large,
+    iter_text_chunks_from_file,
     parse_anki_txt_export,
 )
+from resources import get_vocab_rank_index
 from state import set_generated_words_state
 from ui.helpers import (
     clear_direct_wordlist_input,
@@ -29,7 +31,7 @@ from ui.helpers import (
     sync_extract_editor_to_cards,
 )
 from utils import render_copy_button, run_gc
-from vocab_logic import analyze_logic_with_remaining
+from vocab_logic import analyze_chunks_with_remaining
 
 SOURCE_BLOCK_OPTIONS = ("用户语料", "单词表", "词库")
 SOURCE_BLOCK_MODES = {
@@ -72,14 +74,6 @@ def _render_rank_interval_selector(key_prefix: str) -> tuple[int, int]:
     return int(start_rank), int(end_rank)
 
 
-def _safe_int(value: Any, default: int | None = None) -> int | None:
-    """Convert loose rank values without letting one bad row break the UI."""
-    try:
-        return int(float(str(value).strip()))
-    except (TypeError, ValueError):
-        return default
-
-
 def _select_vocab_rows(
     full_df: Any,
     min_rank: int,
@@ -87,42 +81,10 @@ def _select_vocab_rows(
     count: int,
     randomize: bool = False,
 ) -> list[tuple[str, int]]:
-    """Select words from the loaded vocabulary rows, supporting list or DataFrame data."""
+    """Select words in a rank range through the cached rank index of the loaded rows."""
     if full_df is None:
         return []
-
-    if isinstance(full_df, list):
-        rows: list[tuple[str, int]] = []
-        for row in full_df:
-            if not isinstance(row, dict):
-                continue
-            word = str(row.get("word", "")).strip()
-            rank = _safe_int(row.get("rank"))
-            if word and rank is not None and min_rank <= rank <= max_rank:
-                rows.append((word, rank))
-        if randomize:
-            return random.sample(rows, k=min(count, len(rows)))
-        return sorted(rows, key=lambda item: item[1])[:count]
-
-    rank_col = next((column for column in full_df.columns if "rank" in str(column).lower()), None)
-    word_col = next((column for column in full_df.columns if "word" in str(column).lower()), None)
-    if rank_col is None or word_col is None:
-        return []
-
-    try:
-        subset = full_df.copy()
-        subset[rank_col] = subset[rank_col].map(lambda value: _safe_int(value))
-        subset = subset.dropna(subset=[rank_col])
-        subset[rank_col] = subset[rank_col].astype(int)
-        subset = subset[(subset[rank_col] >= min_rank) & (subset[rank_col] <= max_rank)]
-    except Exception:
-        return []
-
-    if randomize:
-        subset = subset.sample(n=min(count, len(subset)))
-    else:
-        subset = subset.sort_values(rank_col).head(count)
-    return [(str(word), int(rank)) for word, rank in zip(subset[word_col], subset[rank_col])]
+    return get_vocab_rank_index(full_df).select(min_rank, max_rank, count, randomize=randomize)
 
 
 def _render_generated_words_result() -> None:
@@ -333,31 +295,29 @@ def render_extraction_tab(vocab_dict: dict[str, int], full_df: Any) -> None:
             else:
                 with st.status("🔍 正在加载资源并分析文本...", expanded=True) as status:
                     start_time = time.time()
-                    raw_text = ""
 
                     if extract_source_mode == "文章 URL":
                         status.write(f"🌐 正在抓取文章链接：{input_url}")
-                        raw_text = extract_text_from_url(input_url)
+                        text_chunks = TextChunkStream([extract_text_from_url(input_url)])
                     elif extract_source_mode == "文件":
-                        status.write("📄 正在读取文件内容...")
-                        raw_text = extract_text_from_file(uploaded_file)
+                        status.write("📄 正在分块读取文件内容...")
+                        text_chunks = TextChunkStream(iter_text_chunks_from_file(uploaded_file))
                     else:
                         status.write("📝 正在读取文本内容...")
-                        raw_text = pasted_text
+                        text_chunks = TextChunkStream([pasted_text])
+
+                    status.write("🧠 正在进行词形还原与词频分级...")
+                    final_data, remaining_data, raw_count, stats_info = analyze_chunks_with_remaining(
+                        text_chunks,
+                        current_rank,
+                        target_rank,
+                        False,
+                    )
 
-                    if is_extraction_error_text(raw_text):
-                        error_message = get_extraction_error_message(raw_text)
-                        status.write(f"❌ {error_message}")
+                    if text_chunks.error:
+                        status.write(f"❌ {text_chunks.error}")
                         status.update(label="❌ 提取失败", state="error")
-                    elif len(raw_text) > 2:
-                        status.write("🧠 正在进行词形还原与词频分级...")
-                        final_data, remaining_data, raw_count, stats_info = analyze_logic_with_remaining(
-                            raw_text,
-                            current_rank,
-                            target_rank,
-                            False,
-                        )
-
+                    elif text_chunks.char_count > 2:
                         set_generated_words_state(final_data, raw_count, stats_info)
                         st.session_state["extract_remaining_words_text"] = "\n".join(
                             word for word, _ in remaining_data
@@ -242,6 +242,7 @@ def clear_quick_lookup_state() -> None:
     st.session_state["quick_lookup_last_query"] = ""
     st.session_state["quick_lookup_last_result"] = None
     st.session_state["quick_lookup_is_loading"] = False
+    st.session_state["quick_lookup_suggestions"] = None
 
 
 def clear_simple_lookup_state() -> None:
@@ -250,6 +251,7 @@ def clear_simple_lookup_state() -> None:
     st.session_state["simple_lookup_last_query"] = ""
     st.session_state["simple_lookup_last_result"] = None
     st.session_state["simple_lookup_is_loading"] = False
+    st.session_state["simple_lookup_suggestions"] = None
 
 
 def clear_english_question_state() -> None:
@@ -12,6 +12,7 @@ from ai import (
     get_word_quick_definition,
     get_word_simple_definition,
 )
+from resources import resolve_vocab_rank, suggest_vocab_words
 from state import set_generated_words_state
 from ui.helpers import (
     clear_english_question_state,
@@ -26,6 +27,8 @@ from ui.helpers import (
 )
 from utils import render_copy_button
 
+LOOKUP_SOURCE_LABELS = {"local": "本地词典", "cache": "已缓存的 AI 结果", "ai": "AI 生成"}
+
 
 def _strip_lookup_html_fragments(raw_content: str) -> str:
     """Remove model-leaked HTML fragments before any lookup rendering."""
@@ -114,6 +117,59 @@ def _render_lookup_result_card(result: dict, *, error_prefix: str) -> None:
         st.error(f"❌ {error_prefix}：{result.get('error', '未知错误')}")
 
 
+def _render_lookup_source(result: dict) -> None:
+    """Show which lookup tier answered and how long it took."""
+    if not result or "error" in result or not result.get("source"):
+        return
+    label = LOOKUP_SOURCE_LABELS.get(result["source"], result["source"])
+    st.caption(f"来源：{label} · {result.get('latency_ms', 0):.0f} ms")
+
+
+def _local_lookup_suggestions(query_word: str) -> list[str]:
+    """Return local spelling suggestions for a single English word missing from the vocabulary."""
+    if not re.fullmatch(r"[A-Za-z][A-Za-z'\-]*", query_word):
+        return []
+    if resolve_vocab_rank(query_word)[0] is not None:
+        return []
+    return [word for word in suggest_vocab_words(query_word) if word.lower() != query_word.lower()]
+
+
+def _choose_lookup_suggestion(state_prefix: str, word: str) -> None:
+    """Queue a lookup for a suggested (or the original) word and show it in the input."""
+    st.session_state[f"{state_prefix}_word"] = word
+    st.session_state[f"{state_prefix}_pending_query"] = word
+    st.session_state[f"{state_prefix}_suggestions"] = None
+
+
+def _render_lookup_suggestions(state_prefix: str) -> None:
+    """Offer local spelling suggestions before spending an AI lookup on a likely typo."""
+    suggestions = st.session_state.get(f"{state_prefix}_suggestions")
+    if not suggestions:
+        return
+
+    query_word = suggestions["query"]
+    st.info(f"🔎 词库中没有「{query_word}」，你是不是要找：")
+    columns = st.columns(len(suggestions["words"]) + 1)
+    for column, word in zip(columns, suggestions["words"]):
+        with column:
+            st.button(
+                word,
+                key=f"{state_prefix}_suggestion_{word}",
+                use_container_width=True,
+                on_click=_choose_lookup_suggestion,
+                args=(state_prefix, word),
+            )
+    with columns[-1]:
+        st.button(
+            f"仍然查询 {query_word}",
+            key=f"{state_prefix}_suggestion_keep",
+            type="secondary",
+            use_container_width=True,
+            on_click=_choose_lookup_suggestion,
+            args=(state_prefix, query_word),
+        )
+
+
 def _render_simple_lookup() -> None:
     st.markdown("### 📘 简洁查词")
     st.caption("输入英文单词/短语，或简洁中文释义；返回常见核心词义或最接近的常见英文词。")
@@ -160,14 +216,20 @@ def _render_simple_lookup() -> None:
                 on_click=clear_simple_lookup_state,
             )
 
-    if lookup_submit:
-        is_valid_query, query_word, error_message = validate_simple_lookup_query(lookup_word)
+    pending_query = st.session_state.pop("simple_lookup_pending_query", None)
+    if lookup_submit or pending_query:
+        is_valid_query, query_word, error_message = validate_simple_lookup_query(pending_query or lookup_word)
+        suggestions = [] if pending_query or not is_valid_query else _local_lookup_suggestions(query_word)
+        st.session_state["simple_lookup_suggestions"] = None
         if not is_valid_query:
             st.session_state["simple_lookup_last_query"] = ""
             st.session_state["simple_lookup_last_result"] = None
             st.warning(error_message)
         elif st.session_state["simple_lookup_is_loading"]:
             st.info("⏳ 查询进行中，请稍候。")
+        elif suggestions:
+            st.session_state["simple_lookup_suggestions"] = {"query": query_word, "words": suggestions}
+            st.session_state["simple_lookup_last_result"] = None
         else:
             st.session_state["simple_lookup_is_loading"] = True
             try:
@@ -187,7 +249,10 @@ def _render_simple_lookup() -> None:
             finally:
                 st.session_state["simple_lookup_is_loading"] = False
 
-    _render_lookup_result_card(st.session_state.get("simple_lookup_last_result"), error_prefix="查询失败")
+    _render_lookup_suggestions("simple_lookup")
+    simple_result = st.session_state.get("simple_lookup_last_result")
+    _render_lookup_result_card(simple_result, error_prefix="查询失败")
+    _render_lookup_source(simple_result)
     st.markdown("---")
 
 
@@ -237,14 +302,20 @@ def _render_quick_lookup() -> None:
                 on_click=clear_quick_lookup_state,
             )
 
-    if lookup_submit:
-        is_valid_query, query_word, error_message = validate_lookup_query(lookup_word)
+    pending_query = st.session_state.pop("quick_lookup_pending_query", None)
+    if lookup_submit or pending_query:
+        is_valid_query, query_word, error_message = validate_lookup_query(pending_query or lookup_word)
+        suggestions = [] if pending_query or not is_valid_query else _local_lookup_suggestions(query_word)
+        st.session_state["quick_lookup_suggestions"] = None
         if not is_valid_query:
             st.session_state["quick_lookup_last_query"] = ""
             st.session_state["quick_lookup_last_result"] = None
             st.warning(error_message)
         elif st.session_state["quick_lookup_is_loading"]:
             st.info("⏳ 查询进行中，请稍候。")
+        elif suggestions:
+            st.session_state["quick_lookup_suggestions"] = {"query": query_word, "words": suggestions}
+            st.session_state["quick_lookup_last_result"] = None
         else:
             st.session_state["quick_lookup_is_loading"] = True
             try:
@@ -264,6 +335,7 @@ def _render_quick_lookup() -> None:
             finally:
                 st.session_state["quick_lookup_is_loading"] = False
 
+    _render_lookup_suggestions("quick_lookup")
     _render_lookup_result_card(st.session_state.get("quick_lookup_last_result"), error_prefix="查询失败")
 
 
@@ -4,6 +4,18 @@ The Streamlit app imports the extraction logic from vocab_logic.py to avoid
 collisions with generic environment modules named "vocab".
 """
 
-from vocab_logic import analyze_logic, analyze_logic_with_remaining, get_lemma, is_valid_word
+from vocab_logic import (
+    analyze_chunks_with_remaining,
+    analyze_logic,
+    analyze_logic_with_remaining,
+    get_lemma,
+    is_valid_word,
+)
 
-__all__ = ["analyze_logic", "analyze_logic_with_remaining", "get_lemma", "is_valid_word"]
+__all__ = [
+    "analyze_chunks_with_remaining",
+    "analyze_logic",
+    "analyze_logic_with_remaining",
+    "get_lemma",
+    "is_valid_word",
+]
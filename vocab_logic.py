@@ -1,11 +1,48 @@
 # Word validation and text analysis (rank-based vocabulary extraction).
 
+import hashlib
+import logging
+import multiprocessing
+import os
 import re
-from collections import Counter
-from typing import Any, Dict, List, Tuple
+import threading
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
 import constants
-from resources import get_vocab_dict, get_vocab_display_dict, load_nlp_resources
+from resources import (
+    IRREGULAR_VOCAB_FORMS,
+    get_vocab_dict,
+    get_vocab_display_dict,
+    load_nlp_resources,
+    load_surface_index,
+    vocab_lookup_candidates,
+)
+
+logger = logging.getLogger(__name__)
+
+# Process-wide lemma cache shared by every Streamlit session in this worker.
+_LEMMA_CACHE: Dict[str, str] = {}
+_LEMMA_CACHE_LOCK = threading.Lock()
+_LEMMA_CACHE_STATS = {"hits": 0, "misses": 0}
+_LEMMA_WARMUP_STARTED = False
+
+# Surface index validated against the vocabulary object it was checked for.
+_SURFACE_INDEX_STATE: Dict[str, Any] = {"vocab": None, "index": {}}
+_TOKEN_PATTERN = re.compile(r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*")
+_SURFACE_TOKEN_PATTERN = re.compile(r"[a-z]+(?:[-'][a-z]+)*")
+
+SurfaceEntry = Tuple[int, str, str]
+
+# Process pool for counting tokens in large corpora, created on first use.
+_ANALYSIS_POOL: Optional[ProcessPoolExecutor] = None
+_ANALYSIS_POOL_LOCK = threading.Lock()
+# Matches the last non-letter character and the partial word after it, so text
+# can be cut without splitting a word; shared with extraction's chunked readers.
+TRAILING_WORD_PATTERN = re.compile(r"[^A-Za-z'\-][A-Za-z'\-]*\Z")
+_REPEATED_CHAR_PATTERN = re.compile(r"(.)\1{2,}")
+_VOWEL_PATTERN = re.compile(r"[aeiouy]")
 
 
 def _vocab_dict() -> Dict[str, int]:
@@ -17,15 +54,15 @@ def is_valid_word(word: str) -> bool:
     """Validate if a word meets criteria for processing."""
     if len(word) < constants.MIN_WORD_LENGTH or len(word) > constants.MAX_WORD_LENGTH:
         return False
-    if re.search(r"(.)\1{2,}", word):
+    if _REPEATED_CHAR_PATTERN.search(word):
         return False
-    if not re.search(r"[aeiouy]", word):
+    if not _VOWEL_PATTERN.search(word):
         return False
     return True
 
 
-def get_lemma(word: str, lemminflect: Any) -> str:
-    """Get lemma of a word with error handling."""
+def _compute_lemma(word: str, lemminflect: Any) -> str:
+    """Run lemminflect for one word with error handling."""
     try:
         lemmas = lemminflect.getLemma(word, upos="VERB")
         return lemmas[0] if lemmas else word
@@ -33,23 +70,334 @@ def get_lemma(word: str, lemminflect: Any) -> str:
         return word
 
 
-def analyze_logic_with_remaining(
-    text: str,
+def _store_lemma(word: str, lemma: str) -> None:
+    """Insert a lemma, evicting the oldest entries once the cache is full."""
+    with _LEMMA_CACHE_LOCK:
+        if word in _LEMMA_CACHE:
+            return
+        while len(_LEMMA_CACHE) >= constants.LEMMA_CACHE_MAX_ENTRIES:
+            _LEMMA_CACHE.pop(next(iter(_LEMMA_CACHE)))
+        _LEMMA_CACHE[word] = lemma
+
+
+def get_lemma(word: str, lemminflect: Any) -> str:
+    """Get lemma of a word, served from the process-wide cache when possible."""
+    lemma = _LEMMA_CACHE.get(word)
+    if lemma is not None:
+        _LEMMA_CACHE_STATS["hits"] += 1
+        return lemma
+
+    _LEMMA_CACHE_STATS["misses"] += 1
+    lemma = _compute_lemma(word, lemminflect)
+    _store_lemma(word, lemma)
+    return lemma
+
+
+def get_lemma_cache_stats() -> Dict[str, int]:
+    """Return lemma cache size plus hit/miss counters."""
+    return {
+        "size": len(_LEMMA_CACHE),
+        "max_size": constants.LEMMA_CACHE_MAX_ENTRIES,
+        "hits": _LEMMA_CACHE_STATS["hits"],
+        "misses": _LEMMA_CACHE_STATS["misses"],
+    }
+
+
+def clear_lemma_cache() -> None:
+    """Drop cached lemmas and reset counters."""
+    with _LEMMA_CACHE_LOCK:
+        _LEMMA_CACHE.clear()
+        _LEMMA_CACHE_STATS["hits"] = 0
+        _LEMMA_CACHE_STATS["misses"] = 0
+
+
+def _lemma_warmup_words(headwords: Iterable[str], lemminflect: Any) -> List[str]:
+    """Return headwords plus their common inflections, headwords first."""
+    words = dict.fromkeys(str(word).lower() for word in headwords if word)
+    for headword in list(words):
+        try:
+            inflections = lemminflect.getAllInflections(headword)
+        except Exception:
+            continue
+        for forms in inflections.values():
+            words.update(dict.fromkeys(str(form).lower() for form in forms))
+    words.update(dict.fromkeys(IRREGULAR_VOCAB_FORMS))
+    return list(words)
+
+
+def warm_lemma_cache(headwords: Iterable[str], lemminflect: Any) -> int:
+    """Precompute lemmas for headwords and their inflections; return entries added."""
+    added = 0
+    for word in _lemma_warmup_words(headwords, lemminflect):
+        if word in _LEMMA_CACHE:
+            continue
+        _store_lemma(word, _compute_lemma(word, lemminflect))
+        added += 1
+    return added
+
+
+def start_lemma_cache_warmup() -> None:
+    """Warm the lemma cache once per process in a background thread."""
+    global _LEMMA_WARMUP_STARTED
+    with _LEMMA_CACHE_LOCK:
+        if _LEMMA_WARMUP_STARTED:
+            return
+        _LEMMA_WARMUP_STARTED = True
+
+    def warmup() -> None:
+        try:
+            import lemminflect
+
+            added = warm_lemma_cache(_vocab_dict().keys(), lemminflect)
+            logger.info("Lemma cache warmed with %s entries", added)
+        except Exception as e:
+            logger.warning("Lemma cache warmup failed: %s", e)
+
+    threading.Thread(target=warmup, name="lemma-cache-warmup", daemon=True).start()
+
+
+def vocab_fingerprint(vocab_dict: Mapping[str, int], display_dict: Mapping[str, str]) -> str:
+    """Hash the word/rank/display data a surface index was built from."""
+    digest = hashlib.sha1()
+    for word, rank in sorted(vocab_dict.items(), key=lambda item: (int(item[1]), item[0])):
+        digest.update(f"{word}\t{int(rank)}\t{display_dict.get(word, word)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def resolve_surface_form(
+    word: str,
+    lemminflect: Any,
+    vocab_dict: Mapping[str, int],
+    display_dict: Mapping[str, str],
+) -> SurfaceEntry:
+    """Resolve one lowercase token to (best rank, display word, lemma key)."""
+    lemma = get_lemma(word, lemminflect)
+    rank_lemma = vocab_dict.get(lemma, 99999)
+    rank_orig = vocab_dict.get(word, 99999)
+
+    if rank_lemma != 99999 and rank_orig != 99999:
+        best_rank = min(rank_lemma, rank_orig)
+    elif rank_lemma != 99999:
+        best_rank = rank_lemma
+    else:
+        best_rank = rank_orig
+
+    if best_rank == 99999:
+        for candidate in vocab_lookup_candidates(word)[1:]:
+            rank = vocab_dict.get(candidate)
+            if rank is not None:
+                return int(rank), display_dict.get(candidate, candidate), candidate
+
+    word_to_keep_key = lemma if rank_lemma != 99999 else word
+    return best_rank, display_dict.get(word_to_keep_key, word_to_keep_key), lemma
+
+
+def build_surface_index(
+    vocab_dict: Mapping[str, int],
+    display_dict: Mapping[str, str],
+    lemminflect: Any,
+) -> Dict[str, SurfaceEntry]:
+    """Resolve every known surface form (headwords plus inflections) ahead of time."""
+    headwords = [word for word in vocab_dict if _SURFACE_TOKEN_PATTERN.fullmatch(word)]
+    index: Dict[str, SurfaceEntry] = {}
+    for surface in _lemma_warmup_words(headwords, lemminflect):
+        if not _SURFACE_TOKEN_PATTERN.fullmatch(surface):
+            continue
+        entry = resolve_surface_form(surface, lemminflect, vocab_dict, display_dict)
+        if entry[0] != 99999:
+            index[surface] = entry
+    return index
+
+
+def get_surface_index(
+    vocab_dict: Mapping[str, int],
+    display_dict: Mapping[str, str],
+) -> Dict[str, SurfaceEntry]:
+    """Return the shipped surface index, or an empty one if it is stale for this vocabulary."""
+    if _SURFACE_INDEX_STATE["vocab"] is vocab_dict:
+        return _SURFACE_INDEX_STATE["index"]
+
+    fingerprint, index = load_surface_index()
+    if not index or not vocab_dict or fingerprint != vocab_fingerprint(vocab_dict, display_dict):
+        if index:
+            logger.info("Surface index is stale for the loaded vocabulary; resolving tokens on the fly")
+        index = {}
+    _SURFACE_INDEX_STATE["vocab"] = vocab_dict
+    _SURFACE_INDEX_STATE["index"] = index
+    return index
+
+
+def count_text_tokens(chunks: Iterable[str]) -> Tuple[Counter, int]:
+    """Count valid lowercase tokens chunk by chunk; return (counts, raw token total).
+
+    Chunks are tokenized independently, so a chunk boundary must never fall
+    inside a word. Raw tokens are counted first and each distinct spelling is
+    lowercased and validated once; folding the raw counts in first-seen order
+    keeps the same key order as counting token by token.
+    """
+    token_counts: Counter = Counter()
+    validity: Dict[str, bool] = {}
+    total_raw_count = 0
+    for chunk in chunks:
+        raw_counts = Counter(_TOKEN_PATTERN.findall(chunk))
+        for token, count in raw_counts.items():
+            total_raw_count += count
+            lowered = token.lower()
+            valid = validity.get(lowered)
+            if valid is None:
+                valid = validity[lowered] = is_valid_word(lowered)
+            if valid:
+                token_counts[lowered] += count
+    return token_counts, total_raw_count
+
+
+def _iter_bounded_chunks(chunks: Iterable[str], max_chars: int) -> Iterator[str]:
+    """Split oversized chunks between words so every piece stays near max_chars."""
+    for chunk in chunks:
+        start = 0
+        while len(chunk) - start > max_chars:
+            match = TRAILING_WORD_PATTERN.search(chunk, start, start + max_chars)
+            if match is None:
+                break
+            cut = match.start() + 1
+            yield chunk[start:cut]
+            start = cut
+        yield chunk[start:] if start else chunk
+
+
+def _iter_shards(chunks: Iterable[str], shard_chars: int) -> Iterator[List[str]]:
+    """Group chunks into shards of roughly shard_chars characters."""
+    shard: List[str] = []
+    shard_size = 0
+    for chunk in _iter_bounded_chunks(chunks, shard_chars):
+        shard.append(chunk)
+        shard_size += len(chunk)
+        if shard_size >= shard_chars:
+            yield shard
+            shard = []
+            shard_size = 0
+    if shard:
+        yield shard
+
+
+def _analysis_worker_count() -> int:
+    return max(1, min(os.cpu_count() or 1, constants.ANALYSIS_MAX_WORKERS))
+
+
+def _get_analysis_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the shared token-counting process pool, creating it on first use."""
+    global _ANALYSIS_POOL
+    with _ANALYSIS_POOL_LOCK:
+        if _ANALYSIS_POOL is None:
+            try:
+                _ANALYSIS_POOL = ProcessPoolExecutor(
+                    max_workers=_analysis_worker_count(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except Exception as e:
+                logger.warning("Could not start analysis process pool: %s", e)
+                return None
+        return _ANALYSIS_POOL
+
+
+def _reset_analysis_pool() -> None:
+    """Drop a broken pool so the next large analysis starts a fresh one."""
+    global _ANALYSIS_POOL
+    with _ANALYSIS_POOL_LOCK:
+        pool, _ANALYSIS_POOL = _ANALYSIS_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _count_shards_in_pool(shards: Iterable[List[str]]) -> Tuple[Counter, int]:
+    """Count shards across worker processes, merging results in shard order.
+
+    Merging in order keeps Counter insertion order identical to a serial
+    count, so downstream lemma de-duplication picks the same display words.
+    A failing pool falls back to counting the affected shards in-process.
+    """
+    token_counts: Counter = Counter()
+    total_raw_count = 0
+    max_in_flight = _analysis_worker_count() * 2
+    pending: deque = deque()
+    pool = _get_analysis_pool()
+
+    def collect_oldest() -> None:
+        nonlocal total_raw_count
+        future, shard = pending.popleft()
+        try:
+            shard_counts, shard_raw_count = future.result()
+        except Exception as e:
+            logger.warning("Analysis worker failed, counting shard in-process: %s", e)
+            _reset_analysis_pool()
+            shard_counts, shard_raw_count = count_text_tokens(shard)
+        token_counts.update(shard_counts)
+        total_raw_count += shard_raw_count
+
+    for shard in shards:
+        if pool is not None:
+            try:
+                pending.append((pool.submit(count_text_tokens, shard), shard))
+            except Exception as e:
+                logger.warning("Could not submit analysis shard, continuing in-process: %s", e)
+                _reset_analysis_pool()
+                pool = None
+            else:
+                if len(pending) >= max_in_flight:
+                    collect_oldest()
+                continue
+
+        while pending:
+            collect_oldest()
+        shard_counts, shard_raw_count = count_text_tokens(shard)
+        token_counts.update(shard_counts)
+        total_raw_count += shard_raw_count
+
+    while pending:
+        collect_oldest()
+    return token_counts, total_raw_count
+
+
+def count_text_tokens_auto(chunks: Iterable[str]) -> Tuple[Counter, int]:
+    """Count tokens in-process for normal texts, or across processes for large corpora.
+
+    The stream is buffered until it exceeds ANALYSIS_PARALLEL_MIN_CHARS; only
+    then is the process pool used. Results are identical either way.
+    """
+    if _analysis_worker_count() <= 1:
+        return count_text_tokens(chunks)
+
+    shards = _iter_shards(chunks, constants.ANALYSIS_SHARD_CHARS)
+    buffered: List[List[str]] = []
+    buffered_chars = 0
+    for shard in shards:
+        buffered.append(shard)
+        buffered_chars += sum(len(chunk) for chunk in shard)
+        if buffered_chars >= constants.ANALYSIS_PARALLEL_MIN_CHARS:
+            break
+    else:
+        return count_text_tokens(chunk for shard in buffered for chunk in shard)
+
+    def all_shards() -> Iterator[List[str]]:
+        yield from buffered
+        buffered.clear()
+        yield from shards
+
+    return _count_shards_in_pool(all_shards())
+
+
+def _rank_token_counts(
+    token_counts: Counter,
+    total_raw_count: int,
     current_level: int,
     target_level: int,
     include_unknown: bool,
 ) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]], int, Dict[str, float]]:
-    """Analyze text and return selected words plus valid words left outside the range."""
+    """Resolve ranks for counted tokens and split them into selected and remaining words."""
     _, lemminflect = load_nlp_resources()
     vocab_dict = _vocab_dict()
     display_dict = get_vocab_display_dict()
 
-    raw_tokens = re.findall(r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*", text)
-    total_raw_count = len(raw_tokens)
-
-    valid_tokens = [token.lower() for token in raw_tokens if is_valid_word(token.lower())]
-    token_counts = Counter(valid_tokens)
-
     stats_known_count = 0
     stats_target_count = 0
     stats_valid_total = sum(token_counts.values())
@@ -58,17 +406,13 @@ def analyze_logic_with_remaining(
     remaining_candidates = []
     seen_lemmas = set()
 
-    for word, count in token_counts.items():
-        lemma = get_lemma(word, lemminflect)
-        rank_lemma = vocab_dict.get(lemma, 99999)
-        rank_orig = vocab_dict.get(word, 99999)
+    surface_index = get_surface_index(vocab_dict, display_dict)
 
-        if rank_lemma != 99999 and rank_orig != 99999:
-            best_rank = min(rank_lemma, rank_orig)
-        elif rank_lemma != 99999:
-            best_rank = rank_lemma
-        else:
-            best_rank = rank_orig
+    for word, count in token_counts.items():
+        entry = surface_index.get(word)
+        if entry is None:
+            entry = resolve_surface_form(word, lemminflect, vocab_dict, display_dict)
+        best_rank, word_to_keep, lemma = entry
 
         if best_rank < current_level:
             stats_known_count += count
@@ -78,8 +422,6 @@ def analyze_logic_with_remaining(
         is_in_range = current_level <= best_rank <= target_level
         is_unknown_included = best_rank == 99999 and include_unknown
 
-        word_to_keep_key = lemma if rank_lemma != 99999 else word
-        word_to_keep = display_dict.get(word_to_keep_key, word_to_keep_key)
         if lemma not in seen_lemmas:
             if is_in_range or is_unknown_included:
                 final_candidates.append((word_to_keep, best_rank))
@@ -101,6 +443,27 @@ def analyze_logic_with_remaining(
     return final_candidates, remaining_candidates, total_raw_count, stats_info
 
 
+def analyze_chunks_with_remaining(
+    chunks: Iterable[str],
+    current_level: int,
+    target_level: int,
+    include_unknown: bool,
+) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]], int, Dict[str, float]]:
+    """Analyze streamed text chunks; results match analyzing the chunks joined by newlines."""
+    token_counts, total_raw_count = count_text_tokens_auto(chunks)
+    return _rank_token_counts(token_counts, total_raw_count, current_level, target_level, include_unknown)
+
+
+def analyze_logic_with_remaining(
+    text: str,
+    current_level: int,
+    target_level: int,
+    include_unknown: bool,
+) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]], int, Dict[str, float]]:
+    """Analyze text and return selected words plus valid words left outside the range."""
+    return analyze_chunks_with_remaining([text], current_level, target_level, include_unknown)
+
+
 def analyze_logic(
     text: str,
     current_level: int,
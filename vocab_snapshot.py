@@ -0,0 +1,269 @@
+"""Compact binary snapshot of the word/rank vocabulary.
+
+The snapshot is built from the vocabulary CSV by tools/build_vocab_snapshot.py
+and records the SHA-1 of that CSV, so a snapshot that no longer matches the
+word list is ignored. All integers are little-endian:
+
+    magic      8 bytes  b"VFVOCAB2"
+    count      uint32
+    slot_count uint32                power of two, at least 2 * count
+    csv_sha1   20 bytes
+    ranks      int32[count]          entries sorted by rank
+    key_offs   uint32[count + 1]     byte offsets into key_blob
+    disp_offs  uint32[count + 1]     byte offsets into disp_blob
+    slots      uint32[slot_count]    open-addressing table of entry indexes,
+                                     keyed by crc32 of the UTF-8 key
+    key_blob   UTF-8 lowercase keys joined by "\\n"
+    disp_blob  UTF-8 display spellings joined by "\\n"
+
+VocabStore reads the file through a read-only memory map, so every worker
+process shares the same page-cache pages instead of building its own dicts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VFVOCAB2"
+_HEADER = struct.Struct("<8sII20s")
+_EMPTY_SLOT = 0xFFFFFFFF
+
+
+def file_sha1(path: Path) -> bytes:
+    """Return the raw SHA-1 digest of a file's bytes."""
+    digest = hashlib.sha1()
+    with path.open("rb") as source:
+        for block in iter(lambda: source.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _string_table(values: List[bytes]) -> Tuple[array, bytes]:
+    """Join encoded strings with newlines and return (byte offsets, blob)."""
+    offsets = array("I", [0])
+    position = 0
+    for value in values:
+        position += len(value) + 1
+        offsets.append(position)
+    return offsets, b"\n".join(values)
+
+
+def _slot_table(keys: List[bytes]) -> array:
+    """Build the open-addressing table mapping crc32(key) to entry index."""
+    slot_count = 1
+    while slot_count < 2 * len(keys):
+        slot_count *= 2
+    mask = slot_count - 1
+    slots = array("I", [_EMPTY_SLOT]) * slot_count
+    for index, key in enumerate(keys):
+        slot = zlib.crc32(key) & mask
+        while slots[slot] != _EMPTY_SLOT:
+            slot = (slot + 1) & mask
+        slots[slot] = index
+    return slots
+
+
+def write_snapshot(path: Path, entries: Iterable[Tuple[str, str, int]], source_sha1: bytes) -> int:
+    """Write (key, display, rank) entries sorted by rank; return the entry count."""
+    rows = sorted(entries, key=lambda entry: entry[2])
+    for key, display, _ in rows:
+        if "\n" in key or "\n" in display:
+            raise ValueError(f"Vocabulary entry contains a newline: {key!r}")
+    keys = [row[0].encode("utf-8") for row in rows]
+    if len(set(keys)) != len(keys):
+        raise ValueError("Vocabulary keys must be unique")
+    ranks = array("i", (row[2] for row in rows))
+    key_offsets, key_blob = _string_table(keys)
+    display_offsets, display_blob = _string_table([row[1].encode("utf-8") for row in rows])
+    slots = _slot_table(keys)
+
+    with path.open("wb") as target:
+        target.write(_HEADER.pack(MAGIC, len(rows), len(slots), source_sha1))
+        for table in (ranks, key_offsets, display_offsets, slots):
+            target.write(_little_endian(table).tobytes())
+        target.write(key_blob)
+        target.write(display_blob)
+    return len(rows)
+
+
+class VocabStore(Mapping):
+    """Read-only word -> rank mapping over a vocabulary snapshot.
+
+    Iteration yields keys in rank order, like the dict built from the CSV.
+    Strings are decoded on access; nothing per word is kept in memory.
+    """
+
+    def __init__(self, buffer: Any, source: str = "") -> None:
+        magic, count, slot_count, self.source_sha1 = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("unknown vocab snapshot format")
+        if slot_count & (slot_count - 1) or slot_count < 2 * count:
+            raise ValueError("invalid slot table size")
+
+        self._buffer = buffer
+        self._source = source
+        self._count = count
+        self._mask = slot_count - 1
+        position = _HEADER.size
+        self._ranks, position = self._table(buffer, position, "i", count)
+        self._key_offsets, position = self._table(buffer, position, "I", count + 1)
+        self._display_offsets, position = self._table(buffer, position, "I", count + 1)
+        self._slots, position = self._table(buffer, position, "I", slot_count)
+        self._key_base = position
+        self._display_base = position + max(self._key_offsets[count] - 1, 0)
+        expected_size = self._display_base + max(self._display_offsets[count] - 1, 0)
+        if expected_size != len(buffer):
+            raise ValueError("unexpected snapshot size")
+        self.displays = VocabDisplayView(self)
+        self.rows = VocabRows(self)
+
+    @staticmethod
+    def _table(buffer: Any, position: int, typecode: str, length: int) -> Tuple[Any, int]:
+        end = position + 4 * length
+        if end > len(buffer):
+            raise ValueError("truncated snapshot")
+        if sys.byteorder == "little":
+            return memoryview(buffer)[position:end].cast(typecode), end
+        values = array(typecode)
+        values.frombytes(buffer[position:end])
+        values.byteswap()
+        return values, end
+
+    @classmethod
+    def open(cls, path: Path, expected_sha1: bytes) -> Optional["VocabStore"]:
+        """Memory-map a snapshot, or return None when it is missing, stale, or corrupt."""
+        try:
+            with path.open("rb") as source:
+                buffer = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            store = cls(buffer, str(path))
+        except (struct.error, ValueError) as e:
+            logger.warning(f"Ignoring corrupt vocab snapshot {path}: {e}")
+            return None
+        if store.source_sha1 != expected_sha1:
+            logger.info(f"Ignoring stale vocab snapshot {path}")
+            return None
+        return store
+
+    def __repr__(self) -> str:
+        return f"VocabStore({self._source!r}, {self._count} words)"
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def ranks(self) -> Sequence:
+        """Ranks in ascending order, indexed like key_at/display_at."""
+        return self._ranks
+
+    def index_of(self, word: Any) -> int:
+        """Return the rank-order index of word, or -1 when it is not present."""
+        if not isinstance(word, str):
+            return -1
+        try:
+            data = word.encode("utf-8")
+        except UnicodeEncodeError:
+            return -1
+        slot = zlib.crc32(data) & self._mask
+        while True:
+            index = self._slots[slot]
+            if index == _EMPTY_SLOT:
+                return -1
+            if self._key_bytes(index) == data:
+                return index
+            slot = (slot + 1) & self._mask
+
+    def _key_bytes(self, index: int) -> bytes:
+        start = self._key_base + self._key_offsets[index]
+        return self._buffer[start:self._key_base + self._key_offsets[index + 1] - 1]
+
+    def key_at(self, index: int) -> str:
+        return self._key_bytes(index).decode("utf-8")
+
+    def display_at(self, index: int) -> str:
+        start = self._display_base + self._display_offsets[index]
+        end = self._display_base + self._display_offsets[index + 1] - 1
+        return self._buffer[start:end].decode("utf-8")
+
+    def rank_at(self, index: int) -> int:
+        return self._ranks[index]
+
+    def __getitem__(self, word: str) -> int:
+        index = self.index_of(word)
+        if index < 0:
+            raise KeyError(word)
+        return self._ranks[index]
+
+    def __contains__(self, word: object) -> bool:
+        return self.index_of(word) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        if not self._count:
+            return iter(())
+        blob = self._buffer[self._key_base:self._display_base]
+        return iter(blob.decode("utf-8").split("\n"))
+
+
+class VocabDisplayView(Mapping):
+    """Word -> display spelling view over a VocabStore."""
+
+    def __init__(self, store: VocabStore) -> None:
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __getitem__(self, word: str) -> str:
+        index = self._store.index_of(word)
+        if index < 0:
+            raise KeyError(word)
+        return self._store.display_at(index)
+
+    def __contains__(self, word: object) -> bool:
+        return self._store.index_of(word) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store)
+
+
+class VocabRows(Sequence):
+    """Rank-ordered `{"word", "rank"}` rows, built on access like the CSV row list."""
+
+    def __init__(self, store: VocabStore) -> None:
+        self._store = store
+
+    @property
+    def store(self) -> VocabStore:
+        return self._store
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return {"word": self._store.display_at(index), "rank": self._store.rank_at(index)}